@@ -0,0 +1,72 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark the per-file cost of reading a topology with and without the
+shared configspec.
+
+Usage: python benchmarks/bench_configspec.py [topology.net] [-n RUNS]
+"""
+import argparse
+import logging
+import os.path
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from gns3converter.converter import ConfigSpec, Converter
+
+
+def read(topology, native, sparse, cached):
+    """
+    Read and validate a topology
+
+    :param str topology: topology file
+    :param bool native: use the native parser
+    :param bool sparse: use sparse validation
+    :param bool cached: reuse the shared configspec
+    """
+    if not cached:
+        # Force the configspec to be parsed again, as for every file before
+        ConfigSpec._instance = None
+    Converter(topology, native=native, sparse=sparse).read_topology()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('topology', nargs='?',
+                        default=os.path.join(os.path.dirname(__file__), '..',
+                                             'tests', 'topology.net'))
+    parser.add_argument('-n', '--runs', type=int, default=200)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    print('%-10s %-7s %12s %12s %8s' %
+          ('parser', 'sparse', 'fresh (ms)', 'cached (ms)', 'saving'))
+    for native in (False, True):
+        for sparse in (False, True):
+            times = {}
+            for cached in (False, True):
+                timer = timeit.Timer(lambda: read(args.topology, native,
+                                                  sparse, cached))
+                times[cached] = min(timer.repeat(3, args.runs)) / args.runs
+            print('%-10s %-7s %12.3f %12.3f %7.0f%%' % (
+                'native' if native else 'configobj', sparse,
+                times[False] * 1000, times[True] * 1000,
+                (1 - times[True] / times[False]) * 100))
+
+
+if __name__ == '__main__':
+    main()
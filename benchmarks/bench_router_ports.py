@@ -0,0 +1,134 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark generating the nodes of router heavy topologies with the router
+port layouts cached, against building the ports of every router from the
+model and adapter tables.
+
+Usage: python benchmarks/bench_router_ports.py [-s SIZE ...] [-n RUNS]
+"""
+import argparse
+import gc
+import logging
+import os.path
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from gns3converter.converter import Converter
+from gns3converter.node import Node, router_port_layout
+from topogen import generate_topology
+
+
+def build_router_ports(node):
+    """
+    Add the ports of a router without the layout cache
+
+    :param Node node: router node
+    """
+    node.calc_mb_ports()
+    for item in sorted(node.node.properties):
+        if item.startswith('slot'):
+            node.add_slot_ports(item)
+        elif item.startswith('wic'):
+            node.add_wic_ports(item)
+
+
+def time_nodes(converter, topology, runs, cached):
+    """
+    Time generating the nodes of a topology, and the part of it spent adding
+    the router ports
+
+    :param Converter converter: converter for the topology
+    :param dict topology: processed topology
+    :param int runs: number of runs, the fastest is kept
+    :param bool cached: use the layout cache
+    :return: fastest times in seconds, of adding the router ports and of
+             generating the nodes
+    :rtype: tuple
+    """
+    add_router_ports = Node.add_router_ports
+    add_ports = add_router_ports if cached else build_router_ports
+    ports_time = [0.0]
+
+    def timed_add_ports(node):
+        start = time.perf_counter()
+        add_ports(node)
+        ports_time[0] += time.perf_counter() - start
+
+    Node.add_router_ports = timed_add_ports
+    # As timeit, keep the garbage collector out of the times
+    gc.collect()
+    gc.disable()
+    try:
+        best = None
+        for _ in range(runs):
+            # Start each run with an empty cache
+            router_port_layout.cache_clear()
+            converter.port_id = 1
+            converter.links = []
+            converter.configs = []
+            ports_time[0] = 0.0
+            start = time.perf_counter()
+            converter.generate_nodes(topology)
+            elapsed = (ports_time[0], time.perf_counter() - start)
+            if best is None:
+                best = elapsed
+            best = (min(best[0], elapsed[0]), min(best[1], elapsed[1]))
+    finally:
+        Node.add_router_ports = add_router_ports
+        gc.enable()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('-s', '--size', type=int, nargs='+',
+                        default=[100, 500, 2000], help='numbers of routers')
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    print('%7s %7s %22s %22s' % ('', '', 'router ports (ms)', 'nodes (ms)'))
+    print('%7s %7s %7s %7s %6s %7s %7s %6s' % (
+        'routers', 'ports', 'before', 'cached', 'saving', 'before', 'cached',
+        'saving'))
+    for size in args.size:
+        (text, generator) = generate_topology(routers=size, frsw=0, clouds=0,
+                                              vbox=0, qemu=0, notes=0,
+                                              shapes=0, pixmaps=0)
+        with tempfile.NamedTemporaryFile('w', suffix='.net',
+                                         delete=False) as file:
+            file.write(text)
+        try:
+            converter = Converter(file.name, native=True)
+            topology = converter.process_topology(converter.read_topology())
+        finally:
+            os.remove(file.name)
+
+        uncached = time_nodes(converter, topology, args.runs, False)
+        cached = time_nodes(converter, topology, args.runs, True)
+        print('%7s %7s %7.1f %7.1f %5.0f%% %7.1f %7.1f %5.0f%%' % (
+            size, converter.port_id - 1,
+            uncached[0] * 1000, cached[0] * 1000,
+            (1 - cached[0] / uncached[0]) * 100,
+            uncached[1] * 1000, cached[1] * 1000,
+            (1 - cached[1] / uncached[1]) * 100))
+
+
+if __name__ == '__main__':
+    main()
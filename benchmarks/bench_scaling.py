@@ -0,0 +1,197 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark how each stage of a conversion scales with the size of the
+topology, using synthetic topologies of growing size.
+
+The scaling exponent of each stage (the slope of log(time) against
+log(size), 1.0 being linear) is compared with the stored baseline, and the
+benchmark fails when a stage scales worse than the baseline allows.
+
+Usage: python benchmarks/bench_scaling.py [-s SIZE ...] [-n RUNS]
+                                          [--update-baseline]
+"""
+import argparse
+import json
+import logging
+import math
+import os.path
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from gns3converter.converter import Converter
+from gns3converter.main import save
+from gns3converter.topology import JSONTopology
+from topogen import scaled_counts, write_project
+
+STAGES = ('read_topology', 'process_topology', 'generate_nodes',
+          'generate_links', 'save')
+BASELINE = os.path.join(os.path.dirname(__file__), 'scaling_baseline.json')
+# Allowed increase of a scaling exponent over its baseline
+TOLERANCE = 0.25
+
+
+def time_conversion(topology, output_dir, native):
+    """
+    Convert a topology, timing each stage
+
+    :param str topology: topology file
+    :param str output_dir: directory to save the converted topology to
+    :param bool native: use the native parser
+    :return: time taken by each stage in seconds
+    :rtype: dict
+    """
+    times = {}
+    converter = Converter(topology, native=native)
+    new_top = JSONTopology()
+
+    start = time.perf_counter()
+    old_top = converter.read_topology()
+    times['read_topology'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    processed = converter.process_topology(old_top)
+    times['process_topology'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_top.nodes = converter.generate_nodes(processed)
+    times['generate_nodes'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_top.links = converter.generate_links(new_top.nodes)
+    times['generate_links'] = time.perf_counter() - start
+
+    new_top.notes = converter.generate_notes(processed['artwork']['NOTE'])
+    new_top.shapes = converter.generate_shapes(processed['artwork']['SHAPE'])
+    new_top.images = converter.generate_images(processed['artwork']['PIXMAP'])
+    new_top.name = 'topology'
+
+    start = time.perf_counter()
+    save(output_dir, converter, new_top, False, True)
+    times['save'] = time.perf_counter() - start
+    return times
+
+
+def exponent(sizes, times):
+    """
+    Get the scaling exponent, the least squares slope of log(time) against
+    log(size)
+
+    :param list sizes: topology sizes
+    :param list times: times taken for each size
+    :return: scaling exponent
+    :rtype: float
+    """
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(seconds, 1e-9)) for seconds in times]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    num = sum((x - x_mean) * (y - y_mean) for (x, y) in zip(xs, ys))
+    den = sum((x - x_mean) ** 2 for x in xs)
+    return num / den
+
+
+def run(sizes, runs, native):
+    """
+    Time each stage of converting a synthetic topology of each size
+
+    :param list sizes: numbers of routers
+    :param int runs: runs per size, the fastest is kept
+    :param bool native: use the native parser
+    :return: fastest time for each stage, keyed by stage then size
+    :rtype: dict
+    """
+    results = {stage: {} for stage in STAGES}
+    workdir = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            project = os.path.join(workdir, 'source%s' % size)
+            (topology, generator) = write_project(project,
+                                                  **scaled_counts(size))
+            print('%5s routers: %5s devices, %5s links' %
+                  (size, len(generator.devices), generator.nb_links))
+            for _ in range(runs):
+                output_dir = os.path.join(workdir, 'output')
+                times = time_conversion(topology, output_dir, native)
+                shutil.rmtree(output_dir)
+                for stage in STAGES:
+                    best = results[stage].get(size, times[stage])
+                    results[stage][size] = min(best, times[stage])
+    finally:
+        shutil.rmtree(workdir)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('-s', '--sizes', type=int, nargs='+',
+                        default=[50, 100, 200, 400],
+                        help='Numbers of routers to benchmark')
+    parser.add_argument('-n', '--runs', type=int, default=3)
+    parser.add_argument('--parser', choices=['configobj', 'native'],
+                        default='native')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Store the measured exponents as the baseline')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    sizes = sorted(set(args.sizes))
+    if len(sizes) < 2:
+        parser.error('At least two sizes are needed')
+    results = run(sizes, args.runs, args.parser == 'native')
+
+    exponents = {}
+    print('\n%-17s' % 'stage' +
+          ''.join('%10s' % size for size in sizes) + '  exponent')
+    for stage in STAGES:
+        exponents[stage] = round(exponent(sizes, [results[stage][size]
+                                                  for size in sizes]), 3)
+        print('%-17s' % stage +
+              ''.join('%9.1fms' % (results[stage][size] * 1000)
+                      for size in sizes) +
+              '%10.2f' % exponents[stage])
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump({'sizes': sizes, 'parser': args.parser,
+                       'exponents': exponents}, file, indent=4,
+                      sort_keys=True)
+            file.write('\n')
+        print('\nBaseline written to %s' % args.baseline)
+        return
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)['exponents']
+    failed = []
+    for stage in STAGES:
+        # Never fail a stage that still scales linearly
+        limit = max(baseline.get(stage, 1.0), 1.0) + TOLERANCE
+        if exponents[stage] > limit:
+            failed.append('%s scales with exponent %.2f (limit %.2f)' %
+                          (stage, exponents[stage], limit))
+
+    if failed:
+        print('\nFAILED:\n    ' + '\n    '.join(failed))
+        sys.exit(1)
+    print('\nOK: no stage scales worse than the baseline')
+
+
+if __name__ == '__main__':
+    main()
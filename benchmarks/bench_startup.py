@@ -0,0 +1,101 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark the start up time of gns3-converter, running it as a new process
+for ``--version`` and for the conversion of a tiny topology. The start up
+of the bare interpreter is shown for comparison.
+
+Usage: python benchmarks/bench_startup.py [-n RUNS] [--imports]
+"""
+import argparse
+import os.path
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCRIPT = os.path.join(ROOT, 'gns3-converter.py')
+TOPOLOGY = os.path.join(ROOT, 'tests', 'topology.net')
+
+
+def run_times(command, runs):
+    """
+    Run a command several times, timing each run
+
+    :param list command: command to run
+    :param int runs: number of runs
+    :return: time taken by each run in seconds
+    :rtype: list
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.check_call(command, cwd=ROOT, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def slowest_imports(count=15):
+    """
+    Get the imports taking the longest when gns3converter.main is imported
+
+    :param int count: number of imports to return
+    :return: list of (cumulative time in ms, module)
+    :rtype: list
+    """
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                             'import gns3converter.main'], cwd=ROOT,
+                            stderr=subprocess.PIPE,
+                            universal_newlines=True).stderr
+    imports = []
+    for line in output.splitlines()[1:]:
+        (_, cumulative, module) = line.split('|')
+        imports.append((int(cumulative) / 1000, module.rstrip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('-n', '--runs', type=int, default=20)
+    parser.add_argument('--imports', action='store_true',
+                        help='also show the slowest imports')
+    args = parser.parse_args()
+
+    output_dir = tempfile.mkdtemp()
+    try:
+        commands = (
+            ('python', [sys.executable, '-c', 'pass']),
+            ('--version', [sys.executable, SCRIPT, '--version']),
+            ('convert', [sys.executable, SCRIPT, '-q', '--force',
+                         '-o', output_dir, TOPOLOGY]))
+        print('%-10s %10s %10s' % ('command', 'min (ms)', 'median (ms)'))
+        for (label, command) in commands:
+            times = run_times(command, args.runs)
+            print('%-10s %10.1f %10.1f' % (label, min(times) * 1000,
+                                           statistics.median(times) * 1000))
+    finally:
+        shutil.rmtree(output_dir)
+
+    if args.imports:
+        print('\n%10s  %s' % ('cumul (ms)', 'module'))
+        for (cumulative, module) in slowest_imports():
+            print('%10.1f  %s' % (cumulative, module))
+
+
+if __name__ == '__main__':
+    main()
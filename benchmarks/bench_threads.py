@@ -0,0 +1,83 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark converting topologies in memory from a pool of threads, as an
+application embedding gns3-converter would. Each conversion is checked
+against the same topology converted in a single thread.
+
+Usage: python benchmarks/bench_threads.py [-r ROUTERS] [-c COUNT]
+                                          [-t THREADS ...]
+"""
+import argparse
+import os.path
+import sys
+import time
+from concurrent import futures
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from gns3converter.main import convert_topology
+from topogen import generate_topology, scaled_counts
+
+
+def run_threads(sources, threads):
+    """
+    Convert the topologies from a pool of threads
+
+    :param list sources: (name, topology text) of each topology
+    :param int threads: number of threads
+    :return: the converted topologies, in the order of sources, and the
+             time taken in seconds
+    :rtype: tuple
+    """
+    start = time.perf_counter()
+    with futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        pending = [executor.submit(convert_topology, text, topology_name,
+                                   True)
+                   for (topology_name, text) in sources]
+        results = [future.result()[0] for future in pending]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('-r', '--routers', type=int, default=50,
+                        help='routers in each topology')
+    parser.add_argument('-c', '--count', type=int, default=64,
+                        help='number of topologies converted')
+    parser.add_argument('-t', '--threads', type=int, nargs='+',
+                        default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    # Topologies of a few sizes, so that conversions running at once have
+    # different numbers of ports
+    texts = [generate_topology(**scaled_counts(args.routers + i))[0]
+             for i in range(4)]
+    sources = [('Lab%s' % i, texts[i % len(texts)])
+               for i in range(args.count)]
+    expected = [convert_topology(text, topology_name, True)[0]
+                for (topology_name, text) in sources]
+
+    print('%7s %9s %12s %7s' % ('threads', 'time (s)', 'topologies/s',
+                                'correct'))
+    for threads in args.threads:
+        (results, elapsed) = run_threads(sources, threads)
+        print('%7s %9.2f %12.1f %7s' % (threads, elapsed,
+                                        len(sources) / elapsed,
+                                        results == expected))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,426 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Generate synthetic GNS3 0.8 (.net) topologies for testing and benchmarking.
+
+Usage: python benchmarks/topogen.py OUTPUT_DIR [-r ROUTERS]
+"""
+import argparse
+import math
+import os
+
+# Router platforms: .net model, chassis, slot and WIC cards, the ethernet
+# port connected to a switch, the serial port connected to a frame relay
+# switch and the port used for a direct link to the next router of the same
+# platform (None when not available)
+PLATFORMS = [
+    {'model': '2691', 'chassis': None,
+     'slots': {'slot1': 'NM-16ESW'}, 'wics': {'wic0/0': 'WIC-2T'},
+     'eth': 'f0/0', 'serial': 's0/0', 'peer': 'f1/0'},
+    {'model': '3725', 'chassis': None,
+     'slots': {'slot1': 'NM-4T'}, 'wics': {'wic0/0': 'WIC-1T'},
+     'eth': 'f0/0', 'serial': 's0/0', 'peer': 'f0/1'},
+    {'model': '3745', 'chassis': None,
+     'slots': {'slot1': 'NM-1FE-TX', 'slot2': 'NM-4E'},
+     'wics': {'wic0/0': 'WIC-2T', 'wic0/1': 'WIC-1ENET'},
+     'eth': 'f0/0', 'serial': 's0/0', 'peer': 'e2/0'},
+    {'model': '7200', 'chassis': None,
+     'slots': {'slot0': 'C7200-IO-2FE', 'slot1': 'PA-4T+', 'slot2': 'PA-8E',
+               'slot3': 'PA-GE'},
+     'wics': {}, 'eth': 'f0/0', 'serial': 's1/0', 'peer': 'e2/0'},
+    {'model': '3640', 'chassis': '3640',
+     'slots': {'slot0': 'NM-1FE-TX', 'slot1': 'NM-4T', 'slot2': 'NM-16ESW'},
+     'wics': {}, 'eth': 'f0/0', 'serial': 's1/0', 'peer': 'f2/0'},
+    {'model': '3620', 'chassis': '3620',
+     'slots': {'slot0': 'NM-4E', 'slot1': 'NM-4T'},
+     'wics': {}, 'eth': 'e0/0', 'serial': 's1/0', 'peer': 'e0/1'},
+    {'model': '3660', 'chassis': '3660',
+     'slots': {'slot1': 'NM-16ESW', 'slot2': 'NM-4T'},
+     'wics': {}, 'eth': 'f0/0', 'serial': 's2/0', 'peer': 'f1/0'},
+    {'model': '2621', 'chassis': '2621',
+     'slots': {'slot1': 'NM-1E'}, 'wics': {'wic0/0': 'WIC-1T'},
+     'eth': 'f0/0', 'serial': 's0/0', 'peer': 'f0/1'},
+    {'model': '1760', 'chassis': '1760',
+     'slots': {}, 'wics': {'wic0/0': 'WIC-2T'},
+     'eth': 'f0/0', 'serial': 's0/0', 'peer': None},
+]
+
+
+def scaled_counts(routers):
+    """
+    Get the number of each kind of device for a topology with a given number
+    of routers
+
+    :param int routers: number of routers
+    :return: dict of keyword arguments for :py:func:`generate_topology`
+    :rtype: dict
+    """
+    return {'routers': routers,
+            'ethsw': max(1, int(math.ceil(routers / 16))),
+            'frsw': max(1, int(math.ceil(routers / 32))),
+            'clouds': max(1, routers // 50),
+            'vbox': routers // 10,
+            'qemu': routers // 10,
+            'notes': max(1, routers // 20),
+            'shapes': max(1, routers // 20),
+            'pixmaps': max(1, routers // 50)}
+
+
+class TopologyGenerator(object):
+    """
+    Builds the lines of a synthetic topology
+
+    :param int routers: number of routers
+    :param int ethsw: number of ethernet switches (at least 1)
+    :param int frsw: number of frame relay switches
+    :param int clouds: number of clouds
+    :param int vbox: number of VirtualBox VMs
+    :param int qemu: number of QEMU VMs
+    :param int notes: number of notes
+    :param int shapes: number of shapes
+    :param int pixmaps: number of pixmaps
+    """
+    def __init__(self, routers=10, ethsw=1, frsw=1, clouds=1, vbox=1, qemu=1,
+                 notes=1, shapes=1, pixmaps=1):
+        self.counts = {'routers': routers, 'ethsw': max(1, ethsw),
+                       'frsw': frsw, 'clouds': clouds, 'vbox': vbox,
+                       'qemu': qemu, 'notes': notes, 'shapes': shapes,
+                       'pixmaps': pixmaps}
+        # Items of each device section, keyed by section name
+        self.devices = {}
+        self.configs = []
+        self.images = []
+        self.nb_links = 0
+        self._ethsw_ports = [0] * self.counts['ethsw']
+        self._frsw_ports = [0] * self.counts['frsw']
+        self._next_ethsw = 0
+        self._next_frsw = 0
+
+    def add_device(self, section, name):
+        """
+        Add a device, placing it on a grid
+
+        :param str section: section name e.g. ROUTER R1
+        :param str name: device name
+        :return: dict of device items
+        :rtype: dict
+        """
+        index = len(self.devices)
+        items = {'x': '%.1f' % (index % 40 * 100.0),
+                 'y': '%.1f' % (index // 40 * 100.0)}
+        self.devices[section] = items
+        return items
+
+    def connect_ethsw(self, device, interface):
+        """
+        Connect a device interface to the next ethernet switch
+
+        :param str device: device name
+        :param str interface: device interface e.g. f0/0
+        :return: switch name and port
+        :rtype: str
+        """
+        switch = self._next_ethsw
+        self._next_ethsw = (switch + 1) % self.counts['ethsw']
+        self._ethsw_ports[switch] += 1
+        port = self._ethsw_ports[switch]
+        vlan = 1 + switch % 10
+        self.devices['ETHSW SW%s' % (switch + 1)][str(port)] = \
+            'access %s %s %s' % (vlan, device, interface)
+        self.nb_links += 1
+        return 'SW%s %s' % (switch + 1, port)
+
+    def connect_frsw(self, device, interface):
+        """
+        Connect a serial interface to the next frame relay switch, mapping
+        it to the previous interface connected to the switch
+
+        :param str device: device name
+        :param str interface: device interface e.g. s0/0
+        :return: switch name and port
+        :rtype: str
+        """
+        switch = self._next_frsw
+        self._next_frsw = (switch + 1) % self.counts['frsw']
+        self._frsw_ports[switch] += 1
+        port = self._frsw_ports[switch]
+        items = self.devices['FRSW FR%s' % (switch + 1)]
+        items[str(port)] = '%s %s' % (device, interface)
+        if port % 2 == 0:
+            # Map DLCIs in both directions between this port and the last
+            items['%s:%s' % (port - 1, 100 + port)] = \
+                '%s:%s' % (port, 100 + port - 1)
+            items['%s:%s' % (port, 100 + port - 1)] = \
+                '%s:%s' % (port - 1, 100 + port)
+        self.nb_links += 1
+        return 'FR%s %s' % (switch + 1, port)
+
+    def build(self):
+        """
+        Build the devices of the topology
+
+        :return: the topology lines
+        :rtype: list
+        """
+        for i in range(self.counts['ethsw']):
+            self.add_device('ETHSW SW%s' % (i + 1), 'SW%s' % (i + 1))
+        for i in range(self.counts['frsw']):
+            self.add_device('FRSW FR%s' % (i + 1), 'FR%s' % (i + 1))
+
+        # The switches are built last, once every device is connected to them
+        routers = self.build_routers()
+        vms = self.build_vms()
+        switches = self.build_switches_and_clouds()
+        return (['autostart = False', 'version = 0.8.6'] + routers +
+                switches + vms + self.build_artwork())
+
+    def build_routers(self):
+        """
+        Build a hypervisor for each router platform containing its routers
+
+        :return: the hypervisor lines
+        :rtype: list
+        """
+        lines = []
+        platforms = {}
+        for i in range(self.counts['routers']):
+            platforms.setdefault(i % len(PLATFORMS), []).append(i + 1)
+
+        last_peer = {}
+        for (nb, platform_id) in enumerate(sorted(platforms)):
+            platform = PLATFORMS[platform_id]
+            lines.extend(['[127.0.0.1:%s]' % (7200 + nb),
+                          '    workingdir = /tmp',
+                          '    udp = %s' % (10000 + nb * 100),
+                          '    [[%s]]' % platform['model'],
+                          '        image = /images/c%s.image' %
+                          platform['model'],
+                          '        idlepc = 0x6056c1ec',
+                          '        ram = 128'])
+            if platform['chassis'] is not None:
+                lines.append('        chassis = %s' % platform['chassis'])
+            if platform['model'] == '7200':
+                lines.append('        npe = npe-400')
+
+            for router_nb in platforms[platform_id]:
+                router = 'R%s' % router_nb
+                items = self.add_device('ROUTER %s' % router, router)
+                items['model'] = platform['model']
+                items['console'] = str(2000 + router_nb)
+                items['cnfg'] = 'configs/%s.cfg' % router
+                self.configs.append('%s.cfg' % router)
+                items.update(platform['slots'])
+                items.update(platform['wics'])
+                items[platform['eth']] = self.connect_ethsw(router,
+                                                            platform['eth'])
+                if self.counts['frsw'] > 0:
+                    items[platform['serial']] = \
+                        self.connect_frsw(router, platform['serial'])
+                if platform['peer'] is not None:
+                    if platform_id in last_peer:
+                        # Link to the previous router of this platform
+                        peer = last_peer.pop(platform_id)
+                        items[platform['peer']] = '%s %s' % (
+                            peer, platform['peer'])
+                        self.devices['ROUTER %s' % peer][platform['peer']] = \
+                            '%s %s' % (router, platform['peer'])
+                        self.nb_links += 1
+                    else:
+                        last_peer[platform_id] = router
+
+                lines.extend(self.device_lines('ROUTER %s' % router))
+        return lines
+
+    def build_switches_and_clouds(self):
+        """
+        Build the switches and clouds, with one switch trunked to the next
+        and each cloud connected to a switch
+
+        :return: the hypervisor lines
+        :rtype: list
+        """
+        for i in range(self.counts['ethsw'] - 1):
+            switch = self.devices['ETHSW SW%s' % (i + 1)]
+            next_switch = self.devices['ETHSW SW%s' % (i + 2)]
+            self._ethsw_ports[i] += 1
+            self._ethsw_ports[i + 1] += 1
+            port = self._ethsw_ports[i]
+            next_port = self._ethsw_ports[i + 1]
+            switch[str(port)] = 'dot1q 1 SW%s %s' % (i + 2, next_port)
+            next_switch[str(next_port)] = 'dot1q 1 SW%s %s' % (i + 1, port)
+            self.nb_links += 1
+
+        for i in range(self.counts['clouds']):
+            cloud = 'C%s' % (i + 1)
+            items = self.add_device('Cloud %s' % cloud, cloud)
+            switch_nb = i % self.counts['ethsw']
+            self._ethsw_ports[switch_nb] += 1
+            port = self._ethsw_ports[switch_nb]
+            nio = 'nio_gen_eth:eth%s' % i
+            self.devices['ETHSW SW%s' % (switch_nb + 1)][str(port)] = \
+                'dot1q 1 %s' % nio
+            items['connections'] = 'SW%s:%s:%s' % (switch_nb + 1, port, nio)
+            self.nb_links += 1
+
+        lines = ['[127.0.0.1:%s]' % (7200 + len(PLATFORMS)),
+                 '    workingdir = /tmp',
+                 '    udp = 20000']
+        for section in sorted(self.devices):
+            if section.split(' ')[0] in ('ETHSW', 'FRSW', 'Cloud'):
+                lines.extend(self.device_lines(section))
+        return lines
+
+    def build_vms(self):
+        """
+        Build the VirtualBox and QEMU hypervisors and VMs
+
+        :return: the hypervisor lines
+        :rtype: list
+        """
+        lines = []
+        if self.counts['vbox'] > 0:
+            lines.extend(['[vbox 127.0.0.1:11525]',
+                          '    workingdir = /tmp',
+                          '    [[VBoxDevice]]',
+                          '        image = vm-base',
+                          '        nics = 2'])
+            for i in range(self.counts['vbox']):
+                name = 'VB%s' % (i + 1)
+                items = self.add_device('VBOX %s' % name, name)
+                items['image'] = 'vm-%s' % (i + 1)
+                items['nics'] = '2'
+                items['e0'] = self.connect_ethsw(name, 'e0')
+                lines.extend(self.device_lines('VBOX %s' % name))
+
+        if self.counts['qemu'] > 0:
+            lines.extend(['[qemu 127.0.0.1:10525]',
+                          '    qemupath = /usr/bin/qemu-system-x86_64',
+                          '    workingdir = /tmp',
+                          '    [[QemuDevice]]',
+                          '        image = /images/linux.img',
+                          '        ram = 256',
+                          '        nics = 2'])
+            for i in range(self.counts['qemu']):
+                name = 'Q%s' % (i + 1)
+                items = self.add_device('QEMU %s' % name, name)
+                items['e0'] = self.connect_ethsw(name, 'e0')
+                lines.extend(self.device_lines('QEMU %s' % name))
+        return lines
+
+    def build_artwork(self):
+        """
+        Build the GNS3-DATA section containing the notes, shapes and pixmaps
+
+        :return: the GNS3-DATA lines
+        :rtype: list
+        """
+        lines = ['[GNS3-DATA]', '    configs = configs']
+        for i in range(self.counts['notes']):
+            lines.extend(['    [[NOTE %s]]' % (i + 1),
+                          '        text = "Note %s\\nline 2"' % (i + 1),
+                          '        x = %.1f' % (i * 50.0),
+                          '        y = -100.0',
+                          '        color = "#1a1a1a"'])
+        for i in range(self.counts['shapes']):
+            shape = ('ellipse', 'rectangle')[i % 2]
+            lines.extend(['    [[SHAPE %s]]' % (i + 1),
+                          '        type = %s' % shape,
+                          '        x = %.1f' % (i * 50.0),
+                          '        y = -200.0',
+                          '        width = 100.0',
+                          '        height = 50.0',
+                          '        border_style = 2'])
+            if i % 3 == 0:
+                lines.extend(['        fill_color = "#ff0000"',
+                              '        rotate = 45'])
+        for i in range(self.counts['pixmaps']):
+            image = 'image%s.png' % (i + 1)
+            self.images.append(image)
+            lines.extend(['    [[PIXMAP %s]]' % (i + 1),
+                          '        path = images/%s' % image,
+                          '        x = %.1f' % (i * 50.0),
+                          '        y = -300.0'])
+        return lines
+
+    def device_lines(self, section):
+        """
+        Get the lines for a device
+
+        :param str section: device section name
+        :return: the device lines
+        :rtype: list
+        """
+        items = self.devices[section]
+        lines = ['    [[%s]]' % section]
+        for key in sorted(items):
+            lines.append('        %s = %s' % (key, items[key]))
+        return lines
+
+
+def generate_topology(**kwargs):
+    """
+    Generate the text of a topology
+
+    :param kwargs: device counts, see :py:class:`TopologyGenerator`
+    :return: tuple of the topology text and the generator
+    :rtype: tuple
+    """
+    generator = TopologyGenerator(**kwargs)
+    lines = generator.build()
+    return '\n'.join(lines) + '\n', generator
+
+
+def write_project(directory, **kwargs):
+    """
+    Write a topology, with its configs and images, to a project directory
+
+    :param str directory: project directory
+    :param kwargs: device counts, see :py:class:`TopologyGenerator`
+    :return: the topology file and the generator
+    :rtype: tuple
+    """
+    (text, generator) = generate_topology(**kwargs)
+    for subdir in ('configs', 'images'):
+        os.makedirs(os.path.join(directory, subdir), exist_ok=True)
+
+    topology = os.path.join(directory, 'topology.net')
+    with open(topology, 'w') as file:
+        file.write(text)
+    for config in generator.configs:
+        with open(os.path.join(directory, 'configs', config), 'w') as file:
+            file.write('hostname %s\n' % config[:-4])
+    for image in generator.images:
+        with open(os.path.join(directory, 'images', image), 'wb') as file:
+            file.write(b'\x89PNG\r\n\x1a\n')
+    return topology, generator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('output', help='Project directory to create')
+    parser.add_argument('-r', '--routers', type=int, default=100,
+                        help='Number of routers, the other devices are '
+                             'scaled to match (default: 100)')
+    args = parser.parse_args()
+
+    (topology, generator) = write_project(args.output,
+                                          **scaled_counts(args.routers))
+    print('Wrote %s (%s devices, %s links)' % (topology,
+                                               len(generator.devices),
+                                               generator.nb_links))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+asyncio versions of the conversion functions in :py:mod:`gns3converter.main`.
+
+Reading and converting a topology runs in an executor, off the event loop.
+Asset copies and the creation of the VM working directories run
+concurrently, with a semaphore limiting how many file operations are in
+flight at once.
+
+As other tasks run on the event loop while a conversion waits for its file
+operations, the wall time of the copy and write stages is the time the
+conversion took over them, including any waiting, and their CPU time is
+that of the conversion's own file operations.
+"""
+import asyncio
+import functools
+import logging
+import os
+import time
+from gns3converter.assets import AssetCopier, COPY_WORKERS
+from gns3converter.converter import Converter
+from gns3converter.main import build_topology, collect_assets, \
+    convert_topology, is_unchanged, output_dirs, vm_dirs, warn_missing, \
+    write_converted
+from gns3converter.stats import ConversionStats
+
+log = logging.getLogger(__name__)
+
+
+def timed_call(func, *args):
+    """
+    Call a function, timing the CPU time of the thread running it
+
+    :param func: function to call
+    :param args: arguments for func
+    :return: tuple of the result of func and the CPU time in seconds
+    :rtype: tuple
+    """
+    start = time.thread_time()
+    result = func(*args)
+    return result, time.thread_time() - start
+
+
+async def run_file_op(semaphore, func, *args, executor=None, cpu=None):
+    """
+    Run a blocking file operation in an executor once the semaphore allows
+
+    :param asyncio.Semaphore semaphore: semaphore limiting the operations in
+                                        flight
+    :param func: function doing the operation
+    :param args: arguments for func
+    :param executor: executor to run in (Default: None, the loop's default
+                     executor)
+    :param list cpu: list to append the CPU time taken by the operation to
+                     (Default: None, not timed)
+    :return: the result of func
+    """
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        if cpu is None:
+            return await loop.run_in_executor(
+                executor, functools.partial(func, *args))
+        (result, seconds) = await loop.run_in_executor(
+            executor, functools.partial(timed_call, func, *args))
+        cpu.append(seconds)
+        return result
+
+
+async def convert_topology_async(source, topology_name='topology',
+                                 native=False, sparse=False, stats=None,
+                                 executor=None):
+    """
+    Convert a topology in memory, as :py:func:`convert_topology`, in an
+    executor
+
+    :param source: The ini-style topology as text, bytes or a file-like
+                   object returning either
+    :type source: str or bytes or file
+    :param str topology_name: The name of the topology
+                              (Default: topology)
+    :param bool native: Use the native topology parser rather than ConfigObj
+                        (Default: False)
+    :param bool sparse: Only validate the keys present in the topology
+                        (Default: False)
+    :param ConversionStats stats: Stats to record the time taken by each
+                                  stage and the counters in (Default: None)
+    :param executor: executor to convert in (Default: None, the loop's
+                     default executor)
+    :return: tuple of the converted topology and the list of assets it needs
+    :rtype: tuple
+    :raises ConvertError: when the topology cannot be read
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(convert_topology, source, topology_name,
+                                    native, sparse, stats))
+
+
+async def do_conversion_async(topology_def, topology_name, output_dir=None,
+                              debug=False, quiet=False, native=False,
+                              sparse=False, copy_workers=COPY_WORKERS,
+                              link_mode='copy', compact=False, force=False,
+                              semaphore=None, executor=None):
+    """
+    Convert the topology, unless it is unchanged since it was last converted,
+    as :py:func:`~gns3converter.main.do_conversion`
+
+    :param dict topology_def: Dict containing topology file and snapshot bool.
+                              For example:
+                              ``{'file': filename, 'snapshot': False}``
+    :param str topology_name: The name of the topology
+    :param str output_dir: The directory in which to output the topology.
+                           (Default: None)
+    :param bool debug: Enable debugging (Default: False)
+    :param bool quiet: No console printing (Default: False)
+    :param bool native: Use the native topology parser rather than ConfigObj
+                        (Default: False)
+    :param bool sparse: Only validate the keys present in the topology
+                        (Default: False)
+    :param int copy_workers: Number of file operations run at once when no
+                             semaphore is given (Default: 4)
+    :param str link_mode: How configs and images are added to the new
+                          topology, one of copy, hardlink, reflink or symlink
+                          (Default: copy)
+    :param bool compact: Write the topology without indentation
+                         (Default: False)
+    :param bool force: Convert the topology even if it is unchanged
+                       (Default: False)
+    :param asyncio.Semaphore semaphore: semaphore limiting the file
+        operations in flight, which may be shared between conversions
+        (Default: None, a new semaphore allowing copy_workers operations)
+    :param executor: executor to convert and run file operations in
+                     (Default: None, the loop's default executor)
+    :return: the stats of the conversion, or None if the topology was
+             unchanged
+    :rtype: dict or None
+    """
+    loop = asyncio.get_running_loop()
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(copy_workers)
+
+    if not force:
+        unchanged = await run_file_op(semaphore, is_unchanged, topology_def,
+                                      topology_name, output_dir, link_mode,
+                                      compact, executor=executor)
+        if unchanged:
+            log.debug('Topology unchanged: %s' % topology_def['file'])
+            if not topology_def['snapshot'] and not quiet:
+                print('Your topology is unchanged since it was last '
+                      'converted')
+            return None
+
+    stats = ConversionStats(topology_def['file'], topology_name,
+                            topology_def['snapshot'])
+    gns3_conv = Converter(topology_def['file'], debug, native, sparse)
+    new_top = await loop.run_in_executor(
+        executor, build_topology, gns3_conv, topology_name, stats)
+
+    await save_async(output_dir, gns3_conv, new_top,
+                     topology_def['snapshot'], quiet, link_mode, stats,
+                     compact, semaphore, executor, copy_workers)
+    return stats.as_dict()
+
+
+async def save_async(output_dir, converter, json_topology, snapshot, quiet,
+                     link_mode='copy', stats=None, compact=False,
+                     semaphore=None, executor=None,
+                     copy_workers=COPY_WORKERS):
+    """
+    Save the converted topology, as :py:func:`~gns3converter.main.save`
+
+    :param str output_dir: Output Directory
+    :param Converter converter: Converter instance
+    :param JSONTopology json_topology: JSON topology layout
+    :param bool snapshot: Is this a snapshot?
+    :param bool quiet: No console printing
+    :param str link_mode: How configs and images are added to the new
+                          topology, one of copy, hardlink, reflink or symlink
+                          (Default: copy)
+    :param ConversionStats stats: Stats to record the time taken to copy and
+                                  write the topology in (Default: None)
+    :param bool compact: Write the topology without indentation
+                         (Default: False)
+    :param asyncio.Semaphore semaphore: semaphore limiting the file
+        operations in flight (Default: None, a new semaphore allowing
+        copy_workers operations)
+    :param executor: executor to run file operations in (Default: None, the
+                     loop's default executor)
+    :param int copy_workers: Number of file operations run at once when no
+                             semaphore is given (Default: 4)
+    """
+    if stats is None:
+        stats = ConversionStats()
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(copy_workers)
+    copier = AssetCopier(copy_workers)
+    # CPU time of the file operations of each stage
+    copy_cpu = []
+    write_cpu = []
+    try:
+        topology_name = json_topology.name
+        (output_dir, topology_files_dir) = output_dirs(
+            output_dir, converter.topology, topology_name, snapshot)
+
+        with stats.stage('copy', cpu=False):
+            missing = await run_file_op(
+                semaphore, collect_assets, converter, output_dir,
+                topology_files_dir, snapshot, copier, link_mode,
+                executor=executor, cpu=copy_cpu)
+
+            # Run the copies and create the VM working directories together
+            pending = copier.pending
+            copier.pending = []
+            operations = [run_file_op(semaphore, func, *args,
+                                      executor=executor, cpu=copy_cpu)
+                          for (func, args) in pending]
+            make_dir = functools.partial(os.makedirs, exist_ok=True)
+            for vm_dir in (vm_dirs('vbox', json_topology.get_vboxes(),
+                                   output_dir, topology_name) +
+                           vm_dirs('qemu', json_topology.get_qemus(),
+                                   output_dir, topology_name)):
+                operations.append(run_file_op(semaphore, make_dir, vm_dir,
+                                              executor=executor,
+                                              cpu=copy_cpu))
+            results = await asyncio.gather(*operations,
+                                           return_exceptions=True)
+            # Raise the first error, if any, once everything has finished
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            # The copies come first, returning the bytes they copied
+            copier.bytes_copied += sum(results[:len(pending)])
+        stats.add_cpu('copy', sum(copy_cpu))
+        stats.count('bytes_copied', copier.bytes_copied)
+        warn_missing(*missing)
+
+        with stats.stage('write', cpu=False):
+            await run_file_op(semaphore, write_converted, output_dir,
+                              converter, json_topology, snapshot, quiet,
+                              copier, link_mode, compact, executor=executor,
+                              cpu=write_cpu)
+        stats.add_cpu('write', sum(write_cpu))
+    except OSError as error:
+        log.error(error)
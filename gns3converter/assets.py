@@ -0,0 +1,169 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+This module is used for copying the assets (configs, images etc.) of a
+topology to the converted topology
+"""
+import errno
+import logging
+import os
+import shutil
+from concurrent import futures
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Default number of threads used to copy assets
+COPY_WORKERS = 4
+# Ways an asset can be added to the converted topology
+LINK_MODES = ('copy', 'hardlink', 'reflink', 'symlink')
+# ioctl request to clone a file on Linux (btrfs, XFS etc.)
+FICLONE = 0x40049409
+
+log = logging.getLogger(__name__)
+
+
+class AssetCopier(object):
+    """
+    Collects the copies needed for a topology and runs them together in a
+    pool of threads
+
+    :param int workers: number of threads to copy with (Default: 4)
+    """
+    def __init__(self, workers=COPY_WORKERS):
+        self.workers = workers
+        self.pending = []
+        self.assets = []
+        self.targets = []
+        self.bytes_copied = 0
+
+    def submit(self, func, source, target, *args):
+        """
+        Add a copy to be run later by :py:meth:`run`
+
+        :param func: function doing the copy e.g. shutil.copy
+        :param str source: source file or directory
+        :param str target: target file or directory
+        :param args: other arguments for func
+        """
+        self.assets.append(source)
+        self.targets.append(target)
+        self.pending.append((func, (source, target) + args))
+
+    def add_missing(self, source):
+        """
+        Record an asset that could not be found to be copied
+
+        :param str source: source file
+        """
+        self.assets.append(source)
+
+    def run(self):
+        """
+        Run all of the pending copies, waiting for them to complete. The
+        first error raised by a copy, in the order they were added, is
+        raised again here. Each copy returns the number of bytes it copied,
+        which is added to :py:attr:`bytes_copied`, so that linked assets
+        are not counted.
+        """
+        pending = self.pending
+        self.pending = []
+
+        if self.workers <= 1 or len(pending) <= 1:
+            results = [func(*args) for (func, args) in pending]
+        else:
+            with futures.ThreadPoolExecutor(
+                    max_workers=self.workers) as executor:
+                running = [executor.submit(func, *args)
+                           for (func, args) in pending]
+            results = [future.result() for future in running]
+
+        self.bytes_copied += sum(results)
+
+
+def run_copy(copier, func, source, target, *args):
+    """
+    Copy now when there is no copier, otherwise add the copy to the copier
+
+    :param copier: copier to add the copy to, or None
+    :type copier: AssetCopier or None
+    :param func: function doing the copy e.g. shutil.copy
+    :param str source: source file or directory
+    :param str target: target file or directory
+    :param args: other arguments for func
+    """
+    if copier is None:
+        func(source, target, *args)
+    else:
+        copier.submit(func, source, target, *args)
+
+
+def copy_file(source, target, link_mode='copy'):
+    """
+    Copy a file, or link it to the target when a link mode is given. When
+    the link cannot be made, for example when the filesystem does not
+    support it, the file is copied instead.
+
+    :param str source: Source file
+    :param str target: Target file or directory
+    :param str link_mode: One of :py:data:`LINK_MODES` (Default: copy)
+    :return: number of bytes copied, 0 when the file was linked
+    :rtype: int
+    """
+    if os.path.isdir(target):
+        target = os.path.join(target, os.path.basename(source))
+    if os.path.lexists(target):
+        # Replace the asset from a previous conversion
+        os.remove(target)
+
+    if link_mode != 'copy':
+        try:
+            if link_mode == 'hardlink':
+                os.link(source, target)
+            elif link_mode == 'symlink':
+                os.symlink(os.path.abspath(source), target)
+            elif link_mode == 'reflink':
+                reflink(source, target)
+            else:
+                raise ValueError('Unknown link mode %s' % link_mode)
+            return 0
+        except OSError as error:
+            log.debug('Unable to %s %s, copying instead: %s' %
+                      (link_mode, source, error))
+
+    shutil.copy(source, target)
+    return os.path.getsize(target)
+
+
+def reflink(source, target):
+    """
+    Make a copy-on-write clone of a file (Linux only)
+
+    :param str source: Source file
+    :param str target: Target file
+    :raises OSError: when the file cannot be cloned
+    """
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, 'reflink is not supported')
+
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.remove(target)
+            raise
+    shutil.copymode(source, target)
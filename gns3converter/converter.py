@@ -16,18 +16,106 @@
  This class is the main gns3-converter class
 """
 from configobj import ConfigObj, flatten_errors
-from validate import Validator
-import sys
 import os.path
 import logging
-from pkg_resources import resource_stream
+import threading
+from concurrent import futures
+from gns3converter import netparser
 from gns3converter.adapters import PORT_TYPES
+from gns3converter.converterror import ConvertError
 from gns3converter.models import MODEL_TRANSFORM, EXTRA_CONF
-from gns3converter.node import Node
+from gns3converter.node import Node, count_node_ports
+from gns3converter.records import LinkRecord
 from gns3converter.interfaces import INTERFACE_RE, VBQ_INT_RE
-from gns3converter.topology import LegacyTopology
+from gns3converter.topology import LegacyTopology, TopologyIndex
 from gns3converter.utils import fix_path
 
+log = logging.getLogger(__name__)
+
+
+class ConfigSpec(object):
+    """
+    The configspec used to validate topologies. It is parsed once per process
+    and shared, along with a single Validator, by every Converter.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        # Only needed once a topology is read, so imported here to keep the
+        # start up of gns3-converter fast
+        import pkgutil
+        from validate import Validator
+
+        # pkgutil reads the configspec through the package loader, so it is
+        # also found when the package is in a zip (e.g. cx_Freeze builds)
+        configspec = pkgutil.get_data(__name__, 'configspec')
+        self._lines = configspec.decode('utf-8').splitlines()
+
+        self._configobj = None
+        self._netspec = None
+        self._parse_lock = threading.Lock()
+        self.validator = Validator()
+
+    @classmethod
+    def get(cls):
+        """
+        Get the shared configspec, parsing it on first use
+
+        :return: shared configspec
+        :rtype: ConfigSpec
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @property
+    def configobj(self):
+        """
+        Return the configspec parsed by ConfigObj
+
+        :return: configspec
+        :rtype: ConfigObj
+        """
+        if self._configobj is None:
+            with self._parse_lock:
+                if self._configobj is None:
+                    self._configobj = ConfigObj(
+                        configspec=self._lines).configspec
+        return self._configobj
+
+    @property
+    def netspec(self):
+        """
+        Return the configspec parsed by :py:mod:`gns3converter.netparser`
+
+        :return: configspec
+        :rtype: NetSection
+        """
+        if self._netspec is None:
+            with self._parse_lock:
+                if self._netspec is None:
+                    self._netspec = netparser.parse(self._lines, raw=True)
+        return self._netspec
+
+
+class ConversionContext(object):
+    """
+    The state of a conversion: the next port ID, and the connections,
+    configs and images collected while the nodes and images are generated.
+    Each Converter has its own context, so that conversions can run in
+    several threads at once with a Converter each.
+    """
+    __slots__ = ('port_id', 'links', 'configs', 'images')
+
+    def __init__(self):
+        self.port_id = 1
+        self.links = []
+        self.configs = []
+        self.images = []
+
 
 class Converter(object):
     """
@@ -35,18 +123,26 @@ class Converter(object):
 
     :param str topology: Filename of the ini-style topology
     :param bool debug: enable debugging (Default: False)
+    :param bool native: use the native parser from
+                        :py:mod:`gns3converter.netparser` rather than
+                        ConfigObj (Default: False)
+    :param bool sparse: only validate the keys present in the topology,
+                        without adding a default for every key in the
+                        configspec (Default: False)
+    :param list content: lines of the topology, read instead of the topology
+                         file (Default: None)
     """
-    def __init__(self, topology, debug=False):
+    def __init__(self, topology, debug=False, native=False, sparse=False,
+                 content=None):
         self._topology = topology
         self._debug = debug
+        self._native = native
+        self._sparse = sparse
+        self._content = content
 
-        self.port_id = 1
-        self.links = []
-        self.configs = []
-        self.images = []
+        self.context = ConversionContext()
 
-        logging.getLogger(__name__)
-        logging.debug('Topology file: {}'.format(self._topology))
+        log.debug('Topology file: {}'.format(self._topology))
 
     @property
     def topology(self):
@@ -58,36 +154,104 @@ class Converter(object):
         """
         return self._topology
 
+    @property
+    def port_id(self):
+        """
+        The next port ID, from the context of the converter
+        """
+        return self.context.port_id
+
+    @port_id.setter
+    def port_id(self, port_id):
+        self.context.port_id = port_id
+
+    @property
+    def links(self):
+        """
+        The connections of the nodes generated, from the context of the
+        converter
+        """
+        return self.context.links
+
+    @links.setter
+    def links(self, links):
+        self.context.links = links
+
+    @property
+    def configs(self):
+        """
+        The router configs to copy, from the context of the converter
+        """
+        return self.context.configs
+
+    @configs.setter
+    def configs(self, configs):
+        self.context.configs = configs
+
+    @property
+    def images(self):
+        """
+        The images to copy, from the context of the converter
+        """
+        return self.context.images
+
+    @images.setter
+    def images(self, images):
+        self.context.images = images
+
     def read_topology(self):
         """
-        Read the ini-style topology file using ConfigObj
+        Read the ini-style topology file, or the content given instead,
+        using ConfigObj, or the native parser if selected
 
         :return config: Topology parsed by :py:mod:`ConfigObj`
-        :rtype: ConfigObj
+        :rtype: ConfigObj or NetSection
+        :raises ConvertError: when the topology cannot be read or is invalid
         """
-        configspec = resource_stream(__name__, 'configspec')
+        configspec = ConfigSpec.get()
         try:
-            handle = open(self._topology)
-            handle.close()
+            if self._content is None:
+                handle = open(self._topology)
+                handle.close()
+                source = self._topology
+            else:
+                # ConfigObj changes the list it is given
+                source = list(self._content)
             try:
-                config = ConfigObj(self._topology,
-                                   configspec=configspec,
-                                   raise_errors=True,
-                                   list_values=False,
-                                   encoding='utf-8')
-            except SyntaxError:
-                logging.error('Error loading .net file')
-                sys.exit(1)
-        except IOError:
-            logging.error('Cannot open topology file')
-            sys.exit(1)
-
-        vtor = Validator()
-        res = config.validate(vtor, preserve_errors=True)
+                if self._native and self._content is None:
+                    config = netparser.read_topology(self._topology)
+                elif self._native:
+                    config = netparser.parse(source)
+                elif self._sparse:
+                    config = ConfigObj(source,
+                                       raise_errors=True,
+                                       list_values=False,
+                                       encoding='utf-8')
+                else:
+                    config = ConfigObj(source,
+                                       configspec=configspec.configobj,
+                                       raise_errors=True,
+                                       list_values=False,
+                                       encoding='utf-8')
+            except SyntaxError as error:
+                raise ConvertError('Error loading .net file', error)
+        except IOError as error:
+            raise ConvertError('Cannot open topology file', error)
+
+        if self._native or self._sparse:
+            res = netparser.validate(config, configspec.netspec,
+                                     configspec.validator, self._sparse)
+        else:
+            res = config.validate(configspec.validator, preserve_errors=True)
         if res:
-            logging.debug('Validation passed')
+            log.debug('Validation passed')
         elif not res:
-            for entry in flatten_errors(config, res):
+            if self._native or self._sparse:
+                errors = res
+            else:
+                errors = flatten_errors(config, res)
+            messages = []
+            for entry in errors:
                 # each entry is a tuple
                 (section_list, key, error) = entry
                 if key is not None:
@@ -98,11 +262,9 @@ class Converter(object):
 
                 if error is False:
                     error = 'Missing value or section'
-                print(section_string, ' = ', error)
-                input('Press ENTER to continue')
-                sys.exit(1)
+                messages.append('%s = %s' % (section_string, error))
+            raise ConvertError('Invalid topology: %s' % '; '.join(messages))
 
-        configspec.close()
         return config
 
     def process_topology(self, old_top):
@@ -160,159 +322,172 @@ class Converter(object):
         """
         return config.sections
 
-    def generate_nodes(self, topology):
+    def generate_nodes(self, topology, jobs=1, context=None):
         """
         Generate a list of nodes for the new topology
 
         :param dict topology: processed topology from
                               :py:meth:`process_topology`
-        :return: a list of dicts on nodes
-        :rtype: list
+        :param int jobs: Number of processes building the nodes. The nodes
+                         are built in this process when 1 (Default: 1)
+        :param ConversionContext context: context to number the ports from
+                                          and add the connections and
+                                          configs to (Default: None, the
+                                          context of the converter)
+        :return: a list of nodes
+        :rtype: list of :py:class:`~gns3converter.records.NodeRecord`
         """
-        nodes = []
-
+        if context is None:
+            context = self.context
         devices = topology['devices']
         hypervisors = topology['conf']
 
+        if jobs > 1 and len(devices) > 1:
+            nodes = self.generate_nodes_parallel(devices, hypervisors, jobs,
+                                                 context)
+            if nodes is not None:
+                return nodes
+
+        nodes = []
         for device in sorted(devices):
-            hv_id = devices[device]['hv_id']
-            try:
-                tmp_node = Node(hypervisors[hv_id], self.port_id)
-            except IndexError:
-                tmp_node = Node({}, self.port_id)
-            # Start building the structure
-            tmp_node.node['properties']['name'] = device
-            tmp_node.node['id'] = devices[device]['node_id']
-            tmp_node.node['x'] = devices[device]['x']
-            tmp_node.node['y'] = devices[device]['y']
-            tmp_node.device_info['from'] = devices[device]['from']
-            tmp_node.device_info['type'] = devices[device]['type']
-            tmp_node.device_info['desc'] = devices[device]['desc']
-
-            if 'ext_conf' in devices[device]:
-                tmp_node.device_info['ext_conf'] = devices[device]['ext_conf']
-
-            # Node Label
-            tmp_node.node['label']['text'] = device
-            if 'hx' in devices[device] and 'hy' in devices[device]:
-                tmp_node.node['label']['x'] = devices[device]['hx']
-                tmp_node.node['label']['y'] = devices[device]['hy']
-
-            if 'model' in devices[device]:
-                tmp_node.device_info['model'] = devices[device]['model']
-            else:
-                tmp_node.device_info['model'] = ''
-
-            tmp_node.set_description()
-            tmp_node.set_type()
-
-            # Now lets process the rest
-            for item in sorted(devices[device]):
-                tmp_node.add_device_items(item, devices[device])
-
-            if tmp_node.device_info['type'] == 'Router':
-                tmp_node.add_info_from_hv()
-                tmp_node.node['router_id'] = devices[device]['node_id']
-                tmp_node.calc_mb_ports()
-
-                for item in sorted(tmp_node.node['properties']):
-                    if item.startswith('slot'):
-                        tmp_node.add_slot_ports(item)
-                    elif item.startswith('wic'):
-                        tmp_node.add_wic_ports(item)
-
-                # Add default ports to 7200 and 3660
-                if tmp_node.device_info['model'] == 'c7200':
-                    # tmp_node.add_slot_ports('slot0')
-                    # C7200 doesnt have any ports by default
-                    pass
-                elif tmp_node.device_info['model'] == 'c3600' \
-                        and tmp_node.device_info['chassis'] == '3660':
-                    tmp_node.node['properties']['slot0'] = 'Leopard-2FE'
-
-                # Calculate the router links
-                tmp_node.calc_device_links()
-
-            elif tmp_node.device_info['type'] == 'Cloud':
-                try:
-                    tmp_node.calc_cloud_connection()
-                except RuntimeError as err:
-                    print(err)
-
-            elif tmp_node.device_info['type'] == 'FrameRelaySwitch':
-                tmp_node.process_mappings()
-
-            elif tmp_node.device_info['type'] == 'VirtualBoxVM':
-                tmp_node.add_to_virtualbox()
-                tmp_node.add_vm_ethernet_ports()
-                tmp_node.calc_device_links()
-
-            elif tmp_node.device_info['type'] == 'QemuVM':
-                tmp_node.add_to_qemu()
-                tmp_node.set_qemu_symbol()
-                tmp_node.add_vm_ethernet_ports()
-                tmp_node.calc_device_links()
+            tmp_node = build_node(device, devices[device], hypervisors,
+                                  context.port_id)
 
             # Get the data we need back from the node instance
-            self.links.extend(tmp_node.links)
-            self.configs.extend(tmp_node.config)
-            self.port_id += tmp_node.get_nb_added_ports(self.port_id)
+            context.links.extend(tmp_node.links)
+            context.configs.extend(tmp_node.config)
+            context.port_id += tmp_node.get_nb_added_ports(context.port_id)
 
             nodes.append(tmp_node.node)
 
         return nodes
 
-    def generate_links(self, nodes):
+    def generate_nodes_parallel(self, devices, hypervisors, jobs,
+                                context=None):
+        """
+        Generate the nodes in a pool of worker processes. The number of ports
+        of each node is counted first, giving the first port ID of each node
+        from the sum of the ports before it, so that the nodes can then be
+        built independently.
+
+        :param dict devices: devices of the processed topology
+        :param list hypervisors: hypervisor confs of the processed topology
+        :param int jobs: Number of worker processes
+        :param ConversionContext context: context to number the ports from
+                                          and add the connections and
+                                          configs to (Default: None, the
+                                          context of the converter)
+        :return: a list of nodes, or None when a node was built with another
+                 number of ports than counted
+        :rtype: list or None
+        """
+        if context is None:
+            context = self.context
+        names = sorted(devices)
+        # First port ID of each device, and the port ID after the last one
+        port_ids = [context.port_id]
+        for name in names:
+            port_ids.append(port_ids[-1] + count_node_ports(
+                devices[name], device_hypervisor(devices[name], hypervisors)))
+
+        work = [(name, devices[name], port_id)
+                for (name, port_id) in zip(names, port_ids)]
+        # Several chunks for each worker, to balance the load
+        size = -(-len(work) // (jobs * 4))
+        chunks = [work[i:i + size] for i in range(0, len(work), size)]
+        with futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = [result for chunk in
+                       executor.map(build_nodes, chunks,
+                                    [hypervisors] * len(chunks))
+                       for result in chunk]
+
+        nodes = []
+        links = []
+        configs = []
+        for (i, (node, node_links, config, nb_ports)) in enumerate(results):
+            if port_ids[i] + nb_ports != port_ids[i + 1]:
+                log.debug('Node %s has %s ports, not %s as counted, '
+                          'building the nodes again in order' %
+                          (names[i], nb_ports,
+                           port_ids[i + 1] - port_ids[i]))
+                return None
+            nodes.append(node)
+            links.extend(node_links)
+            configs.extend(config)
+
+        context.links.extend(links)
+        context.configs.extend(configs)
+        context.port_id = port_ids[-1]
+        return nodes
+
+    def generate_links(self, nodes, context=None):
         """
         Generate a list of links
 
         :param list nodes: A list of nodes from :py:meth:`generate_nodes`
+        :param ConversionContext context: context holding the connections of
+                                          the nodes (Default: None, the
+                                          context of the converter)
         :return: list of links
-        :rtype: list
+        :rtype: list of :py:class:`~gns3converter.records.LinkRecord`
         """
+        if context is None:
+            context = self.context
+        index = TopologyIndex(nodes)
         new_links = []
 
-        for link in self.links:
+        for link in context.links:
             # Expand port name if required
-            if INTERFACE_RE.search(link['dest_port'])\
-                    or VBQ_INT_RE.search(link['dest_port']):
-                int_type = link['dest_port'][0]
-                dest_port = link['dest_port'].replace(
+            if INTERFACE_RE.search(link.dest_port)\
+                    or VBQ_INT_RE.search(link.dest_port):
+                int_type = link.dest_port[0]
+                dest_port = link.dest_port.replace(
                     int_type, PORT_TYPES[int_type.upper()])
             else:
-                dest_port = link['dest_port']
+                dest_port = link.dest_port
 
             # Convert dest_dev and port to id's
             dest_details = self.convert_destination_to_id(
-                link['dest_dev'], dest_port, nodes)
+                link.dest_dev, dest_port, index)
 
             desc = 'Link from %s port %s to %s port %s' % \
-                   (link['source_dev'], link['source_port_name'],
+                   (link.source_dev, link.source_port_name,
                     dest_details['name'], dest_port)
 
-            new_links.append({'description': desc,
-                              'destination_node_id': dest_details['id'],
-                              'destination_port_id': dest_details['pid'],
-                              'source_port_id': link['source_port_id'],
-                              'source_node_id': link['source_node_id']})
+            new_links.append(LinkRecord(link.source_node_id,
+                                        link.source_port_id,
+                                        dest_details['id'],
+                                        dest_details['pid'], desc))
 
         # Remove duplicate links and add link_id
-        link_id = 1
+        unique_links = []
+        seen = set()
         for link in new_links:
-            t_link = str(link['source_node_id']) + ':' + \
-                str(link['source_port_id'])
-            for link2 in new_links:
-                d_link = str(link2['destination_node_id']) + ':' + \
-                    str(link2['destination_port_id'])
-                if t_link == d_link:
-                    new_links.remove(link2)
-                    break
-            link['id'] = link_id
-            link_id += 1
+            edge = self.link_edge(link)
+            if edge in seen:
+                continue
+            seen.add(edge)
 
-            self.add_node_connection(link, nodes)
+            link.id = len(unique_links) + 1
+            unique_links.append(link)
 
-        return new_links
+            self.add_node_connection(link, index)
+
+        return unique_links
+
+    @staticmethod
+    def link_edge(link):
+        """
+        Get the canonical (undirected) edge for a link, so that a link and
+        its reverse map to the same key
+
+        :param LinkRecord link: link definition
+        :return: both (node_id, port_id) endpoints of the link
+        :rtype: frozenset
+        """
+        return frozenset(((link.source_node_id, link.source_port_id),
+                          (link.destination_node_id,
+                           link.destination_port_id)))
 
     @staticmethod
     def device_id_from_name(device_name, nodes):
@@ -320,16 +495,15 @@ class Converter(object):
         Get the device ID when given a device name
 
         :param str device_name: device name
-        :param list nodes: list of nodes from :py:meth:`generate_nodes`
+        :param nodes: list of nodes from :py:meth:`generate_nodes`
+        :type nodes: list or TopologyIndex
         :return: device ID
         :rtype: int
         """
-        device_id = None
-        for node in nodes:
-            if device_name == node['properties']['name']:
-                device_id = node['id']
-                break
-        return device_id
+        node = TopologyIndex.from_nodes(nodes).node_by_name.get(device_name)
+        if node is None:
+            return None
+        return node.id
 
     @staticmethod
     def port_id_from_name(port_name, device_id, nodes):
@@ -338,19 +512,16 @@ class Converter(object):
 
         :param str port_name: port name
         :param str device_id: device ID
-        :param list nodes: list of nodes from :py:meth:`generate_nodes`
+        :param nodes: list of nodes from :py:meth:`generate_nodes`
+        :type nodes: list or TopologyIndex
         :return: port ID
         :rtype: int
         """
-        port_id = None
-        for node in nodes:
-            if device_id == node['id']:
-                for port in node['ports']:
-                    if port_name == port['name']:
-                        port_id = port['id']
-                        break
-                break
-        return port_id
+        port = TopologyIndex.from_nodes(nodes).port_by_name.get(
+            (device_id, port_name))
+        if port is None:
+            return None
+        return port.id
 
     @staticmethod
     def convert_destination_to_id(destination_node, destination_port, nodes):
@@ -359,32 +530,30 @@ class Converter(object):
 
         :param str destination_node: Destination node name
         :param str destination_port: Destination port name
-        :param list nodes: list of nodes from :py:meth:`generate_nodes`
+        :param nodes: list of nodes from :py:meth:`generate_nodes`
+        :type nodes: list or TopologyIndex
         :return: dict containing device ID, device name and port ID
         :rtype: dict
         """
+        index = TopologyIndex.from_nodes(nodes)
         device_id = None
         device_name = None
         port_id = None
         if destination_node != 'NIO':
-            for node in nodes:
-                if destination_node == node['properties']['name']:
-                    device_id = node['id']
-                    device_name = destination_node
-                    for port in node['ports']:
-                        if destination_port == port['name']:
-                            port_id = port['id']
-                            break
-                    break
+            node = index.node_by_name.get(destination_node)
+            if node is not None:
+                device_id = node.id
+                device_name = destination_node
+                port = index.port_by_name.get((device_id, destination_port))
+                if port is not None:
+                    port_id = port.id
         else:
-            for node in nodes:
-                if node['type'] == 'Cloud':
-                    for port in node['ports']:
-                        if destination_port.lower() == port['name'].lower():
-                            device_id = node['id']
-                            device_name = node['properties']['name']
-                            port_id = port['id']
-                            break
+            nio = index.nio_port.get(destination_port.lower())
+            if nio is not None:
+                (node, port) = nio
+                device_id = node.id
+                device_name = node.properties['name']
+                port_id = port.id
 
         info = {'id': device_id,
                 'name': device_name,
@@ -397,16 +566,15 @@ class Converter(object):
         Get the name of a node when given the node_id
 
         :param int node_id: The ID of a node
-        :param list nodes: list of nodes from :py:meth:`generate_nodes`
+        :param nodes: list of nodes from :py:meth:`generate_nodes`
+        :type nodes: list or TopologyIndex
         :return: node name
         :rtype: str
         """
-        node_name = ''
-        for node in nodes:
-            if node['id'] == node_id:
-                node_name = node['properties']['name']
-                break
-        return node_name
+        node = TopologyIndex.from_nodes(nodes).node_by_id.get(node_id)
+        if node is None:
+            return ''
+        return node.properties['name']
 
     @staticmethod
     def get_port_name_from_id(node_id, port_id, nodes):
@@ -415,53 +583,52 @@ class Converter(object):
 
         :param int node_id: node ID
         :param int port_id: port ID
-        :param list nodes: list of nodes from :py:meth:`generate_nodes`
+        :param nodes: list of nodes from :py:meth:`generate_nodes`
+        :type nodes: list or TopologyIndex
         :return: port name
         :rtype: str
         """
-        port_name = ''
-        for node in nodes:
-            if node['id'] == node_id:
-                for port in node['ports']:
-                    if port['id'] == port_id:
-                        port_name = port['name']
-                        break
-        return port_name
+        port = TopologyIndex.from_nodes(nodes).port_by_id.get((node_id,
+                                                               port_id))
+        if port is None:
+            return ''
+        return port.name
 
     def add_node_connection(self, link, nodes):
         """
         Add a connection to a node
 
-        :param dict link: link definition
-        :param list nodes: list of nodes from :py:meth:`generate_nodes`
+        :param LinkRecord link: link definition
+        :param nodes: list of nodes from :py:meth:`generate_nodes`
+        :type nodes: list or TopologyIndex
         """
+        index = TopologyIndex.from_nodes(nodes)
         # Description
         src_desc = 'connected to %s on port %s' % \
-                   (self.get_node_name_from_id(link['destination_node_id'],
-                                               nodes),
-                    self.get_port_name_from_id(link['destination_node_id'],
-                                               link['destination_port_id'],
-                                               nodes))
+                   (self.get_node_name_from_id(link.destination_node_id,
+                                               index),
+                    self.get_port_name_from_id(link.destination_node_id,
+                                               link.destination_port_id,
+                                               index))
         dest_desc = 'connected to %s on port %s' % \
-                    (self.get_node_name_from_id(link['source_node_id'],
-                                                nodes),
-                     self.get_port_name_from_id(link['source_node_id'],
-                                                link['source_port_id'],
-                                                nodes))
+                    (self.get_node_name_from_id(link.source_node_id,
+                                                index),
+                     self.get_port_name_from_id(link.source_node_id,
+                                                link.source_port_id,
+                                                index))
         # Add source connections
-        for node in nodes:
-            if node['id'] == link['source_node_id']:
-                for port in node['ports']:
-                    if port['id'] == link['source_port_id']:
-                        port['link_id'] = link['id']
-                        port['description'] = src_desc
-                        break
-            elif node['id'] == link['destination_node_id']:
-                for port in node['ports']:
-                    if port['id'] == link['destination_port_id']:
-                        port['link_id'] = link['id']
-                        port['description'] = dest_desc
-                        break
+        src_port = index.port_by_id.get((link.source_node_id,
+                                         link.source_port_id))
+        if src_port is not None:
+            src_port.link_id = link.id
+            src_port.description = src_desc
+        # Add destination connections
+        if link.destination_node_id != link.source_node_id:
+            dest_port = index.port_by_id.get((link.destination_node_id,
+                                              link.destination_port_id))
+            if dest_port is not None:
+                dest_port.link_id = link.id
+                dest_port.description = dest_desc
 
     @staticmethod
     def generate_shapes(shapes):
@@ -504,14 +671,19 @@ class Converter(object):
 
         return new_notes
 
-    def generate_images(self, pixmaps):
+    def generate_images(self, pixmaps, context=None):
         """
         Generate the images list and store the images to copy
 
         :param dict pixmaps: A dict of converted pixmaps from the old topology
+        :param ConversionContext context: context to add the images to copy
+                                          to (Default: None, the context of
+                                          the converter)
         :return: A list of images
         :rtype: list
         """
+        if context is None:
+            context = self.context
         new_images = []
 
         for image in pixmaps:
@@ -522,10 +694,124 @@ class Converter(object):
                                         os.path.basename(
                                             pixmaps[image][img_item]))
                     tmp_image['path'] = fix_path(path)
-                    self.images.append(pixmaps[image][img_item])
+                    context.images.append(pixmaps[image][img_item])
                 else:
                     tmp_image[img_item] = pixmaps[image][img_item]
 
             new_images.append(tmp_image)
 
         return new_images
+
+
+def device_hypervisor(device, hypervisors):
+    """
+    Get the hypervisor conf of a device
+
+    :param dict device: device of the processed topology
+    :param list hypervisors: hypervisor confs of the processed topology
+    :return: hypervisor conf, empty when the device has none
+    :rtype: dict
+    """
+    try:
+        return hypervisors[device['hv_id']]
+    except IndexError:
+        return {}
+
+
+def build_node(name, device, hypervisors, port_id):
+    """
+    Build the node of a device
+
+    :param str name: device name
+    :param dict device: device of the processed topology
+    :param list hypervisors: hypervisor confs of the processed topology
+    :param int port_id: first port ID of the node
+    :return: the node instance, holding the node, its links and config
+    :rtype: Node
+    """
+    tmp_node = Node(device_hypervisor(device, hypervisors), port_id)
+    # Start building the structure
+    tmp_node.node.properties['name'] = name
+    tmp_node.node.id = device['node_id']
+    tmp_node.node.x = device['x']
+    tmp_node.node.y = device['y']
+    tmp_node.device_info.origin = device['from']
+    tmp_node.device_info.type = device['type']
+    tmp_node.device_info.desc = device['desc']
+
+    if 'ext_conf' in device:
+        tmp_node.device_info.ext_conf = device['ext_conf']
+
+    # Node Label
+    tmp_node.node.label['text'] = name
+    if 'hx' in device and 'hy' in device:
+        tmp_node.node.label['x'] = device['hx']
+        tmp_node.node.label['y'] = device['hy']
+
+    if 'model' in device:
+        tmp_node.device_info.model = device['model']
+    else:
+        tmp_node.device_info.model = ''
+
+    tmp_node.set_description()
+    tmp_node.set_type()
+
+    # Now lets process the rest
+    for item in sorted(device):
+        tmp_node.add_device_items(item, device)
+
+    if tmp_node.device_info.type == 'Router':
+        tmp_node.add_info_from_hv()
+        tmp_node.node.router_id = device['node_id']
+        tmp_node.add_router_ports()
+
+        # Add default ports to 7200 and 3660
+        if tmp_node.device_info.model == 'c7200':
+            # tmp_node.add_slot_ports('slot0')
+            # C7200 doesnt have any ports by default
+            pass
+        elif tmp_node.device_info.model == 'c3600' \
+                and tmp_node.device_info.chassis == '3660':
+            tmp_node.node.properties['slot0'] = 'Leopard-2FE'
+
+        # Calculate the router links
+        tmp_node.calc_device_links()
+
+    elif tmp_node.device_info.type == 'Cloud':
+        try:
+            tmp_node.calc_cloud_connection()
+        except RuntimeError as err:
+            print(err)
+
+    elif tmp_node.device_info.type == 'FrameRelaySwitch':
+        tmp_node.process_mappings()
+
+    elif tmp_node.device_info.type == 'VirtualBoxVM':
+        tmp_node.add_to_virtualbox()
+        tmp_node.add_vm_ethernet_ports()
+        tmp_node.calc_device_links()
+
+    elif tmp_node.device_info.type == 'QemuVM':
+        tmp_node.add_to_qemu()
+        tmp_node.set_qemu_symbol()
+        tmp_node.add_vm_ethernet_ports()
+        tmp_node.calc_device_links()
+
+    return tmp_node
+
+
+def build_nodes(devices, hypervisors):
+    """
+    Build the nodes of several devices, e.g. in a worker process
+
+    :param list devices: (name, device, first port ID) of each device
+    :param list hypervisors: hypervisor confs of the processed topology
+    :return: (node, links, config, number of ports) of each device
+    :rtype: list
+    """
+    results = []
+    for (name, device, port_id) in devices:
+        tmp_node = build_node(name, device, hypervisors, port_id)
+        results.append((tmp_node.node, tmp_node.links, tmp_node.config,
+                        tmp_node.get_nb_added_ports(port_id)))
+    return results
@@ -36,6 +36,9 @@ class Interfaces(object):
 
     :param int port_id: starting port ID
     """
+    __slots__ = ('interfaces', 'links', 'port_id', 'connections', 'mappings',
+                 'port_numbering')
+
     def __init__(self, port_id):
         self.interfaces = []
         self.links = []
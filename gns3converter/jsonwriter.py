@@ -0,0 +1,99 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+This module is used for writing the converted topology (.gns3) file.
+
+The topology is written section by section, encoding one node, link etc.
+at a time, rather than encoding the whole document in one go. The indented
+output is identical to ``json.dump(topology, file, indent=4,
+sort_keys=True)``, while the compact output has no whitespace at all.
+"""
+import json
+import types
+
+# Default indent of the topology file
+INDENT = 4
+# Number of levels of the topology written section by section: the
+# document, its topology dict and the lists of nodes, links etc.
+STREAM_DEPTH = 3
+
+
+def write_topology(file, topology, compact=False):
+    """
+    Write a topology as JSON
+
+    :param file: file opened for writing text
+    :param dict topology: topology from
+        :py:meth:`~gns3converter.topology.JSONTopology.get_topology`, the
+        sections (nodes, links etc.) may be lists or generators
+    :param bool compact: Write without indentation or spaces
+                         (Default: False)
+    """
+    if compact:
+        encoder = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+    else:
+        encoder = json.JSONEncoder(sort_keys=True, indent=INDENT)
+    _write_value(file, topology, encoder, 0, STREAM_DEPTH)
+
+
+def _write_value(file, value, encoder, level, depth):
+    """
+    Write a value, streaming dicts and lists down to the given depth and
+    encoding anything below it in one go
+
+    :param file: file opened for writing text
+    :param value: value to write
+    :param json.JSONEncoder encoder: encoder for the values below the
+                                     streamed depth
+    :param int level: indentation level of the value
+    :param int depth: number of levels left to stream
+    """
+    is_list = isinstance(value, (list, tuple, types.GeneratorType))
+    if depth == 0 or not (is_list or isinstance(value, dict)):
+        chunk = encoder.encode(value)
+        if encoder.indent is not None and level > 0:
+            # Values are encoded at level 0, so indent them to this level
+            chunk = chunk.replace('\n', '\n' + ' ' * (encoder.indent * level))
+        file.write(chunk)
+        return
+
+    if encoder.indent is None:
+        newline = ''
+        closing = ''
+    else:
+        newline = '\n' + ' ' * (encoder.indent * (level + 1))
+        closing = '\n' + ' ' * (encoder.indent * level)
+
+    if is_list:
+        (start, end) = ('[', ']')
+        items = ((None, item) for item in value)
+    else:
+        (start, end) = ('{', '}')
+        items = ((key, value[key]) for key in sorted(value))
+
+    file.write(start)
+    first = True
+    for (key, item) in items:
+        if first:
+            file.write(newline)
+            first = False
+        else:
+            file.write(encoder.item_separator + newline)
+        if key is not None:
+            file.write(json.dumps(key) + encoder.key_separator)
+        _write_value(file, item, encoder, level + 1, depth - 1)
+    if not first:
+        file.write(closing)
+    file.write(end)
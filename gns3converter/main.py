@@ -12,32 +12,62 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
+import hashlib
 import json
 import os
+import sys
 import shutil
 import argparse
+import contextlib
 import logging
 import re
 import glob
+from concurrent import futures
 from gns3converter import __version__
+from gns3converter.assets import AssetCopier, COPY_WORKERS, LINK_MODES, \
+    copy_file, run_copy
 from gns3converter.converter import Converter
 from gns3converter.converterror import ConvertError
+from gns3converter.jsonwriter import write_topology
+from gns3converter.manifest import build_manifest, is_up_to_date, \
+    manifest_path, write_manifest
+from gns3converter.stats import ConversionStats, count_sections
 from gns3converter.topology import JSONTopology
 
 LOG_MSG_FMT = '[%(levelname)1.1s %(asctime)s %(module)s:%(lineno)d] ' \
               '%(message)s'
 LOG_DATE_FMT = '%y%m%d %H:%M:%S'
 
+log = logging.getLogger(__name__)
+
 
 def main():
     """
     Entry point for gns3-converter
     """
+    if sys.argv[1:2] == ['serve']:
+        from gns3converter import server
+        server.main(sys.argv[2:])
+        return
+
     arg_parse = setup_argparse()
     args = arg_parse.parse_args()
 
-    if not args.quiet:
-        print('GNS3 Topology Converter')
+    # Convert many topologies when given several files or a directory
+    bulk = len(args.topology) > 1 or os.path.isdir(args.topology[0])
+    if bulk:
+        topologies = get_topologies(args.topology)
+    else:
+        topology_file = args.topology[0]
+        # Add the main topology to the list of files to convert
+        if topology_file == 'topology.net':
+            topology_file = os.path.join(os.getcwd(), 'topology.net')
+        topologies = [topology_file]
+
+    if args.stats not in (None, '-') and \
+            is_topology_file(args.stats, topologies):
+        arg_parse.error('--stats %s would overwrite a topology being '
+                        'converted' % args.stats)
 
     if args.debug:
         logging_level = logging.DEBUG
@@ -47,23 +77,81 @@ def main():
     logging.basicConfig(level=logging_level,
                         format=LOG_MSG_FMT, datefmt=LOG_DATE_FMT)
 
-    logging.getLogger(__name__)
+    # Keep standard output for the stats when they are written to it
+    if args.stats == '-':
+        output = sys.stderr
+    else:
+        output = sys.stdout
+    with contextlib.redirect_stdout(output):
+        (stats, failed) = convert_args(args, topologies, bulk)
 
-    # Add the main topology to the list of files to convert
-    if args.topology == 'topology.net':
-        args.topology = os.path.join(os.getcwd(), 'topology.net')
+    if args.stats is not None:
+        write_stats(args.stats, stats)
+    if failed:
+        sys.exit(1)
 
-    topology_files = [{'file': topology_abspath(args.topology),
-                       'snapshot': False}]
 
-    # Add any snapshot topologies to be converted
-    topology_files.extend(get_snapshots(args.topology))
+def convert_args(args, topologies, bulk):
+    """
+    Convert the topologies given on the command line
+
+    :param args: parsed command line arguments
+    :param list topologies: Topology files to convert
+    :param bool bulk: Convert the topologies in bulk mode
+    :return: tuple of the stats of the topologies converted and whether any
+             of them failed to convert
+    :rtype: tuple
+    """
+    if not args.quiet:
+        print('GNS3 Topology Converter')
 
-    topology_name = name(args.topology, args.name)
+    if bulk:
+        if args.name is not None:
+            log.warning('Ignoring the topology name in bulk mode')
+        results = bulk_conversion(topologies, args.output, args.jobs,
+                                  args.debug, args.quiet, args.topology,
+                                  **conversion_options(args))
+        if not args.quiet:
+            print_summary(results)
+        return ([stats for result in results for stats in result['stats']],
+                any(result['error'] is not None for result in results))
 
-    # Do the conversion
-    for topology in topology_files:
-        do_conversion(topology, topology_name, args.output, args.debug)
+    topology_file = topologies[0]
+    topology_def = {'file': topology_abspath(topology_file),
+                    'snapshot': False}
+
+    topology_name = name(topology_file, args.name)
+
+    stats = []
+    try:
+        # Do the conversion
+        stats.append(do_conversion(topology_def, topology_name, args.output,
+                                   args.debug, args.quiet,
+                                   **conversion_options(args)))
+
+        # Convert any snapshot topologies
+        stats.extend(convert_snapshots(get_snapshots(topology_file),
+                                       topology_name, args.output,
+                                       args.debug, jobs=args.jobs,
+                                       **conversion_options(args)))
+    except ConvertError as error:
+        log.error(error)
+        return ([item for item in stats if item is not None], True)
+    return ([item for item in stats if item is not None], False)
+
+
+def is_topology_file(path, topologies):
+    """
+    Check whether a path is one of the topology files being converted
+
+    :param str path: path to check
+    :param list topologies: Topology files to convert
+    :return: True when the path is one of the topologies
+    :rtype: bool
+    """
+    path = os.path.realpath(path)
+    return any(path == os.path.realpath(topology)
+               for topology in topologies)
 
 
 def setup_argparse():
@@ -83,21 +171,90 @@ def setup_argparse():
                                              'name of the old project '
                                              'directory)')
     parser.add_argument('-o', '--output', help='Output directory')
-    parser.add_argument('topology', nargs='?', default='topology.net',
-                        help='GNS3 .net topology file (default: topology.net)')
+    parser.add_argument('topology', nargs='*', default=['topology.net'],
+                        help='GNS3 .net topology file (default: '
+                             'topology.net). Several files, or directories '
+                             'to search for topology.net files, may be given '
+                             'to convert them in bulk')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help='Number of topologies or snapshots to convert '
+                             'in parallel (default: number of CPUs)')
+    parser.add_argument('--node-jobs', type=int, default=1, metavar='N',
+                        help='Number of processes building the nodes of '
+                             'each topology (default: 1)')
     parser.add_argument('--debug',
                         help='Enable debugging output',
                         action='store_true')
     parser.add_argument('-q', '--quiet',
                         help='Quiet-mode (no output to console)',
                         action='store_true')
+    parser.add_argument('--parser', choices=('configobj', 'native'),
+                        default='configobj',
+                        help='Parser used to read the topology (default: '
+                             'configobj)')
+    parser.add_argument('--copy-workers', type=int, default=COPY_WORKERS,
+                        help='Number of threads used to copy configs and '
+                             'images (default: %s)' % COPY_WORKERS)
+    parser.add_argument('--link-mode', choices=LINK_MODES, default='copy',
+                        help='How configs and images are added to the '
+                             'converted topology. Files are copied when a '
+                             'link cannot be made (default: copy)')
+    parser.add_argument('--compact',
+                        help='Write the converted topology without '
+                             'indentation, which is smaller and faster to '
+                             'write',
+                        action='store_true')
+    parser.add_argument('-f', '--force',
+                        help='Convert topologies even if they are unchanged '
+                             'since they were last converted',
+                        action='store_true')
+    parser.add_argument('--sparse',
+                        help='Only validate the keys present in the topology '
+                             'rather than adding defaults for every key',
+                        action='store_true')
+    parser.add_argument('--stats', metavar='FILE',
+                        help='Write the time taken by each stage of the '
+                             'conversion and counters as JSON to FILE, or '
+                             'to standard output when FILE is -, with any '
+                             'other output going to standard error')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='Profile each stage of the conversion with '
+                             'cProfile and tracemalloc, writing the profiles '
+                             'to the directory PATH')
+    parser.add_argument('--profile-trace',
+                        help='With --profile, also write a Chrome trace '
+                             'timeline of the stages',
+                        action='store_true')
     return parser
 
 
+def conversion_options(args):
+    """
+    Get the keyword arguments for :py:func:`do_conversion` from the command
+    line arguments
+
+    :param args: parsed command line arguments
+    :return: dict of keyword arguments
+    :rtype: dict
+    """
+    return {'native': args.parser == 'native',
+            'sparse': args.sparse,
+            'copy_workers': args.copy_workers,
+            'link_mode': args.link_mode,
+            'compact': args.compact,
+            'force': args.force,
+            'node_jobs': args.node_jobs,
+            'profile': args.profile,
+            'profile_trace': args.profile_trace}
+
+
 def do_conversion(topology_def, topology_name, output_dir=None, debug=False,
-                  quiet=False):
+                  quiet=False, native=False, sparse=False,
+                  copy_workers=COPY_WORKERS, link_mode='copy', compact=False,
+                  force=False, node_jobs=1, profile=None,
+                  profile_trace=False):
     """
-    Convert the topology
+    Convert the topology, unless it is unchanged since it was last converted
 
     :param dict topology_def: Dict containing topology file and snapshot bool.
                               For example:
@@ -106,30 +263,462 @@ def do_conversion(topology_def, topology_name, output_dir=None, debug=False,
     :param str output_dir: The directory in which to output the topology.
                            (Default: None)
     :param bool debug: Enable debugging (Default: False)
+    :param bool quiet: No console printing (Default: False)
+    :param bool native: Use the native topology parser rather than ConfigObj
+                        (Default: False)
+    :param bool sparse: Only validate the keys present in the topology
+                        (Default: False)
+    :param int copy_workers: Number of threads used to copy the configs and
+                             images (Default: 4)
+    :param str link_mode: How configs and images are added to the new
+                          topology, one of copy, hardlink, reflink or symlink
+                          (Default: copy)
+    :param bool compact: Write the topology without indentation
+                         (Default: False)
+    :param bool force: Convert the topology even if it is unchanged
+                       (Default: False)
+    :param int node_jobs: Number of processes building the nodes
+                          (Default: 1)
+    :param str profile: Directory to write a profile of each stage of the
+                        conversion to, see
+                        :py:meth:`ConversionStats.write_profile`
+                        (Default: None, no profiling)
+    :param bool profile_trace: Also write a Chrome trace of the stages to the
+                               profile directory (Default: False)
+    :return: the stats of the conversion from
+             :py:meth:`ConversionStats.as_dict`, or None if the topology was
+             unchanged
+    :rtype: dict or None
+    """
+    if not force and is_unchanged(topology_def, topology_name, output_dir,
+                                  link_mode, compact):
+        log.debug('Topology unchanged: %s' % topology_def['file'])
+        if not topology_def['snapshot'] and not quiet:
+            print('Your topology is unchanged since it was last converted')
+        return None
+
+    stats = ConversionStats(topology_def['file'], topology_name,
+                            topology_def['snapshot'], profile is not None)
+    try:
+        # Create a new instance of the the Converter
+        gns3_conv = Converter(topology_def['file'], debug, native, sparse)
+        new_top = build_topology(gns3_conv, topology_name, stats, node_jobs)
+
+        # Save the new topology
+        save(output_dir, gns3_conv, new_top, topology_def['snapshot'], quiet,
+             copy_workers, link_mode, stats, compact)
+    finally:
+        stats.stop_profile()
+
+    if profile is not None:
+        prefix = topology_name
+        if topology_def['snapshot']:
+            prefix = '%s-%s' % (topology_name,
+                                snapshot_name(topology_def['file']))
+        stats.write_profile(profile, prefix, profile_trace)
+    return stats.as_dict()
+
+
+def build_topology(converter, topology_name, stats, node_jobs=1):
+    """
+    Read and convert a topology
+
+    :param Converter converter: Converter instance
+    :param str topology_name: The name of the topology
+    :param ConversionStats stats: Stats to record the time taken by each
+                                  stage and the counters in
+    :param int node_jobs: Number of processes building the nodes
+                          (Default: 1)
+    :return: converted topology
+    :rtype: JSONTopology
     """
-    # Create a new instance of the the Converter
-    gns3_conv = Converter(topology_def['file'], debug)
     # Read the old topology
-    old_top = gns3_conv.read_topology()
+    with stats.stage('read'):
+        old_top = converter.read_topology()
     new_top = JSONTopology()
+    stats.count('sections', count_sections(old_top))
 
     # Process the sections
-    (topology) = gns3_conv.process_topology(old_top)
+    with stats.stage('process'):
+        (topology) = converter.process_topology(old_top)
+    stats.count('devices', len(topology['devices']))
 
     # Generate the nodes
-    new_top.nodes = gns3_conv.generate_nodes(topology)
+    with stats.stage('nodes'):
+        new_top.nodes = converter.generate_nodes(topology, node_jobs)
+    stats.count('ports', sum(len(node.ports) for node in new_top.nodes))
     # Generate the links
-    new_top.links = gns3_conv.generate_links(new_top.nodes)
+    with stats.stage('links'):
+        new_top.links = converter.generate_links(new_top.nodes)
+    stats.count('links', len(new_top.links))
 
-    new_top.notes = gns3_conv.generate_notes(topology['artwork']['NOTE'])
-    new_top.shapes = gns3_conv.generate_shapes(topology['artwork']['SHAPE'])
-    new_top.images = gns3_conv.generate_images(topology['artwork']['PIXMAP'])
+    with stats.stage('artwork'):
+        artwork = topology['artwork']
+        new_top.notes = converter.generate_notes(artwork['NOTE'])
+        new_top.shapes = converter.generate_shapes(artwork['SHAPE'])
+        new_top.images = converter.generate_images(artwork['PIXMAP'])
 
     # Enter topology name
     new_top.name = topology_name
+    return new_top
+
+
+def convert_topology(source, topology_name='topology', native=False,
+                     sparse=False, stats=None):
+    """
+    Convert a topology in memory, without reading or writing any files
+
+    :param source: The ini-style topology as text, bytes or a file-like
+                   object returning either
+    :type source: str or bytes or file
+    :param str topology_name: The name of the topology
+                              (Default: topology)
+    :param bool native: Use the native topology parser rather than ConfigObj
+                        (Default: False)
+    :param bool sparse: Only validate the keys present in the topology
+                        (Default: False)
+    :param ConversionStats stats: Stats to record the time taken by each
+                                  stage and the counters in (Default: None)
+    :return: tuple of the converted topology, as written to the .gns3 file,
+             and the list of assets it needs. Each asset is a dict with
+             the type (config or image), the source path as given in the
+             topology and the target path relative to the converted
+             topology directory
+    :rtype: tuple
+    :raises ConvertError: when the topology cannot be read
+    """
+    if hasattr(source, 'read'):
+        source = source.read()
+    if isinstance(source, bytes):
+        source = source.decode('utf-8-sig')
+    elif source.startswith('\ufeff'):
+        source = source[1:]
+    if stats is None:
+        stats = ConversionStats(topology_name=topology_name)
+
+    gns3_conv = Converter(None, native=native, sparse=sparse,
+                          content=source.splitlines())
+    new_top = build_topology(gns3_conv, topology_name, stats)
+
+    files_dir = topology_name + '-files'
+    assets = []
+    for config in gns3_conv.configs:
+        assets.append({'type': 'config', 'source': config['old'],
+                       'target': '/'.join([files_dir, 'dynamips', 'configs',
+                                           os.path.basename(config['new'])])})
+    for image in gns3_conv.images:
+        assets.append({'type': 'image', 'source': image,
+                       'target': '/'.join([files_dir, 'images',
+                                           os.path.basename(image)])})
+    return new_top.get_topology(), assets
+
+
+def is_unchanged(topology_def, topology_name, output_dir=None,
+                 link_mode='copy', compact=False):
+    """
+    Check whether a topology has already been converted and neither it, its
+    assets, its converted files nor the converter have changed since
+
+    :param dict topology_def: Dict containing topology file and snapshot bool
+    :param str topology_name: The name of the topology
+    :param str output_dir: The directory in which to output the topology.
+                           (Default: None)
+    :param str link_mode: How configs and images are added to the new
+                          topology (Default: copy)
+    :param bool compact: Write the topology without indentation
+                         (Default: False)
+    :return: True if the topology is unchanged
+    :rtype: bool
+    """
+    (output_dir, topology_files_dir) = output_dirs(
+        output_dir, topology_def['file'], topology_name,
+        topology_def['snapshot'])
+
+    if not os.path.isfile(os.path.join(output_dir,
+                                       '%s.gns3' % topology_name)):
+        return False
+
+    source = topology_dirname(topology_def['file'])
+    candidates = asset_candidates(source, topology_def['snapshot'])
+    return is_up_to_date(manifest_path(output_dir, topology_name),
+                         topology_def['file'],
+                         output_options(link_mode, compact), candidates)
+
+
+def asset_candidates(source, snapshot):
+    """
+    Get the assets copied from the topology directory whatever the topology
+    contains: the VPCS configs, the topology images and, unless this is a
+    snapshot, the instructions. The configs and images the topology refers
+    to are recorded in the manifest, found or not, so they are not needed
+    here.
+
+    :param str source: Source topology directory
+    :param bool snapshot: Is this a snapshot?
+    :return: list of asset files and directories that exist
+    :rtype: list
+    """
+    candidates = get_vpcs_files(source) + get_topology_images(source)
+    instructions = os.path.join(source, 'instructions')
+    if not snapshot and os.path.exists(instructions):
+        candidates.append(instructions)
+    return candidates
+
+
+def output_options(link_mode, compact):
+    """
+    Get the options affecting the converted topology, as recorded in its
+    manifest
+
+    :param str link_mode: How configs and images are added to the new
+                          topology
+    :param bool compact: Is the topology written without indentation?
+    :return: dict of options
+    :rtype: dict
+    """
+    options = {'link_mode': link_mode}
+    if compact:
+        options['compact'] = True
+    return options
+
+
+def convert_project(topology, output_dir=None, debug=False, quiet=False,
+                    **kwargs):
+    """
+    Convert a topology and its snapshots, catching any error so that one
+    broken project does not stop a bulk conversion
+
+    :param str topology: Topology file
+    :param str output_dir: The directory in which to output the topology.
+                           (Default: None)
+    :param bool debug: Enable debugging (Default: False)
+    :param bool quiet: No console printing (Default: False)
+    :param kwargs: Other options passed to :py:func:`do_conversion`
+    :return: dict containing the topology file, name, number of snapshots,
+             whether the topology was unchanged, the error message (None
+             on success) and the stats of the topology and snapshots
+             converted
+    :rtype: dict
+    """
+    result = {'topology': topology,
+              'name': name(topology),
+              'snapshots': 0,
+              'unchanged': False,
+              'error': None,
+              'stats': []}
+    try:
+        stats = do_conversion({'file': topology, 'snapshot': False},
+                              result['name'], output_dir, debug, quiet,
+                              **kwargs)
+        result['unchanged'] = stats is None
+
+        # Projects are already converted in parallel, so avoid nesting pools
+        snapshots = get_snapshots(topology)
+        snapshot_stats = convert_snapshots(snapshots, result['name'],
+                                           output_dir, debug, quiet, jobs=1,
+                                           **kwargs)
+        result['snapshots'] = len(snapshots)
+        result['stats'] = [item for item in [stats] + snapshot_stats
+                           if item is not None]
+    except Exception as error:
+        log.error('%s: %s' % (topology, error))
+        result['error'] = str(error)
+    return result
+
+
+def bulk_conversion(topologies, output_dir=None, jobs=None, debug=False,
+                    quiet=False, roots=(), **kwargs):
+    """
+    Convert many topologies, using a pool of processes when more than one
+    job is requested. Each topology is output to its own project directory,
+    as given by :py:func:`project_dirs`.
+
+    :param list topologies: Topology files to convert
+    :param str output_dir: The directory in which to create the project
+                           directories. (Default: None)
+    :param int jobs: Number of topologies to convert in parallel
+                     (Default: None, the number of CPUs)
+    :param bool debug: Enable debugging (Default: False)
+    :param bool quiet: No console printing (Default: False)
+    :param list roots: The directories the topologies were found in
+                       (Default: none)
+    :param kwargs: Other options passed to :py:func:`do_conversion`
+    :return: list of results from :py:func:`convert_project`, in the same
+             order as topologies
+    :rtype: list
+    """
+    jobs = max_jobs(jobs, len(topologies))
+    if output_dir:
+        output_dir = os.path.abspath(output_dir)
+    else:
+        output_dir = os.getcwd()
+    projects = list(zip(topologies,
+                        project_dirs(topologies, output_dir, roots)))
+
+    if jobs <= 1:
+        return [convert_project(topology, project_dir, debug, True, **kwargs)
+                for (topology, project_dir) in projects]
+
+    with futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = [executor.submit(convert_project, topology, project_dir,
+                                   debug, True, **kwargs)
+                   for (topology, project_dir) in projects]
+    return [future.result() for future in pending]
+
+
+def project_dirs(topologies, output_dir, roots=()):
+    """
+    Get the output directory of each project of a bulk conversion. A project
+    found in one of the root directories is output to the same path relative
+    to the output directory as it has to the root, e.g. ``b/Lab`` for
+    ``<root>/b/Lab/topology.net``, otherwise it is named after the directory
+    of its topology.
+
+    When projects from different roots still share a directory, each of
+    them is given a suffix from a hash of its own path, so the directory of
+    a project does not depend on which other projects are converted.
+
+    :param list topologies: Topology files to convert
+    :param str output_dir: The directory in which to create the project
+                           directories
+    :param list roots: The directories the topologies were found in
+                       (Default: none)
+    :return: list of project directories, in the same order as topologies
+    :rtype: list
+    """
+    # The deepest root containing a project is used
+    roots = sorted((os.path.abspath(root) for root in roots
+                    if os.path.isdir(root)), key=len, reverse=True)
+    projects = []
+    for topology in topologies:
+        project_dir = topology_dirname(topology)
+        project = name(topology)
+        for root in roots:
+            if project_dir.startswith(os.path.join(root, '')):
+                project = os.path.relpath(project_dir, root)
+                break
+        projects.append((project_dir, project))
+
+    # Compared in lower case for case-insensitive file systems
+    counts = {}
+    for (project_dir, project) in projects:
+        counts[project.lower()] = counts.get(project.lower(), 0) + 1
+    dirs = []
+    for (project_dir, project) in projects:
+        if counts[project.lower()] > 1:
+            digest = hashlib.sha1(project_dir.encode('utf-8')).hexdigest()
+            dir_name = '%s-%s' % (project, digest[:8])
+            log.warning('%s is output to %s, as another project is also '
+                        'named %s' % (project_dir, dir_name, project))
+        else:
+            dir_name = project
+        dirs.append(os.path.join(output_dir, dir_name))
+    return dirs
+
+
+def convert_snapshots(snapshots, topology_name, output_dir=None, debug=False,
+                      quiet=False, jobs=None, **kwargs):
+    """
+    Convert the snapshots of a topology, using a pool of processes when more
+    than one job is requested. The output of each snapshot is saved under
+    ``<name>-files/snapshots/<snap_name>`` as for a serial conversion.
+
+    :param list snapshots: list of snapshots from :py:func:`get_snapshots`
+    :param str topology_name: The name of the topology
+    :param str output_dir: The directory in which to output the topology.
+                           (Default: None)
+    :param bool debug: Enable debugging (Default: False)
+    :param bool quiet: No console printing (Default: False)
+    :param int jobs: Number of snapshots to convert in parallel
+                     (Default: None, the number of CPUs)
+    :param kwargs: Other options passed to :py:func:`do_conversion`
+    :return: list of the results of :py:func:`do_conversion`, in the same
+             order as snapshots
+    :rtype: list
+    """
+    jobs = max_jobs(jobs, len(snapshots))
+
+    if jobs <= 1:
+        return [do_conversion(snapshot, topology_name, output_dir, debug,
+                              quiet, **kwargs)
+                for snapshot in snapshots]
+
+    with futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = [executor.submit(do_conversion, snapshot, topology_name,
+                                   output_dir, debug, quiet, **kwargs)
+                   for snapshot in snapshots]
+    # Re-raise the first error, if any
+    return [future.result() for future in pending]
+
+
+def max_jobs(jobs, tasks):
+    """
+    Get the number of workers to use for a number of tasks
 
-    # Save the new topology
-    save(output_dir, gns3_conv, new_top, topology_def['snapshot'], quiet)
+    :param jobs: Requested number of jobs, None for the number of CPUs
+    :type jobs: int or None
+    :param int tasks: Number of tasks to run
+    :return: number of workers, at least 1 and at most tasks
+    :rtype: int
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    return max(1, min(jobs, tasks))
+
+
+def get_topologies(paths):
+    """
+    Get the topology files to convert from a list of files and directories.
+    Directories are searched for topology.net files, skipping snapshots.
+
+    :param list paths: Topology files and directories
+    :return: list of absolute topology file paths
+    :rtype: list
+    """
+    topologies = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                # Snapshots are converted along with their project
+                if 'snapshots' in dirs:
+                    dirs.remove('snapshots')
+                dirs.sort()
+                if 'topology.net' in files:
+                    topologies.append(
+                        topology_abspath(os.path.join(root, 'topology.net')))
+        else:
+            topologies.append(topology_abspath(path))
+    return topologies
+
+
+def print_summary(results):
+    """
+    Print a summary of a bulk conversion
+
+    :param list results: list of results from :py:func:`bulk_conversion`
+    """
+    failed = [result for result in results if result['error'] is not None]
+    unchanged = [result for result in results if result['unchanged']]
+    print('Converted %s of %s topologies (%s unchanged)' %
+          (len(results) - len(failed) - len(unchanged), len(results),
+           len(unchanged)))
+    for result in failed:
+        print('     %s: %s' % (result['topology'], result['error']))
+
+
+def write_stats(path, stats):
+    """
+    Write the stats of the topologies converted as JSON
+
+    :param str path: File to write to, or - for standard output
+    :param list stats: list of stats from :py:func:`do_conversion`
+    """
+    if path == '-':
+        json.dump(stats, sys.stdout, indent=4, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        with open(path, 'w') as file:
+            json.dump(stats, file, indent=4, sort_keys=True)
 
 
 def topology_abspath(topology):
@@ -186,10 +775,10 @@ def name(topology_file, topology_name=None):
     :rtype: str
     """
     if topology_name is not None:
-        logging.debug('topology name supplied')
+        log.debug('topology name supplied')
         topo_name = topology_name
     else:
-        logging.debug('topology name not supplied')
+        log.debug('topology name not supplied')
         topo_name = os.path.basename(topology_dirname(topology_file))
     return topo_name
 
@@ -216,7 +805,9 @@ def snapshot_name(topo_name):
     return snap_name
 
 
-def save(output_dir, converter, json_topology, snapshot, quiet):
+def save(output_dir, converter, json_topology, snapshot, quiet,
+         copy_workers=COPY_WORKERS, link_mode='copy', stats=None,
+         compact=False):
     """
     Save the converted topology
 
@@ -225,149 +816,294 @@ def save(output_dir, converter, json_topology, snapshot, quiet):
     :param JSONTopology json_topology: JSON topology layout
     :param bool snapshot: Is this a snapshot?
     :param bool quiet: No console printing
+    :param int copy_workers: Number of threads used to copy the configs and
+                             images (Default: 4)
+    :param str link_mode: How configs and images are added to the new
+                          topology, one of copy, hardlink, reflink or symlink
+                          (Default: copy)
+    :param ConversionStats stats: Stats to record the time taken to copy and
+                                  write the topology in (Default: None)
+    :param bool compact: Write the topology without indentation
+                         (Default: False)
     """
+    if stats is None:
+        stats = ConversionStats()
+    copier = AssetCopier(copy_workers)
     try:
-        old_topology_dir = topology_dirname(converter.topology)
-
-        if output_dir:
-            output_dir = os.path.abspath(output_dir)
-        else:
-            output_dir = os.getcwd()
-
         topology_name = json_topology.name
-        topology_files_dir = os.path.join(output_dir, topology_name + '-files')
-
-        if snapshot:
-            snap_name = snapshot_name(converter.topology)
-            output_dir = os.path.join(topology_files_dir, 'snapshots',
-                                      snap_name)
-            topology_files_dir = os.path.join(output_dir, topology_name +
-                                              '-files')
-
-        # Prepare the directory structure
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-
-        # Move the dynamips config files to the new topology folder
-        config_err = copy_configs(converter.configs, old_topology_dir,
-                                  topology_files_dir)
-
-        # Copy any VPCS configurations to the the new topology
-        copy_vpcs_configs(old_topology_dir, topology_files_dir)
-
-        # Copy the topology images to the new topology
-        copy_topology_image(old_topology_dir, output_dir)
-
-        # Copy the instructions to the new topology folder
-        if not snapshot:
-            copy_instructions(old_topology_dir, output_dir)
-
-        # Move the image files to the new topology folder
-        image_err = copy_images(converter.images, old_topology_dir,
-                                topology_files_dir)
-
-        # Create the vbox working directories
-        make_vbox_dirs(json_topology.get_vboxes(), output_dir, topology_name)
-
-        # Create the qemu working directories
-        make_qemu_dirs(json_topology.get_qemus(), output_dir, topology_name)
-
-        if config_err:
-            logging.warning('Some router startup configurations could not be '
-                            'found to be copied to the new topology')
-
-        if image_err:
-            logging.warning('Some images could not be found to be copied to '
-                            'the new topology')
-
-        filename = '%s.gns3' % topology_name
-        file_path = os.path.join(output_dir, filename)
-        with open(file_path, 'w') as file:
-            json.dump(json_topology.get_topology(), file, indent=4,
-                      sort_keys=True)
-            if not snapshot and not quiet:
-                print('Your topology has been converted and can found in:\n'
-                      '     %s' % output_dir)
+        (output_dir, topology_files_dir) = output_dirs(
+            output_dir, converter.topology, topology_name, snapshot)
+
+        with stats.stage('copy'):
+            missing = collect_assets(converter, output_dir,
+                                     topology_files_dir, snapshot, copier,
+                                     link_mode)
+
+            # Run all of the copies collected above
+            copier.run()
+
+            # Create the vbox working directories
+            make_vbox_dirs(json_topology.get_vboxes(), output_dir,
+                           topology_name)
+
+            # Create the qemu working directories
+            make_qemu_dirs(json_topology.get_qemus(), output_dir,
+                           topology_name)
+        stats.count('bytes_copied', copier.bytes_copied)
+        warn_missing(*missing)
+
+        with stats.stage('write'):
+            write_converted(output_dir, converter, json_topology, snapshot,
+                            quiet, copier, link_mode, compact)
     except OSError as error:
-        logging.error(error)
+        log.error(error)
+
+
+def collect_assets(converter, output_dir, topology_files_dir, snapshot,
+                   copier, link_mode='copy'):
+    """
+    Prepare the directory structure of the converted topology and add the
+    copies of its configs and images to a copier
+
+    :param Converter converter: Converter instance
+    :param str output_dir: Directory of the converted topology
+    :param str topology_files_dir: Files directory of the converted topology
+    :param bool snapshot: Is this a snapshot?
+    :param AssetCopier copier: Copier to add the copies to
+    :param str link_mode: copy, hardlink, reflink or symlink
+                          (Default: copy)
+    :return: tuple of whether any configs and whether any images could not
+             be found
+    :rtype: tuple
+    """
+    old_topology_dir = topology_dirname(converter.topology)
+
+    # Prepare the directory structure
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    # Move the dynamips config files to the new topology folder
+    config_err = copy_configs(converter.configs, old_topology_dir,
+                              topology_files_dir, copier, link_mode)
+
+    # Copy any VPCS configurations to the the new topology
+    copy_vpcs_configs(old_topology_dir, topology_files_dir, copier,
+                      link_mode)
+
+    # Copy the topology images to the new topology
+    copy_topology_image(old_topology_dir, output_dir, copier, link_mode)
+
+    # Copy the instructions to the new topology folder
+    if not snapshot:
+        copy_instructions(old_topology_dir, output_dir, copier, link_mode)
+
+    # Move the image files to the new topology folder
+    image_err = copy_images(converter.images, old_topology_dir,
+                            topology_files_dir, copier, link_mode)
+    return config_err, image_err
+
+
+def warn_missing(config_err, image_err):
+    """
+    Warn about any configs or images that could not be found
+
+    :param bool config_err: Were any configs not found?
+    :param bool image_err: Were any images not found?
+    """
+    if config_err:
+        log.warning('Some router startup configurations could not be '
+                    'found to be copied to the new topology')
+
+    if image_err:
+        log.warning('Some images could not be found to be copied to '
+                    'the new topology')
+
+
+def write_converted(output_dir, converter, json_topology, snapshot, quiet,
+                    copier, link_mode='copy', compact=False):
+    """
+    Write the converted topology and its manifest
+
+    :param str output_dir: Directory of the converted topology
+    :param Converter converter: Converter instance
+    :param JSONTopology json_topology: JSON topology layout
+    :param bool snapshot: Is this a snapshot?
+    :param bool quiet: No console printing
+    :param AssetCopier copier: Copier the assets were copied with
+    :param str link_mode: copy, hardlink, reflink or symlink
+                          (Default: copy)
+    :param bool compact: Write the topology without indentation
+                         (Default: False)
+    """
+    topology_name = json_topology.name
+    filename = '%s.gns3' % topology_name
+    file_path = os.path.join(output_dir, filename)
+    with open(file_path, 'w') as file:
+        write_topology(file, json_topology.get_topology(lazy=True),
+                       compact)
+        if not snapshot and not quiet:
+            print('Your topology has been converted and can found in:\n'
+                  '     %s' % output_dir)
+
+    # Record what the topology was converted from and to
+    outputs = [file_path] + copier.targets + \
+        vm_dirs('vbox', json_topology.get_vboxes(), output_dir,
+                topology_name) + \
+        vm_dirs('qemu', json_topology.get_qemus(), output_dir,
+                topology_name)
+    write_manifest(manifest_path(output_dir, topology_name),
+                   build_manifest(converter.topology, copier.assets,
+                                  output_options(link_mode, compact),
+                                  output_dir, outputs))
+
+
+def output_dirs(output_dir, topology, topology_name, snapshot):
+    """
+    Get the directories a topology is converted to
 
+    :param str output_dir: Output Directory, or None for the current
+                           directory
+    :param str topology: Topology file
+    :param str topology_name: The name of the topology
+    :param bool snapshot: Is this a snapshot?
+    :return: tuple of the directory containing the converted topology and
+             its files directory
+    :rtype: tuple
+    """
+    if output_dir:
+        output_dir = os.path.abspath(output_dir)
+    else:
+        output_dir = os.getcwd()
 
-def copy_configs(configs, source, target):
+    topology_files_dir = os.path.join(output_dir, topology_name + '-files')
+
+    if snapshot:
+        snap_name = snapshot_name(topology)
+        output_dir = os.path.join(topology_files_dir, 'snapshots', snap_name)
+        topology_files_dir = os.path.join(output_dir, topology_name +
+                                          '-files')
+    return output_dir, topology_files_dir
+
+
+def copy_configs(configs, source, target, copier=None, link_mode='copy'):
     """
     Copy dynamips configs to converted topology
 
     :param configs: Configs to copy
     :param str source: Source topology directory
     :param str target: Target topology files directory
+    :param AssetCopier copier: Copier to add the copies to, or None to copy
+                               straight away (Default: None)
+    :param str link_mode: copy, hardlink, reflink or symlink
+                          (Default: copy)
     :return: True when a config cannot be found, otherwise false
     :rtype: bool
     """
     config_err = False
     if len(configs) > 0:
         config_dir = os.path.join(target, 'dynamips', 'configs')
-        os.makedirs(config_dir)
+        os.makedirs(config_dir, exist_ok=True)
         for config in configs:
             old_config_file = os.path.join(source, config['old'])
             new_config_file = os.path.join(config_dir,
                                            os.path.basename(config['new']))
             if os.path.isfile(old_config_file):
                 # Copy and rename the config
-                shutil.copy(old_config_file, new_config_file)
+                run_copy(copier, copy_file, old_config_file,
+                         new_config_file, link_mode)
             else:
                 config_err = True
-                logging.error('Unable to find %s' % config['old'])
+                log.error('Unable to find %s' % config['old'])
+                if copier is not None:
+                    copier.add_missing(old_config_file)
     return config_err
 
 
-def copy_vpcs_configs(source, target):
+def copy_vpcs_configs(source, target, copier=None, link_mode='copy'):
     """
     Copy any VPCS configs to the converted topology
 
     :param str source: Source topology directory
     :param str target: Target topology files directory
+    :param AssetCopier copier: Copier to add the copies to, or None to copy
+                               straight away (Default: None)
+    :param str link_mode: copy, hardlink, reflink or symlink
+                          (Default: copy)
     """
     # Prepare a list of files to copy
-    vpcs_files = glob.glob(os.path.join(source, 'configs', '*.vpc'))
-    vpcs_hist = os.path.join(source, 'configs', 'vpcs.hist')
+    vpcs_files = get_vpcs_files(source)
     vpcs_config_path = os.path.join(target, 'vpcs', 'multi-host')
-    if os.path.isfile(vpcs_hist):
-        vpcs_files.append(vpcs_hist)
     # Create the directory tree
     if len(vpcs_files) > 0:
-        os.makedirs(vpcs_config_path)
+        os.makedirs(vpcs_config_path, exist_ok=True)
     # Copy the files
     for old_file in vpcs_files:
         new_file = os.path.join(vpcs_config_path, os.path.basename(old_file))
-        shutil.copy(old_file, new_file)
+        run_copy(copier, copy_file, old_file, new_file, link_mode)
 
 
-def copy_topology_image(source, target):
+def copy_topology_image(source, target, copier=None, link_mode='copy'):
     """
     Copy any images of the topology to the converted topology
 
     :param str source: Source topology directory
     :param str target: Target Directory
+    :param AssetCopier copier: Copier to add the copies to, or None to copy
+                               straight away (Default: None)
+    :param str link_mode: copy, hardlink, reflink or symlink
+                          (Default: copy)
     """
-    files = glob.glob(os.path.join(source, '*.png'))
+    files = get_topology_images(source)
 
     for file in files:
-        shutil.copy(file, target)
+        run_copy(copier, copy_file, file,
+                 os.path.join(target, os.path.basename(file)), link_mode)
+
+
+def get_vpcs_files(source):
+    """
+    Get the VPCS configs of a topology
+
+    :param str source: Source topology directory
+    :return: list of VPCS config files
+    :rtype: list
+    """
+    vpcs_files = glob.glob(os.path.join(source, 'configs', '*.vpc'))
+    vpcs_hist = os.path.join(source, 'configs', 'vpcs.hist')
+    if os.path.isfile(vpcs_hist):
+        vpcs_files.append(vpcs_hist)
+    return vpcs_files
 
 
-def copy_images(images, source, target):
+def get_topology_images(source):
+    """
+    Get the images (*.png) of a topology
+
+    :param str source: Source topology directory
+    :return: list of image files
+    :rtype: list
+    """
+    return glob.glob(os.path.join(source, '*.png'))
+
+
+def copy_images(images, source, target, copier=None, link_mode='copy'):
     """
     Copy images to converted topology
 
     :param images: Images to copy
     :param source: Old Topology Directory
     :param target: Target topology files directory
+    :param AssetCopier copier: Copier to add the copies to, or None to copy
+                               straight away (Default: None)
+    :param str link_mode: copy, hardlink, reflink or symlink
+                          (Default: copy)
     :return: True when an image cannot be found, otherwise false
     :rtype: bool
     """
     image_err = False
     if len(images) > 0:
         images_dir = os.path.join(target, 'images')
-        os.makedirs(images_dir)
+        os.makedirs(images_dir, exist_ok=True)
         for image in images:
             if os.path.isabs(image):
                 old_image_file = image
@@ -377,22 +1113,61 @@ def copy_images(images, source, target):
             new_image_file = os.path.join(images_dir,
                                           os.path.basename(image))
             if os.path.isfile(os.path.abspath(old_image_file)):
-                shutil.copy(old_image_file, new_image_file)
+                run_copy(copier, copy_file, old_image_file, new_image_file,
+                         link_mode)
             else:
                 image_err = True
-                logging.error('Unable to find %s' % old_image_file)
+                log.error('Unable to find %s' % old_image_file)
+                if copier is not None:
+                    copier.add_missing(old_image_file)
     return image_err
 
 
-def copy_instructions(source_project, dest_project):
+def copy_instructions(source_project, dest_project, copier=None,
+                      link_mode='copy'):
+    """
+    Copy the instructions to the converted topology
+
+    :param str source_project: Source topology directory
+    :param str dest_project: Target Directory
+    :param AssetCopier copier: Copier to add the copy to, or None to copy
+                               straight away (Default: None)
+    :param str link_mode: copy, hardlink, reflink or symlink
+                          (Default: copy)
+    """
     old_instructions = os.path.join(source_project, 'instructions')
     new_instructions = os.path.join(dest_project, 'instructions')
 
     if os.path.exists(old_instructions):
-        try:
-            shutil.copytree(old_instructions, new_instructions)
-        except shutil.Error as error:
-            raise ConvertError('Error copying instructions', error)
+        run_copy(copier, copy_tree, old_instructions, new_instructions,
+                 link_mode)
+
+
+def copy_tree(source, target, link_mode='copy'):
+    """
+    Copy a directory tree
+
+    :param str source: Source directory
+    :param str target: Target directory
+    :param str link_mode: copy, hardlink, reflink or symlink
+                          (Default: copy)
+    :return: number of bytes copied, not counting linked files
+    :rtype: int
+    :raises ConvertError: when the tree cannot be copied
+    """
+    copied = []
+
+    def copy_function(src, dst):
+        copied.append(copy_file(src, dst, link_mode))
+
+    try:
+        if os.path.isdir(target):
+            # Replace the tree from a previous conversion
+            shutil.rmtree(target)
+        shutil.copytree(source, target, copy_function=copy_function)
+    except shutil.Error as error:
+        raise ConvertError('Error copying instructions', error)
+    return sum(copied)
 
 
 def make_vbox_dirs(max_vbox_id, output_dir, topology_name):
@@ -403,11 +1178,8 @@ def make_vbox_dirs(max_vbox_id, output_dir, topology_name):
     :param str output_dir: Output directory
     :param str topology_name: Topology name
     """
-    if max_vbox_id is not None:
-        for i in range(1, max_vbox_id + 1):
-            vbox_dir = os.path.join(output_dir, topology_name + '-files',
-                                    'vbox', 'vm-%s' % i)
-            os.makedirs(vbox_dir)
+    for vbox_dir in vm_dirs('vbox', max_vbox_id, output_dir, topology_name):
+        os.makedirs(vbox_dir, exist_ok=True)
 
 
 def make_qemu_dirs(max_qemu_id, output_dir, topology_name):
@@ -418,11 +1190,27 @@ def make_qemu_dirs(max_qemu_id, output_dir, topology_name):
     :param str output_dir: Output directory
     :param str topology_name: Topology name
     """
-    if max_qemu_id is not None:
-        for i in range(1, max_qemu_id + 1):
-            qemu_dir = os.path.join(output_dir, topology_name + '-files',
-                                    'qemu', 'vm-%s' % i)
-            os.makedirs(qemu_dir)
+    for qemu_dir in vm_dirs('qemu', max_qemu_id, output_dir, topology_name):
+        os.makedirs(qemu_dir, exist_ok=True)
+
+
+def vm_dirs(vm_type, max_vm_id, output_dir, topology_name):
+    """
+    Get the working directories of the VMs of a type
+
+    :param str vm_type: vbox or qemu
+    :param max_vm_id: Number of VMs, or None when there are none
+    :type max_vm_id: int or None
+    :param str output_dir: Output directory
+    :param str topology_name: Topology name
+    :return: list of directories
+    :rtype: list
+    """
+    if max_vm_id is None:
+        return []
+    return [os.path.join(output_dir, topology_name + '-files', vm_type,
+                         'vm-%s' % i)
+            for i in range(1, max_vm_id + 1)]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,187 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+This module is used for the manifest written alongside a converted topology.
+
+The manifest records a hash of the source topology, of each asset copied
+from it and the converter version, along with the size of each file and
+directory written by the conversion, so that a topology which has not
+changed since it was last converted, and whose converted files are all still
+there, can be skipped.
+"""
+import hashlib
+import json
+import logging
+import os
+from gns3converter import __version__
+
+BLOCK_SIZE = 65536
+
+log = logging.getLogger(__name__)
+
+
+def manifest_path(output_dir, topology_name):
+    """
+    Get the path of the manifest for a converted topology
+
+    :param str output_dir: Directory containing the converted topology
+    :param str topology_name: Topology name
+    :return: manifest file path
+    :rtype: str
+    """
+    return os.path.join(output_dir, '%s.manifest' % topology_name)
+
+
+def file_hash(path):
+    """
+    Get the SHA-256 hash of a file, or of every file in a directory
+
+    :param str path: File or directory
+    :return: hex digest, or None when the path does not exist
+    :rtype: str or None
+    """
+    sha = hashlib.sha256()
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for filename in sorted(files):
+                file = os.path.join(root, filename)
+                sha.update(os.path.relpath(file, path).encode('utf-8'))
+                sha.update(file_hash(file).encode('ascii'))
+    elif os.path.isfile(path):
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(BLOCK_SIZE), b''):
+                sha.update(block)
+    else:
+        return None
+    return sha.hexdigest()
+
+
+def file_size(path):
+    """
+    Get the size of a file, or the total size of the files in a directory.
+    Links are followed, so a linked asset has the size of its source.
+
+    :param str path: File or directory
+    :return: size in bytes, or None when the path does not exist
+    :rtype: int or None
+    """
+    if os.path.isdir(path):
+        size = 0
+        for root, dirs, files in os.walk(path):
+            for filename in files:
+                size += file_size(os.path.join(root, filename)) or 0
+        return size
+    elif os.path.isfile(path):
+        return os.path.getsize(path)
+    return None
+
+
+def build_manifest(topology, assets, options=None, output_dir=None,
+                   outputs=()):
+    """
+    Build the manifest for a topology
+
+    :param str topology: Source topology file
+    :param assets: Source files and directories of the copied assets,
+                   including any that could not be found
+    :param dict options: Conversion options affecting the converted
+                         topology (Default: None)
+    :param str output_dir: Directory containing the converted topology and
+                           its manifest (Default: None)
+    :param outputs: Files and directories written by the conversion, within
+                    output_dir
+    :return: manifest
+    :rtype: dict
+    """
+    return {'version': __version__,
+            'topology': {'file': topology, 'hash': file_hash(topology)},
+            'assets': {asset: file_hash(asset) for asset in assets},
+            'outputs': {os.path.relpath(output, output_dir):
+                        file_size(output) for output in outputs},
+            'options': options or {}}
+
+
+def write_manifest(path, manifest):
+    """
+    Write a manifest
+
+    :param str path: Manifest file
+    :param dict manifest: Manifest from :py:func:`build_manifest`
+    """
+    with open(path, 'w') as file:
+        json.dump(manifest, file, indent=4, sort_keys=True)
+
+
+def read_manifest(path):
+    """
+    Read a manifest
+
+    :param str path: Manifest file
+    :return: manifest, or None when it cannot be read
+    :rtype: dict or None
+    """
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def is_up_to_date(path, topology, options=None, candidates=()):
+    """
+    Check whether the topology has changed since the manifest was written
+
+    :param str path: Manifest file
+    :param str topology: Source topology file
+    :param dict options: Conversion options affecting the converted
+                         topology (Default: None)
+    :param candidates: Asset files that would be copied if present, any that
+                       are not in the manifest mean the topology has changed
+    :return: True when the topology, its assets, the options and the
+             converter version are unchanged and the converted files are
+             all still there with the same sizes
+    :rtype: bool
+    """
+    manifest = read_manifest(path)
+    if manifest is None:
+        return False
+
+    try:
+        if manifest['version'] != __version__ \
+                or manifest['options'] != (options or {}) \
+                or manifest['topology']['file'] != topology \
+                or manifest['topology']['hash'] != file_hash(topology):
+            return False
+
+        assets = manifest['assets']
+        for candidate in candidates:
+            if candidate not in assets:
+                return False
+        for asset in assets:
+            if assets[asset] != file_hash(asset):
+                return False
+
+        # The outputs are relative to the directory of the manifest
+        outputs = manifest['outputs']
+        output_dir = os.path.dirname(path)
+        for output in outputs:
+            if outputs[output] != file_size(os.path.join(output_dir,
+                                                         output)):
+                return False
+    except (KeyError, TypeError):
+        log.debug('Invalid manifest %s' % path)
+        return False
+    return True
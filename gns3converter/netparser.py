@@ -0,0 +1,255 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Single-pass parser for the ini-style GNS3 0.8 topology (.net) format.
+
+This is a lightweight alternative to loading a topology through
+:py:mod:`ConfigObj`. It understands the subset of the ConfigObj syntax used by
+.net files (nested sections, ``key = value`` lines and comments) and
+produces the same section tree as ConfigObj with ``list_values=False``.
+"""
+import re
+
+# Regex matching a value, with an optional trailing comment. As with
+# ConfigObj (list_values=False) quoted values keep their quotes.
+VALUE_RE = re.compile(r"""^((?:".*?")|(?:'.*?')|(?:[^'"#].*?)|(?:))
+\s*(?:\#.*)?$""", re.VERBOSE)
+# Regex matching a key = value line where the key is quoted
+QUOTED_KEY_RE = re.compile(r"""^((?:".*?")|(?:'.*?'))\s*=\s*(.*)$""")
+
+
+class NetSection(dict):
+    """
+    A section of a topology, providing the parts of
+    :py:class:`configobj.Section` used by the converter
+
+    :param int depth: section depth (0 for the top level)
+    """
+    def __init__(self, depth=0):
+        super().__init__()
+        self.depth = depth
+        self.sections = []
+        self.scalars = []
+
+    def add(self, key, value):
+        """
+        Add a new key or subsection to the section
+
+        :param str key: key or section name
+        :param value: value or :py:class:`NetSection`
+        """
+        if isinstance(value, dict):
+            self.sections.append(key)
+        else:
+            self.scalars.append(key)
+        dict.__setitem__(self, key, value)
+
+    def pop(self, key, *args):
+        """
+        Remove a key or subsection and return its value
+
+        :param str key: key or section name
+        :return: value or :py:class:`NetSection`
+        """
+        if key in self.sections:
+            self.sections.remove(key)
+        elif key in self.scalars:
+            self.scalars.remove(key)
+        return dict.pop(self, key, *args)
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+
+def unquote(value):
+    """
+    Remove matching quotes from around a key or section name
+
+    :param str value: key or section name
+    :return: unquoted value
+    :rtype: str
+    """
+    if len(value) > 1 and value[0] == value[-1] and value[0] in ('"', "'"):
+        value = value[1:-1]
+    return value
+
+
+def parse(lines, raw=False):
+    """
+    Parse the lines of a topology into a tree of sections
+
+    :param lines: iterable of lines, such as an open file
+    :param bool raw: keep comments in values, used when reading the
+                     configspec (Default: False)
+    :return: top level section
+    :rtype: NetSection
+    :raises SyntaxError: when a line cannot be parsed
+    """
+    root = NetSection()
+    stack = [root]
+    section = root
+
+    for line_nb, line in enumerate(lines, 1):
+        sline = line.strip()
+        if not sline or sline[0] == '#':
+            continue
+
+        if sline[0] == '[':
+            # A section marker e.g. [[ROUTER R1]]
+            if '#' in sline:
+                sline = sline[:sline.index('#')].rstrip()
+            depth = len(sline) - len(sline.lstrip('['))
+            if depth != len(sline) - len(sline.rstrip(']')) \
+                    or depth > len(stack):
+                raise SyntaxError('Invalid section nesting at line %s' %
+                                  line_nb)
+            sect_name = unquote(sline[depth:-depth].strip())
+            parent = stack[depth - 1]
+            if not sect_name or sect_name in parent:
+                raise SyntaxError('Invalid or duplicate section name at line '
+                                  '%s' % line_nb)
+            section = NetSection(depth)
+            parent.add(sect_name, section)
+            del stack[depth:]
+            stack.append(section)
+            continue
+
+        # A key = value line
+        if sline[0] in ('"', "'"):
+            mat = QUOTED_KEY_RE.match(sline)
+            if mat is None:
+                raise SyntaxError('Invalid line %s' % line_nb)
+            (key, value) = mat.groups()
+            key = unquote(key)
+        else:
+            (key, sep, value) = sline.partition('=')
+            if not sep:
+                raise SyntaxError('Invalid line %s' % line_nb)
+            key = key.rstrip()
+            value = value.lstrip()
+
+        if value[:3] in ('"""', "'''"):
+            raise SyntaxError('Multiline values are not supported (line %s)'
+                              % line_nb)
+        if not raw and value:
+            if value[0] not in ('"', "'") and '#' not in value:
+                # Fast path for the most common plain values
+                value = value.rstrip()
+            else:
+                mat = VALUE_RE.match(value)
+                if mat is None:
+                    raise SyntaxError('Invalid value at line %s' % line_nb)
+                value = mat.group(1)
+
+        if key in section:
+            raise SyntaxError('Duplicate key "%s" at line %s' %
+                              (key, line_nb))
+        section.add(key, value)
+
+    return root
+
+
+def read_topology(filename):
+    """
+    Read a topology file
+
+    :param str filename: topology filename
+    :return: top level section
+    :rtype: NetSection
+    :raises SyntaxError: when the file cannot be parsed
+    """
+    with open(filename, encoding='utf-8-sig') as file:
+        return parse(file)
+
+
+def validate(config, configspec, validator=None, sparse=False):
+    """
+    Check and convert the values of a topology against a configspec,
+    adding default values for any keys missing from the topology unless
+    sparse validation is selected
+
+    :param config: topology from :py:func:`read_topology` or ConfigObj
+    :type config: NetSection or ConfigObj
+    :param NetSection configspec: configspec as parsed by
+        :py:class:`~gns3converter.converter.ConfigSpec`
+    :param Validator validator: validator to use (Default: None, creates
+                                a new one)
+    :param bool sparse: only check the keys present in the topology, without
+                        adding defaults for the missing keys
+                        (Default: False)
+    :return: True on success, otherwise a list of tuples
+             (section_list, key, error) as for
+             :py:func:`configobj.flatten_errors`
+    :rtype: bool or list
+    """
+    # validate is slow to import, so is only imported when validating
+    from validate import ValidateError, Validator
+
+    if validator is None:
+        validator = Validator()
+    errors = []
+    _validate_section(config, configspec, validator, [], errors, sparse,
+                      ValidateError)
+    if errors:
+        return errors
+    return True
+
+
+def _validate_section(section, spec, validator, section_list, errors,
+                      sparse, error_class):
+    """
+    Validate a single section, then recurse into its subsections
+
+    :param section: section to validate
+    :type section: NetSection or configobj.Section
+    :param NetSection spec: configspec for the section
+    :param Validator validator: validator
+    :param list section_list: names of the parent sections
+    :param list errors: list to add any errors to
+    :param bool sparse: only check the keys present in the section
+    :param error_class: exception raised by the validator for invalid
+                        values, :py:class:`validate.ValidateError`
+    """
+    if sparse:
+        # Only visit the keys actually present in the section
+        keys = [key for key in section.scalars if key in spec]
+    else:
+        keys = spec.scalars
+
+    for key in keys:
+        check = spec[key]
+        if key in section:
+            try:
+                dict.__setitem__(section, key,
+                                 validator.check(check, section[key]))
+            except error_class as error:
+                # As with ConfigObj the original value is kept
+                errors.append((list(section_list), key, error))
+        else:
+            try:
+                section.add(key, validator.get_default_value(check))
+            except KeyError:
+                errors.append((list(section_list), key, False))
+
+    for sect_name in section.sections:
+        if sect_name in spec.sections:
+            sub_spec = spec[sect_name]
+        elif '__many__' in spec.sections:
+            sub_spec = spec['__many__']
+        else:
+            continue
+        _validate_section(section[sect_name], sub_spec, validator,
+                          section_list + [sect_name], errors, sparse,
+                          error_class)
@@ -15,12 +15,15 @@
 """
 This module is used for building Nodes
 """
+import functools
 import os
 import re
 from gns3converter.adapters import ADAPTER_MATRIX, PORT_TYPES
 from gns3converter.models import MODEL_MATRIX
 from gns3converter.interfaces import INTERFACE_RE, NUMBER_RE, MAPINT_RE, \
     VBQ_INT_RE, Interfaces
+from gns3converter.records import ConnectionRecord, DeviceInfo, NodeRecord, \
+    PortRecord
 from gns3converter.utils import fix_path
 
 
@@ -31,20 +34,30 @@ class Node(Interfaces):
     :param hypervisor: Hypervisor
     :param int port_id: starting port ID for this node
     """
+    __slots__ = ('node', 'device_info', 'hypervisor', 'config',
+                 'port_by_name')
+    base_ports = {'vbox_console': 3501,
+                  'qemu_console': 5001}
 
     def __init__(self, hypervisor, port_id):
         super().__init__(port_id)
-        self.node = {'ports': [],
-                     'server_id': 1,
-                     'label': {'x': 15, 'y': -25},
-                     'properties': {}}
-        self.device_info = {'chassis': '',
-                            'model': '',
-                            'npe': None}
+        self.node = NodeRecord()
+        self.device_info = DeviceInfo()
         self.hypervisor = hypervisor
         self.config = []
-        self.base_ports = {'vbox_console': 3501,
-                           'qemu_console': 5001}
+        # Ports of the node by name, the first port wins as for a search
+        self.port_by_name = {}
+
+    def add_ports(self, ports):
+        """
+        Add ports to the node, indexing them by name
+
+        :param ports: ports to add
+        :type ports: list of :py:class:`~gns3converter.records.PortRecord`
+        """
+        for port in ports:
+            self.node.ports.append(port)
+            self.port_by_name.setdefault(port.name, port)
 
     def add_wic(self, old_wic, wic):
         """
@@ -55,16 +68,16 @@ class Node(Interfaces):
         :param str wic: WIC name
         """
         new_wic = 'wic' + old_wic[-1]
-        self.node['properties'][new_wic] = wic
+        self.node.properties[new_wic] = wic
 
     def add_wic_ports(self, wic_slot):
         """
-        Add the ports for a specific WIC to the node['ports'] dictionary
+        Add the ports for a specific WIC to the node ports
 
         :param str wic_slot: WIC Slot (wic0)
         """
         wic_slot_number = int(wic_slot[3])
-        wic_adapter = self.node['properties'][wic_slot]
+        wic_adapter = self.node.properties[wic_slot]
 
         num_ports = ADAPTER_MATRIX[wic_adapter]['ports']
         port_type = ADAPTER_MATRIX[wic_adapter]['type']
@@ -79,14 +92,11 @@ class Node(Interfaces):
             phy_port_number = port_number + self.port_numbering[port_type]
             port_name = PORT_TYPES[port_type] + '%s/%s' % (slot,
                                                            phy_port_number)
-            port_temp = {'name': port_name,
-                         'id': self.port_id,
-                         'port_number': base + port_number,
-                         'slot_number': slot}
-            ports.append(port_temp)
+            ports.append(PortRecord(self.port_id, port_name,
+                                    base + port_number, slot))
             self.port_id += 1
         self.port_numbering[port_type] += num_ports
-        self.node['ports'].extend(ports)
+        self.add_ports(ports)
 
     def add_slot_ports(self, slot):
         """
@@ -96,15 +106,15 @@ class Node(Interfaces):
         """
         slot_nb = int(slot[4])
         # slot_adapter = None
-        # if slot in self.node['properties']:
-        #     slot_adapter = self.node['properties'][slot]
-        # elif self.device_info['model'] == 'c7200':
-        #     if self.device_info['npe'] == 'npe-g2':
+        # if slot in self.node.properties:
+        #     slot_adapter = self.node.properties[slot]
+        # elif self.device_info.model == 'c7200':
+        #     if self.device_info.npe == 'npe-g2':
         #         slot_adapter = 'C7200-IO-GE-E'
         #     else:
         #         slot_adapter = 'C7200-IO-2FE'
 
-        slot_adapter = self.node['properties'][slot]
+        slot_adapter = self.node.properties[slot]
 
         num_ports = ADAPTER_MATRIX[slot_adapter]['ports']
         port_type = ADAPTER_MATRIX[slot_adapter]['type']
@@ -112,13 +122,28 @@ class Node(Interfaces):
 
         for i in range(num_ports):
             port_name = PORT_TYPES[port_type] + '%s/%s' % (slot_nb, i)
-            port_temp = {'name': port_name,
-                         'id': self.port_id,
-                         'port_number': i,
-                         'slot_number': slot_nb}
-            ports.append(port_temp)
+            ports.append(PortRecord(self.port_id, port_name, i, slot_nb))
             self.port_id += 1
-        self.node['ports'].extend(ports)
+        self.add_ports(ports)
+
+    def add_router_ports(self):
+        """
+        Add the ports of a router: the motherboard ports, then the ports of
+        each adapter and WIC, from the layout shared by every router with the
+        same model, chassis, adapters and WICs
+        """
+        properties = self.node.properties
+        slots = tuple((item, properties[item]) for item in sorted(properties)
+                      if item.startswith('slot'))
+        wics = tuple((item, properties[item]) for item in sorted(properties)
+                     if item.startswith('wic'))
+        layout = router_port_layout(self.device_info.model,
+                                    self.device_info.chassis, slots, wics)
+
+        # Only the port IDs differ between routers with the same layout
+        self.add_ports(PortRecord(self.port_id + offset, *port)
+                       for (offset, port) in enumerate(layout))
+        self.port_id += len(layout)
 
     def add_info_from_hv(self):
         """
@@ -126,23 +151,23 @@ class Node(Interfaces):
         """
         # Router Image
         if 'image' in self.hypervisor:
-            self.node['properties']['image'] = \
+            self.node.properties['image'] = \
                 os.path.basename(self.hypervisor['image'])
         # IDLE-PC
         if 'idlepc' in self.hypervisor:
-            self.node['properties']['idlepc'] = self.hypervisor['idlepc']
+            self.node.properties['idlepc'] = self.hypervisor['idlepc']
         # Router RAM
         if 'ram' in self.hypervisor:
-            self.node['properties']['ram'] = self.hypervisor['ram']
+            self.node.properties['ram'] = self.hypervisor['ram']
         # 7200 NPE
         if 'npe' in self.hypervisor:
-            self.device_info['npe'] = self.hypervisor['npe']
+            self.device_info.npe = self.hypervisor['npe']
         # Device Chassis
         if 'chassis' in self.hypervisor:
-            self.device_info['chassis'] = self.hypervisor['chassis']
-            if self.device_info['model'] == 'c3600':
-                self.node['properties']['chassis'] = \
-                    self.device_info['chassis']
+            self.device_info.chassis = self.hypervisor['chassis']
+            if self.device_info.model == 'c3600':
+                self.node.properties['chassis'] = \
+                    self.device_info.chassis
 
     def add_device_items(self, item, device):
         """
@@ -151,43 +176,55 @@ class Node(Interfaces):
         :param str item: item key
         :param dict device: dictionary containing items
         """
-        if item in ('aux', 'console'):
-            self.node['properties'][item] = device[item]
-        elif item.startswith('slot'):
-            # if self.device_info['model'] == 'c7200':
-            #     if item != 'slot0':
-            #         self.node['properties'][item] = device[item]
-            # else:
-            self.node['properties'][item] = device[item]
-        elif item == 'connections':
-            self.connections = device[item]
-        elif INTERFACE_RE.search(item) or VBQ_INT_RE.search(item):
-            self.interfaces.append({'from': item,
-                                    'to': device[item]})
-        elif NUMBER_RE.search(item):
-            if self.device_info['type'] == 'EthernetSwitch':
-                self.calc_ethsw_port(item, device[item])
-            elif self.device_info['type'] == 'FrameRelaySwitch':
-                self.calc_frsw_port(item, device[item])
-        elif MAPINT_RE.search(item):
-            self.add_mapping((item, device[item]))
-        elif item == 'cnfg':
-            new_config = os.path.join('configs', 'i%s_startup-config.cfg' %
-                                      self.node['id'])
-            self.node['properties']['startup_config'] = new_config
-
-            self.config.append({'old': fix_path(device[item]),
-                                'new': new_config})
-        elif item.startswith('wic'):
-            self.add_wic(item, device[item])
-        elif item == 'symbol':
-            self.set_symbol(device[item])
-        elif item == 'nics':
-            self.node['properties']['adapters'] = device[item]
-        elif item == 'image':
-            self.node['properties']['vmname'] = device[item]
-        elif item == 'vbox_id' or item == 'qemu_id':
-            self.node[item] = device[item]
+        handler = ITEM_HANDLERS.get(classify_item(item))
+        if handler is not None:
+            handler(self, item, device[item])
+
+    def add_property(self, item, value):
+        """
+        Add a device item to the node properties as it is, e.g. console or
+        slot1
+
+        :param str item: item key
+        :param value: item value
+        """
+        self.node.properties[item] = value
+
+    def add_interface(self, item, value):
+        """
+        Add a router or VM interface, connected to a device or NIO
+
+        :param str item: interface (e.g. f0/0)
+        :param str value: destination (e.g. R2 f0/0)
+        """
+        self.interfaces.append({'from': item,
+                                'to': value})
+
+    def add_switch_port(self, item, value):
+        """
+        Add an Ethernet or Frame Relay switch port
+
+        :param str item: port number
+        :param str value: port definition
+        """
+        if self.device_info.type == 'EthernetSwitch':
+            self.calc_ethsw_port(item, value)
+        elif self.device_info.type == 'FrameRelaySwitch':
+            self.calc_frsw_port(item, value)
+
+    def add_config(self, item, value):
+        """
+        Add the startup config of a router, which is copied later
+
+        :param str item: item key (cnfg)
+        :param str value: path of the config in the old topology
+        """
+        new_config = os.path.join('configs', 'i%s_startup-config.cfg' %
+                                  self.node.id)
+        self.node.properties['startup_config'] = new_config
+
+        self.config.append({'old': fix_path(value),
+                            'new': new_config})
 
     def add_to_virtualbox(self):
         """
@@ -195,25 +232,25 @@ class Node(Interfaces):
         present
         """
         # VirtualBox Image
-        if 'vmname' not in self.node['properties']:
-            self.node['properties']['vmname'] = \
+        if 'vmname' not in self.node.properties:
+            self.node.properties['vmname'] = \
                 self.hypervisor['VBoxDevice']['image']
         # Number of adapters
-        if 'adapters' not in self.node['properties']:
-            self.node['properties']['adapters'] = \
+        if 'adapters' not in self.node.properties:
+            self.node.properties['adapters'] = \
                 self.hypervisor['VBoxDevice']['nics']
         # Console Port
-        if 'console' not in self.node['properties']:
-            self.node['properties']['console'] = \
-                self.base_ports['vbox_console'] + self.node['vbox_id'] - 1
+        if 'console' not in self.node.properties:
+            self.node.properties['console'] = \
+                self.base_ports['vbox_console'] + self.node.vbox_id - 1
 
     def add_to_qemu(self):
         """
         Add additional parameters to a QemuVM Device that were present in its
         global conf section
         """
-        device = self.device_info['ext_conf']
-        node_prop = self.node['properties']
+        device = self.device_info.ext_conf
+        node_prop = self.node.properties
         hv_device = self.hypervisor[device]
         # QEMU HDD Images
         if 'hda_disk_image' not in node_prop:
@@ -252,12 +289,12 @@ class Node(Interfaces):
         # Console Port
         if 'console' not in node_prop:
             node_prop['console'] = self.base_ports['qemu_console'] + \
-                self.node['qemu_id'] - 1
+                self.node.qemu_id - 1
         # Qemu Path
         if 'qemu_path' not in node_prop:
-            qemu_path = self.hypervisor['qemu_path']
+            qemu_path = self.hypervisor.get('qemu_path')
             # Modify QEMU Path if flavor is specified
-            if 'flavor' in hv_device:
+            if 'flavor' in hv_device and qemu_path is not None:
                 qemu_path = re.sub(r'qemu-system-.*',
                                    'qemu-system' + hv_device['flavor'],
                                    qemu_path)
@@ -267,12 +304,11 @@ class Node(Interfaces):
         """
         Add ethernet ports to Virtualbox and Qemu nodes
         """
-        for i in range(self.node['properties']['adapters']):
-            port = {'id': self.port_id,
-                    'name': 'Ethernet%s' % i,
-                    'port_number': i}
-            self.node['ports'].append(port)
+        ports = []
+        for i in range(self.node.properties['adapters']):
+            ports.append(PortRecord(self.port_id, 'Ethernet%s' % i, i))
             self.port_id += 1
+        self.add_ports(ports)
 
     def set_qemu_symbol(self):
         """
@@ -280,10 +316,10 @@ class Node(Interfaces):
         """
         valid_devices = {'ASA': 'asa', 'PIX': 'PIX_firewall',
                          'JUNOS': 'router', 'IDS': 'ids'}
-        if self.device_info['from'] in valid_devices \
-                and 'default_symbol' not in self.node \
-                and 'hover_symbol' not in self.node:
-            self.set_symbol(valid_devices[self.device_info['from']])
+        if self.device_info.origin in valid_devices \
+                and self.node.default_symbol is None \
+                and self.node.hover_symbol is None:
+            self.set_symbol(valid_devices[self.device_info.origin])
 
     def set_symbol(self, symbol):
         """
@@ -299,8 +335,8 @@ class Node(Interfaces):
         normal = ':/symbols/%s.normal.svg' % symbol
         selected = ':/symbols/%s.selected.svg' % symbol
 
-        self.node['default_symbol'] = normal
-        self.node['hover_symbol'] = selected
+        self.node.default_symbol = normal
+        self.node.hover_symbol = selected
 
     def calc_ethsw_port(self, port_num, port_def):
         """
@@ -320,13 +356,11 @@ class Node(Interfaces):
             destination = {'device': 'NIO',
                            'port': port_def[2]}
         # port entry
-        port = {'id': self.port_id,
-                'name': str(port_num),
-                'port_number': int(port_num),
-                'type': port_def[0],
-                'vlan': int(port_def[1])}
-        self.node['ports'].append(port)
-        self.calc_link(self.node['id'], self.port_id, port['name'],
+        port = PortRecord(self.port_id, str(port_num), int(port_num))
+        port.type = port_def[0]
+        port.vlan = int(port_def[1])
+        self.add_ports([port])
+        self.calc_link(self.node.id, self.port_id, port.name,
                        destination)
         self.port_id += 1
 
@@ -342,11 +376,9 @@ class Node(Interfaces):
         destination = {'device': port_def[0],
                        'port': port_def[1]}
         # port entry
-        port = {'id': self.port_id,
-                'name': str(port_num),
-                'port_number': int(port_num)}
-        self.node['ports'].append(port)
-        self.calc_link(self.node['id'], self.port_id, port['name'],
+        port = PortRecord(self.port_id, str(port_num), int(port_num))
+        self.add_ports([port])
+        self.calc_link(self.node.id, self.port_id, port.name,
                        destination)
 
         self.port_id += 1
@@ -355,23 +387,21 @@ class Node(Interfaces):
         """
         Add the default ports to add to a router
         """
-        model = self.device_info['model']
-        chassis = self.device_info['chassis']
+        model = self.device_info.model
+        chassis = self.device_info.chassis
         num_ports = MODEL_MATRIX[model][chassis]['ports']
         ports = []
 
         if num_ports > 0:
             port_type = MODEL_MATRIX[model][chassis]['type']
 
-            # Create the ports dict
+            # Create the ports
             for i in range(num_ports):
-                port_temp = {'name': PORT_TYPES[port_type] + '0/' + str(i),
-                             'id': self.port_id,
-                             'port_number': i,
-                             'slot_number': 0}
-                ports.append(port_temp)
+                ports.append(PortRecord(self.port_id,
+                                        PORT_TYPES[port_type] + '0/' + str(i),
+                                        i, 0))
                 self.port_id += 1
-        self.node['ports'].extend(ports)
+        self.add_ports(ports)
 
     def calc_link(self, src_id, src_port, src_port_name, destination):
         """
@@ -385,12 +415,9 @@ class Node(Interfaces):
         if destination['device'] == 'NIO':
             destination['port'] = destination['port'].lower()
 
-        link = {'source_node_id': src_id,
-                'source_port_id': src_port,
-                'source_port_name': src_port_name,
-                'source_dev': self.node['properties']['name'],
-                'dest_dev': destination['device'],
-                'dest_port': destination['port']}
+        link = ConnectionRecord(src_id, src_port, src_port_name,
+                                self.node.properties['name'],
+                                destination['device'], destination['port'])
 
         self.links.append(link)
 
@@ -403,20 +430,20 @@ class Node(Interfaces):
         """
         Set the node description
         """
-        if self.device_info['type'] == 'Router':
-            self.node['description'] = '%s %s' % (self.device_info['type'],
-                                                  self.device_info['model'])
+        if self.device_info.type == 'Router':
+            self.node.description = '%s %s' % (self.device_info.type,
+                                               self.device_info.model)
         else:
-            self.node['description'] = self.device_info['desc']
+            self.node.description = self.device_info.desc
 
     def set_type(self):
         """
         Set the node type
         """
-        if self.device_info['type'] == 'Router':
-            self.node['type'] = self.device_info['model'].upper()
+        if self.device_info.type == 'Router':
+            self.node.type = self.device_info.model.upper()
         else:
-            self.node['type'] = self.device_info['type']
+            self.node.type = self.device_info.type
 
     def get_nb_added_ports(self, old_port_id):
         """
@@ -437,11 +464,8 @@ class Node(Interfaces):
             int_name = connection['from'].replace(int_type,
                                                   PORT_TYPES[int_type.upper()])
             # Get the source port id
-            src_port = None
-            for port in self.node['ports']:
-                if int_name == port['name']:
-                    src_port = port['id']
-                    break
+            port = self.port_by_name.get(int_name)
+            src_port = port.id if port is not None else None
             dest_temp = connection['to'].split(' ')
 
             if len(dest_temp) == 2:
@@ -451,7 +475,7 @@ class Node(Interfaces):
                 conn_to = {'device': 'NIO',
                            'port': dest_temp[0]}
 
-            self.calc_link(self.node['id'], src_port, int_name, conn_to)
+            self.calc_link(self.node.id, src_port, int_name, conn_to)
 
     def calc_cloud_connection(self):
         """
@@ -462,7 +486,7 @@ class Node(Interfaces):
         # Connection String - SW1:1:nio_gen_eth:eth0
         # 0: Destination device 1: Destination port
         # 2: NIO 3: NIO Destination
-        self.node['properties']['nios'] = []
+        self.node.properties['nios'] = []
         if self.connections is None:
             return None
         else:
@@ -479,26 +503,164 @@ class Node(Interfaces):
             else:
                 return RuntimeError('Error: Unknown connection string length '
                                     '(Length: %s)' % connection_len)
-            self.node['properties']['nios'].append(nio)
+            self.node.properties['nios'].append(nio)
             # port entry
-            self.node['ports'].append({'id': self.port_id,
-                                       'name': nio,
-                                       'stub': True})
+            port = PortRecord(self.port_id, nio)
+            port.stub = True
+            self.add_ports([port])
             self.port_id += 1
             return None
 
     def process_mappings(self):
         """
-        Process the mappings for a Frame Relay switch. Removes duplicates and
-        adds the mappings to the node properties
-        """
-        for mapping_a in self.mappings:
-            for mapping_b in self.mappings:
-                if mapping_a['source'] == mapping_b['dest']:
-                    self.mappings.remove(mapping_b)
-                    break
-
-        self.node['properties']['mappings'] = {}
-        mappings = self.node['properties']['mappings']
-        for mapping in self.mappings:
+        Process the mappings for a Frame Relay switch. Removes the reverse of
+        each mapping, keeping the one with the lowest source, and adds the
+        mappings to the node properties
+        """
+        mappings = {}
+        # The mappings are added in order of their source, so sorting them
+        # again takes linear time
+        for mapping in sorted(self.mappings, key=lambda item: item['source']):
+            if mappings.get(mapping['dest']) == mapping['source']:
+                # The reverse of this mapping is already there
+                continue
             mappings[mapping['source']] = mapping['dest']
+        self.node.properties['mappings'] = mappings
+
+
+def classify_item(item):
+    """
+    Classify a device item key, to find how :py:meth:`Node.add_device_items`
+    handles it. Switch port numbers, of which a switch may have thousands,
+    are recognised directly, and any other key is classified once per
+    process by :py:func:`_classify_item`.
+
+    :param str item: item key
+    :return: the item class, a key of :py:data:`ITEM_HANDLERS`, or None when
+             the item is not used
+    :rtype: str or None
+    """
+    if item.isdigit() and item.isascii():
+        return 'port'
+    return _classify_item(item)
+
+
+@functools.lru_cache(maxsize=None)
+def _classify_item(item):
+    """
+    Classify a device item key other than a port number. These keys come in
+    a few shapes (properties, interfaces, frame relay mappings), so the
+    cache stays small while the same keys are found in many devices.
+
+    :param str item: item key
+    :return: the item class, or None when the item is not used
+    :rtype: str or None
+    """
+    if item in ('aux', 'console') or item.startswith('slot'):
+        return 'property'
+    elif item == 'connections':
+        return 'connections'
+    elif INTERFACE_RE.search(item) or VBQ_INT_RE.search(item):
+        return 'interface'
+    elif NUMBER_RE.search(item):
+        return 'port'
+    elif MAPINT_RE.search(item):
+        return 'mapping'
+    elif item == 'cnfg':
+        return 'config'
+    elif item.startswith('wic'):
+        return 'wic'
+    elif item in ('symbol', 'nics', 'image', 'vbox_id', 'qemu_id'):
+        return item
+    return None
+
+
+# Handlers of the device items, by item class from classify_item
+ITEM_HANDLERS = {
+    'property': Node.add_property,
+    'connections': lambda node, item, value: setattr(node, 'connections',
+                                                     value),
+    'interface': Node.add_interface,
+    'port': Node.add_switch_port,
+    'mapping': lambda node, item, value: node.add_mapping((item, value)),
+    'config': Node.add_config,
+    'wic': Node.add_wic,
+    'symbol': lambda node, item, value: node.set_symbol(value),
+    'nics': lambda node, item, value: node.add_property('adapters', value),
+    'image': lambda node, item, value: node.add_property('vmname', value),
+    'vbox_id': lambda node, item, value: setattr(node.node, item, value),
+    'qemu_id': lambda node, item, value: setattr(node.node, item, value),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def router_port_layout(model, chassis, slots, wics):
+    """
+    Get the layout of the ports of a router, built once for each combination
+    of model, chassis, adapters and WICs
+
+    :param str model: Router model
+    :param str chassis: Router chassis
+    :param tuple slots: (slot, adapter) of each slot in use, sorted by slot
+    :param tuple wics: (WIC slot, WIC) of each WIC slot in use, sorted by
+                       WIC slot
+    :return: (name, port number, slot number) of each port, in port ID order
+    :rtype: tuple
+    """
+    node = Node({}, 0)
+    node.device_info.model = model
+    node.device_info.chassis = chassis
+    node.node.properties.update(slots + wics)
+
+    node.calc_mb_ports()
+    for (slot, adapter) in slots:
+        node.add_slot_ports(slot)
+    for (wic_slot, wic) in wics:
+        node.add_wic_ports(wic_slot)
+    return tuple((port.name, port.port_number, port.slot_number)
+                 for port in node.node.ports)
+
+
+def count_node_ports(device, hypervisor):
+    """
+    Count the ports the node of a device has, without building the node
+
+    :param dict device: device of the processed topology
+    :param dict hypervisor: hypervisor conf of the device
+    :return: number of ports
+    :rtype: int
+    """
+    dev_type = device['type']
+    if dev_type == 'Router':
+        # The slots and WICs as added to the node properties
+        cards = {}
+        for item in sorted(device):
+            item_class = classify_item(item)
+            if item_class == 'property' and item.startswith('slot'):
+                cards[item] = device[item]
+            elif item_class == 'wic':
+                cards['wic' + item[-1]] = device[item]
+        slots = tuple((item, cards[item]) for item in sorted(cards)
+                      if item.startswith('slot'))
+        wics = tuple((item, cards[item]) for item in sorted(cards)
+                     if item.startswith('wic'))
+        return len(router_port_layout(device.get('model', ''),
+                                      hypervisor.get('chassis', ''), slots,
+                                      wics))
+    elif dev_type in ('EthernetSwitch', 'FrameRelaySwitch'):
+        return sum(1 for item in device if classify_item(item) == 'port')
+    elif dev_type == 'Cloud':
+        # Only the first NIO is added
+        if device.get('connections') is None:
+            return 0
+        connection = sorted(device['connections'].split(' '))[0].split(':')
+        return 1 if len(connection) in (4, 6) else 0
+    elif dev_type == 'VirtualBoxVM':
+        if 'nics' in device:
+            return device['nics']
+        return hypervisor['VBoxDevice']['nics']
+    elif dev_type == 'QemuVM':
+        if 'nics' in device:
+            return device['nics']
+        return hypervisor[device['ext_conf']].get('nics', 6)
+    return 0
@@ -0,0 +1,190 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+This module contains the records the nodes, ports and links of a topology
+are built in. The records use ``__slots__`` rather than a dict for each
+object, and are turned into the dicts of the JSON topology by
+:py:meth:`Record.to_dict` when the topology is written.
+"""
+
+
+class Record(object):
+    """
+    Base record class
+    """
+    __slots__ = ()
+    # Fields left out of the dict when they are None
+    optional = ()
+
+    def to_dict(self):
+        """
+        Get the record as a dict, as found in the JSON topology
+
+        :return: dict of the record fields
+        :rtype: dict
+        """
+        record = {}
+        for field in self.__slots__:
+            value = getattr(self, field)
+            if value is not None or field not in self.optional:
+                record[field] = value
+        return record
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__,
+                           ', '.join('%s=%r' % item
+                                     for item in self.to_dict().items()))
+
+
+class DeviceInfo(Record):
+    """
+    Details of a device used while building its node
+
+    :param str origin: The old device type e.g. ROUTER or ASA
+    :param str dev_type: The new device type e.g. Router or QemuVM
+    :param str desc: Description of the device type
+    :param str ext_conf: Name of the global conf section of the device
+                         (Default: None)
+    """
+    __slots__ = ('origin', 'type', 'desc', 'ext_conf', 'model', 'chassis',
+                 'npe')
+    optional = ('origin', 'type', 'desc', 'ext_conf')
+
+    def __init__(self, origin=None, dev_type=None, desc=None, ext_conf=None):
+        self.origin = origin
+        self.type = dev_type
+        self.desc = desc
+        self.ext_conf = ext_conf
+        self.model = ''
+        self.chassis = ''
+        self.npe = None
+
+
+class PortRecord(Record):
+    """
+    A port of a node
+
+    :param int port_id: Port ID
+    :param str name: Port name
+    :param int port_number: Port number (Default: None)
+    :param int slot_number: Slot number (Default: None)
+    """
+    __slots__ = ('id', 'name', 'port_number', 'slot_number', 'type', 'vlan',
+                 'stub', 'link_id', 'description')
+    optional = ('port_number', 'slot_number', 'type', 'vlan', 'stub',
+                'link_id', 'description')
+
+    def __init__(self, port_id, name, port_number=None, slot_number=None):
+        self.id = port_id
+        self.name = name
+        self.port_number = port_number
+        self.slot_number = slot_number
+        # Ethernet switch port type and VLAN
+        self.type = None
+        self.vlan = None
+        # Cloud NIO
+        self.stub = None
+        # Added once the port is connected
+        self.link_id = None
+        self.description = None
+
+
+class NodeRecord(Record):
+    """
+    A node of the topology
+
+    :param int node_id: Node ID (Default: None)
+    """
+    __slots__ = ('id', 'type', 'description', 'x', 'y', 'label',
+                 'properties', 'ports', 'server_id', 'default_symbol',
+                 'hover_symbol', 'router_id', 'vbox_id', 'qemu_id')
+    optional = ('id', 'type', 'description', 'x', 'y', 'default_symbol',
+                'hover_symbol', 'router_id', 'vbox_id', 'qemu_id')
+
+    def __init__(self, node_id=None):
+        self.id = node_id
+        self.type = None
+        self.description = None
+        self.x = None
+        self.y = None
+        self.label = {'x': 15, 'y': -25}
+        self.properties = {}
+        self.ports = []
+        self.server_id = 1
+        self.default_symbol = None
+        self.hover_symbol = None
+        self.router_id = None
+        self.vbox_id = None
+        self.qemu_id = None
+
+    def to_dict(self):
+        """
+        Get the node, including its ports, as a dict
+
+        :return: dict of the node
+        :rtype: dict
+        """
+        node = super().to_dict()
+        node['ports'] = [port.to_dict() for port in self.ports]
+        return node
+
+
+class ConnectionRecord(Record):
+    """
+    A connection from a port of a node to a device, as found in the old
+    topology, resolved into a :py:class:`LinkRecord` once every node is
+    built
+
+    :param int source_node_id: Source node ID
+    :param int source_port_id: Source port ID
+    :param str source_port_name: Source port name
+    :param str source_dev: Source device name
+    :param str dest_dev: Destination device name, or NIO
+    :param str dest_port: Destination port name
+    """
+    __slots__ = ('source_node_id', 'source_port_id', 'source_port_name',
+                 'source_dev', 'dest_dev', 'dest_port')
+
+    def __init__(self, source_node_id, source_port_id, source_port_name,
+                 source_dev, dest_dev, dest_port):
+        self.source_node_id = source_node_id
+        self.source_port_id = source_port_id
+        self.source_port_name = source_port_name
+        self.source_dev = source_dev
+        self.dest_dev = dest_dev
+        self.dest_port = dest_port
+
+
+class LinkRecord(Record):
+    """
+    A link of the topology
+
+    :param int source_node_id: Source node ID
+    :param int source_port_id: Source port ID
+    :param int destination_node_id: Destination node ID
+    :param int destination_port_id: Destination port ID
+    :param str description: Link description
+    """
+    __slots__ = ('id', 'description', 'source_node_id', 'source_port_id',
+                 'destination_node_id', 'destination_port_id')
+
+    def __init__(self, source_node_id, source_port_id, destination_node_id,
+                 destination_port_id, description):
+        self.id = None
+        self.description = description
+        self.source_node_id = source_node_id
+        self.source_port_id = source_port_id
+        self.destination_node_id = destination_node_id
+        self.destination_port_id = destination_port_id
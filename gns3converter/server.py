@@ -0,0 +1,378 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+This module is used for the conversion service (gns3-converter serve).
+
+The service keeps a pool of worker processes, each with the configspec
+already parsed, and converts the topologies posted to it over HTTP, either
+on a TCP port or a local UNIX socket::
+
+    POST /convert?name=Lab1&parser=native&sparse=1
+
+The body of the request is the topology (.net) and the response is a JSON
+object with the converted ``topology``, the ``assets`` it needs and the
+``stats`` of the conversion, or an ``error``.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+from concurrent import futures
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+from gns3converter import __version__
+from gns3converter.converter import ConfigSpec
+from gns3converter.converterror import ConvertError
+from gns3converter.main import convert_topology, LOG_MSG_FMT, LOG_DATE_FMT
+from gns3converter.stats import ConversionStats
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8155
+# Largest topology accepted (bytes)
+MAX_CONTENT_LENGTH = 64 * 1024 * 1024
+
+log = logging.getLogger(__name__)
+
+
+def warm_worker():
+    """
+    Prepare a worker process for conversions by parsing the configspec for
+    both parsers
+    """
+    configspec = ConfigSpec.get()
+    configspec.configobj
+    configspec.netspec
+
+
+def convert_job(content, topology_name, native, sparse):
+    """
+    Convert a topology in a worker process
+
+    :param bytes content: The topology
+    :param str topology_name: The name of the topology
+    :param bool native: Use the native topology parser
+    :param bool sparse: Only validate the keys present in the topology
+    :return: dict of the converted topology, the assets it needs and the
+             stats of the conversion
+    :rtype: dict
+    """
+    stats = ConversionStats(topology_name=topology_name)
+    (topology, assets) = convert_topology(content, topology_name, native,
+                                          sparse, stats)
+    return {'topology': topology, 'assets': assets,
+            'stats': stats.as_dict()}
+
+
+class ConversionService(object):
+    """
+    A pool of warm worker processes converting topologies
+
+    :param int jobs: Number of worker processes (Default: None, the number
+                     of CPUs)
+    """
+    def __init__(self, jobs=None):
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.executor = self.new_executor()
+        self.started = time.time()
+        self.converted = 0
+        self.failed = 0
+        # Guards the counters and the executor, used by the handler threads
+        self._lock = threading.Lock()
+
+    def new_executor(self):
+        """
+        Create the pool of worker processes, each warmed as it starts
+
+        :return: executor
+        :rtype: ProcessPoolExecutor
+        """
+        return futures.ProcessPoolExecutor(max_workers=self.jobs,
+                                           initializer=warm_worker)
+
+    def warm_up(self):
+        """
+        Start every worker process, waiting for them to be ready
+        """
+        pending = [self.executor.submit(warm_worker)
+                   for _ in range(self.jobs)]
+        for future in pending:
+            future.result()
+
+    def convert(self, content, topology_name='topology', native=False,
+                sparse=False):
+        """
+        Convert a topology in one of the worker processes
+
+        :param bytes content: The topology
+        :param str topology_name: The name of the topology
+                                  (Default: topology)
+        :param bool native: Use the native topology parser (Default: False)
+        :param bool sparse: Only validate the keys present in the topology
+                            (Default: False)
+        :return: dict from :py:func:`convert_job`, with the time taken
+                 including waiting for a worker added to the stats
+        :rtype: dict
+        :raises ConvertError: when the topology cannot be converted
+        """
+        start = time.perf_counter()
+        try:
+            result = self.run(convert_job, content, topology_name, native,
+                              sparse)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        with self._lock:
+            self.converted += 1
+        result['stats']['elapsed'] = time.perf_counter() - start
+        return result
+
+    def run(self, func, *args):
+        """
+        Run a function in one of the worker processes. When a worker has
+        died, breaking the pool, the workers are restarted and the function
+        is run once more.
+
+        :param func: function to run
+        :param args: arguments for func
+        :return: the result of func
+        :raises BrokenProcessPool: when the workers die again
+        """
+        executor = self.executor
+        try:
+            return executor.submit(func, *args).result()
+        except futures.process.BrokenProcessPool:
+            self.restart(executor)
+            return self.executor.submit(func, *args).result()
+
+    def restart(self, broken):
+        """
+        Replace a broken pool of workers, unless another thread already has
+
+        :param ProcessPoolExecutor broken: the broken executor
+        """
+        with self._lock:
+            if self.executor is broken:
+                log.warning('A worker process died, restarting the workers')
+                broken.shutdown(wait=False)
+                self.executor = self.new_executor()
+
+    def status(self):
+        """
+        Get the status of the service
+
+        :return: dict of the version, number of workers, uptime and number
+                 of topologies converted and failed
+        :rtype: dict
+        """
+        with self._lock:
+            return {'version': __version__,
+                    'jobs': self.jobs,
+                    'uptime': time.time() - self.started,
+                    'converted': self.converted,
+                    'failed': self.failed}
+
+    def shutdown(self):
+        """
+        Stop the worker processes
+        """
+        self.executor.shutdown()
+
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    """
+    Handles the HTTP requests to the conversion service
+    """
+    server_version = 'gns3-converter/' + __version__
+
+    def do_GET(self):
+        if urlsplit(self.path).path == '/status':
+            self.send_json(200, self.server.service.status())
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/convert':
+            self.send_json(404, {'error': 'Not found'})
+            return
+
+        length = self.headers.get('Content-Length')
+        if length is None or not length.isdigit():
+            self.send_json(411, {'error': 'Content-Length required'})
+            return
+        if int(length) > MAX_CONTENT_LENGTH:
+            self.send_json(413, {'error': 'Topology too large'})
+            return
+        content = self.rfile.read(int(length))
+
+        query = parse_qs(url.query)
+        options = {'topology_name': query.get('name', ['topology'])[0],
+                   'native': query.get('parser', [''])[0] == 'native',
+                   'sparse': query.get('sparse', ['0'])[0] in ('1', 'true')}
+        try:
+            result = self.server.service.convert(content, **options)
+        except (ConvertError, SyntaxError, UnicodeDecodeError) as error:
+            self.send_json(400, {'error': str(error)})
+        except Exception as error:
+            log.exception('Conversion failed')
+            self.send_json(500, {'error': str(error)})
+        else:
+            self.send_json(200, result)
+
+    def send_json(self, code, data):
+        """
+        Send a JSON response
+
+        :param int code: HTTP status code
+        :param data: response data
+        """
+        body = json.dumps(data, sort_keys=True).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # UNIX socket clients have no address
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return 'unix'
+
+    def log_message(self, format, *args):
+        log.debug('%s - %s' % (self.address_string(), format % args))
+
+
+class ConversionServer(socketserver.ThreadingMixIn, HTTPServer):
+    """
+    HTTP conversion server on a TCP port
+
+    :param tuple address: (host, port) to listen on
+    :param ConversionService service: service doing the conversions
+    """
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        HTTPServer.__init__(self, address, ConversionHandler)
+        self.service = service
+
+
+class UnixConversionServer(socketserver.ThreadingMixIn,
+                           socketserver.UnixStreamServer):
+    """
+    HTTP conversion server on a local UNIX socket
+
+    :param str path: path of the socket
+    :param ConversionService service: service doing the conversions
+    """
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        socketserver.UnixStreamServer.__init__(self, path, ConversionHandler)
+        self.service = service
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                unix_socket=None):
+    """
+    Create the conversion server
+
+    :param ConversionService service: service doing the conversions
+    :param str host: Host to listen on (Default: 127.0.0.1)
+    :param int port: TCP port to listen on (Default: 8155)
+    :param str unix_socket: Path of a UNIX socket to listen on instead of a
+                            TCP port (Default: None)
+    :return: server
+    :rtype: ConversionServer or UnixConversionServer
+    """
+    if unix_socket is not None:
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ConvertError('UNIX sockets are not supported')
+        if os.path.exists(unix_socket):
+            # Remove the socket left by a previous server
+            os.remove(unix_socket)
+        return UnixConversionServer(unix_socket, service)
+    return ConversionServer((host, port), service)
+
+
+def setup_argparse():
+    """
+    Setup the argparse argument parser for the serve mode
+
+    :return: instance of argparse
+    :rtype: ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog='gns3-converter serve',
+        description='Run a service converting the topologies posted to '
+                    '/convert')
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help='Host to listen on (default: %s)' % DEFAULT_HOST)
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT,
+                        help='TCP port to listen on (default: %s)' %
+                             DEFAULT_PORT)
+    parser.add_argument('-s', '--socket',
+                        help='Listen on a UNIX socket rather than a TCP port')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help='Number of worker processes (default: number '
+                             'of CPUs)')
+    parser.add_argument('--debug',
+                        help='Enable debugging output',
+                        action='store_true')
+    return parser
+
+
+def stop(signum, frame):
+    """
+    Signal handler stopping the service
+    """
+    raise SystemExit(0)
+
+
+def main(argv=None):
+    """
+    Entry point for gns3-converter serve
+
+    :param list argv: command line arguments (Default: None, sys.argv)
+    """
+    args = setup_argparse().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO,
+                        format=LOG_MSG_FMT, datefmt=LOG_DATE_FMT)
+
+    service = ConversionService(args.jobs)
+    server = make_server(service, args.host, args.port, args.socket)
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        service.warm_up()
+        log.info('Serving with %s workers on %s' %
+                 (service.jobs, args.socket or '%s:%s' %
+                  server.server_address[:2]))
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
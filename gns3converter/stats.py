@@ -0,0 +1,232 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+This module is used for recording the time taken by each stage of a
+conversion, along with counters such as the number of devices and links.
+Stages can also be profiled with cProfile and tracemalloc.
+"""
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Stages of a conversion, in the order they are run
+STAGES = ('read', 'process', 'nodes', 'links', 'artwork', 'copy', 'write')
+# Counters recorded for a conversion
+COUNTERS = ('sections', 'devices', 'ports', 'links', 'bytes_copied')
+
+
+class ConversionStats(object):
+    """
+    Wall and CPU time of each stage of a conversion, and counters
+
+    :param str topology: Topology file
+    :param str topology_name: The name of the topology
+    :param bool snapshot: Is this a snapshot? (Default: False)
+    :param bool profile: Profile each stage with cProfile and record its
+                         peak memory with tracemalloc (Default: False)
+    """
+    def __init__(self, topology=None, topology_name=None, snapshot=False,
+                 profile=False):
+        self.topology = topology
+        self.topology_name = topology_name
+        self.snapshot = snapshot
+        self.profile = profile
+        self.stages = {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        # cProfile profiles and tracemalloc snapshots of each stage, and
+        # (stage, start, duration) of each stage run for the trace
+        self.profiles = {}
+        self.snapshots = {}
+        self.events = []
+        self._start = time.perf_counter()
+        self._tracing = False
+
+    @contextmanager
+    def stage(self, stage, cpu=True):
+        """
+        Time a stage of the conversion, adding to any time already recorded
+        for the stage
+
+        :param str stage: Stage name, one of :py:data:`STAGES`
+        :param bool cpu: Record the CPU time of the process over the stage.
+                         When other work runs in the process during the
+                         stage, e.g. other asyncio tasks, give False and add
+                         the CPU time of the stage with :py:meth:`add_cpu`
+                         (Default: True)
+        """
+        if self.profile:
+            profiler = self.start_profile(stage)
+        wall = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            times = self.stages.setdefault(stage, {'wall': 0.0, 'cpu': 0.0})
+            times['wall'] += end - wall
+            if cpu:
+                times['cpu'] += time.process_time() - cpu_start
+            if self.profile:
+                profiler.disable()
+                self.events.append((stage, wall - self._start, end - wall))
+                times['memory_peak'] = max(times.get('memory_peak', 0),
+                                           tracemalloc.get_traced_memory()[1])
+                self.snapshots[stage] = tracemalloc.take_snapshot()
+
+    def start_profile(self, stage):
+        """
+        Start profiling a stage, starting tracemalloc if it is not already
+        tracing
+
+        :param str stage: Stage name
+        :return: the enabled profiler for the stage
+        :rtype: cProfile.Profile
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        elif hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        elif self._tracing:
+            # Restart tracing to reset the peak (Python < 3.9)
+            tracemalloc.stop()
+            tracemalloc.start()
+
+        profiler = self.profiles.setdefault(stage, cProfile.Profile())
+        profiler.enable()
+        return profiler
+
+    def stop_profile(self):
+        """
+        Stop tracemalloc, if it was started by :py:meth:`start_profile`
+        """
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def add_cpu(self, stage, seconds):
+        """
+        Add to the CPU time of a stage
+
+        :param str stage: Stage name, one of :py:data:`STAGES`
+        :param float seconds: CPU time in seconds
+        """
+        times = self.stages.setdefault(stage, {'wall': 0.0, 'cpu': 0.0})
+        times['cpu'] += seconds
+
+    def count(self, counter, value=1):
+        """
+        Add to a counter
+
+        :param str counter: Counter name e.g. devices
+        :param int value: Amount to add (Default: 1)
+        """
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def as_dict(self):
+        """
+        Get the stats as a dict that can be output as JSON
+
+        :return: dict of the topology, stage times in seconds, total times
+                 and counters
+        :rtype: dict
+        """
+        stages = {stage: dict(self.stages[stage])
+                  for stage in STAGES if stage in self.stages}
+        for stage in self.stages:
+            stages.setdefault(stage, dict(self.stages[stage]))
+        return {'topology': self.topology,
+                'name': self.topology_name,
+                'snapshot': self.snapshot,
+                'stages': stages,
+                'total': {'wall': sum(times['wall']
+                                      for times in stages.values()),
+                          'cpu': sum(times['cpu']
+                                     for times in stages.values())},
+                'counters': dict(self.counters)}
+
+    def write_profile(self, directory, prefix, trace=False):
+        """
+        Write the profile of each stage to a directory as
+        ``<prefix>-<stage>.pstats`` (for :py:mod:`pstats`) and
+        ``<prefix>-<stage>.tracemalloc`` (for
+        :py:meth:`tracemalloc.Snapshot.load`), along with the stats as
+        ``<prefix>-stats.json``
+
+        :param str directory: Directory to write the profile to
+        :param str prefix: Prefix of the profile files, e.g. the topology
+                           name
+        :param bool trace: Also write a timeline of the stages in the Chrome
+                           trace event format as ``<prefix>.trace.json``
+                           (Default: False)
+        :return: list of the files written
+        :rtype: list
+        """
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for stage in self.profiles:
+            path = os.path.join(directory, '%s-%s.pstats' % (prefix, stage))
+            self.profiles[stage].dump_stats(path)
+            files.append(path)
+        for stage in self.snapshots:
+            path = os.path.join(directory,
+                                '%s-%s.tracemalloc' % (prefix, stage))
+            self.snapshots[stage].dump(path)
+            files.append(path)
+
+        path = os.path.join(directory, '%s-stats.json' % prefix)
+        with open(path, 'w') as file:
+            json.dump(self.as_dict(), file, indent=4, sort_keys=True)
+        files.append(path)
+
+        if trace:
+            path = os.path.join(directory, '%s.trace.json' % prefix)
+            with open(path, 'w') as file:
+                json.dump(self.trace_events(), file, indent=4)
+            files.append(path)
+        return files
+
+    def trace_events(self):
+        """
+        Get the stages run as a timeline in the Chrome trace event format,
+        which can be opened in chrome://tracing or Perfetto
+
+        :return: trace
+        :rtype: dict
+        """
+        events = []
+        for (stage, start, duration) in self.events:
+            events.append({'name': stage, 'cat': 'conversion', 'ph': 'X',
+                           'ts': round(start * 1e6, 3),
+                           'dur': round(duration * 1e6, 3),
+                           'pid': os.getpid(), 'tid': 0,
+                           'args': {'topology': self.topology}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def count_sections(section):
+    """
+    Count the sections in a topology, including nested sections
+
+    :param section: topology or section
+    :type section: ConfigObj or NetSection
+    :return: number of sections
+    :rtype: int
+    """
+    return sum(1 + count_sections(section[sect_name])
+               for sect_name in section.sections)
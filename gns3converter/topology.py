@@ -466,10 +466,14 @@ class JSONTopology():
         """
         self._name = name
 
-    def get_topology(self):
+    def get_topology(self, lazy=False):
         """
         Get the converted topology ready for JSON encoding
 
+        :param bool lazy: Give the nodes and links as generators, turning
+                          each record into a dict only as it is written by
+                          :py:func:`~gns3converter.jsonwriter.write_topology`
+                          (Default: False)
         :return: converted topology assembled into a single dict
         :rtype: dict
         """
@@ -479,10 +483,14 @@ class JSONTopology():
                     'type': 'topology',
                     'version': '1.0'}
 
+        # The nodes and links are records, turned into dicts here or, when
+        # lazy, one at a time as they are written
         if self._links:
-            topology['topology']['links'] = self._links
+            links = (link.to_dict() for link in self._links)
+            topology['topology']['links'] = links if lazy else list(links)
         if self._nodes:
-            topology['topology']['nodes'] = self._nodes
+            nodes = (node.to_dict() for node in self._nodes)
+            topology['topology']['nodes'] = nodes if lazy else list(nodes)
         if self._servers:
             topology['topology']['servers'] = self._servers
         if self._notes:
@@ -507,8 +515,8 @@ class JSONTopology():
         vbox_list = []
         vbox_max = None
         for node in self.nodes:
-            if node['type'] == 'VirtualBoxVM':
-                vbox_list.append(node['vbox_id'])
+            if node.type == 'VirtualBoxVM':
+                vbox_list.append(node.vbox_id)
 
         if len(vbox_list) > 0:
             vbox_max = max(vbox_list)
@@ -524,9 +532,50 @@ class JSONTopology():
         qemu_vm_list = []
         qemu_vm_max = None
         for node in self.nodes:
-            if node['type'] == 'QemuVM':
-                qemu_vm_list.append(node['qemu_id'])
+            if node.type == 'QemuVM':
+                qemu_vm_list.append(node.qemu_id)
 
         if len(qemu_vm_list) > 0:
             qemu_vm_max = max(qemu_vm_list)
         return qemu_vm_max
+
+
+class TopologyIndex():
+    """
+    Lookup tables for the nodes and ports of a converted topology, used to
+    resolve links without scanning every node and port for each link
+
+    :param list nodes: List of nodes from
+           :py:meth:`gns3converter.converter.Converter.generate_nodes`
+    """
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.node_by_name = {}
+        self.node_by_id = {}
+        self.port_by_name = {}
+        self.port_by_id = {}
+        self.nio_port = {}
+
+        for node in nodes:
+            self.node_by_name.setdefault(node.properties['name'], node)
+            self.node_by_id.setdefault(node.id, node)
+            for port in node.ports:
+                self.port_by_name.setdefault((node.id, port.name), port)
+                self.port_by_id.setdefault((node.id, port.id), port)
+                if node.type == 'Cloud':
+                    # The last cloud with a matching NIO wins
+                    self.nio_port[port.name.lower()] = (node, port)
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        """
+        Get an index for a list of nodes, reusing it if already built
+
+        :param nodes: list of nodes or an existing index
+        :type nodes: list or TopologyIndex
+        :return: index of the nodes
+        :rtype: TopologyIndex
+        """
+        if isinstance(nodes, cls):
+            return nodes
+        return cls(nodes)
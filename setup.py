@@ -40,6 +40,7 @@ setup(
     long_description=open("README.rst", "r").read(),
     test_suite='tests',
     install_requires=['configobj'],
+    python_requires='>=3.7',
     package_data={'gns3converter': ['configspec']},
     entry_points={
         'console_scripts': ['gns3-converter = gns3converter.main:main']
@@ -55,8 +56,11 @@ setup(
         'Natural Language :: English',
         'Operating System :: OS Independent',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
         'Topic :: Education',
         'Topic :: Utilities'
     ]
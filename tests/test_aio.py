@@ -0,0 +1,133 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import unittest
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+from gns3converter.aio import convert_topology_async, do_conversion_async, \
+    run_file_op
+from gns3converter.main import convert_topology, do_conversion
+
+
+class TestAsyncConversion(unittest.TestCase):
+    def setUp(self):
+        if os.path.isfile(os.path.abspath('./tests/topology.net')):
+            self._tests_dir = os.path.abspath('./tests')
+        else:
+            self._tests_dir = os.path.abspath('.')
+        self._source = tempfile.mkdtemp()
+        self._output = tempfile.mkdtemp()
+        shutil.copytree(os.path.join(self._tests_dir, 'configs'),
+                        os.path.join(self._source, 'configs'))
+        shutil.copy(os.path.join(self._tests_dir, 'topology.net'),
+                    self._source)
+        self.topology_def = {'file': os.path.join(self._source,
+                                                  'topology.net'),
+                             'snapshot': False}
+
+    def tearDown(self):
+        shutil.rmtree(self._source)
+        shutil.rmtree(self._output)
+
+    def read_output(self, output_dir):
+        files = {}
+        for root, dirs, filenames in os.walk(output_dir):
+            for filename in filenames:
+                if filename.endswith('.manifest'):
+                    continue
+                path = os.path.join(root, filename)
+                with open(path, 'rb') as file:
+                    files[os.path.relpath(path, output_dir)] = file.read()
+        return files
+
+    def test_do_conversion_async(self):
+        res = asyncio.run(do_conversion_async(self.topology_def, 'Lab1',
+                                              self._output, quiet=True))
+        self.assertEqual(261, res['counters']['bytes_copied'])
+        self.assertIn('copy', res['stages'])
+        self.assertGreater(res['stages']['copy']['cpu'], 0)
+        self.assertGreater(res['stages']['write']['cpu'], 0)
+
+        sync_output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, sync_output)
+        do_conversion(self.topology_def, 'Lab1', sync_output, quiet=True)
+        self.assertDictEqual(self.read_output(sync_output),
+                             self.read_output(self._output))
+
+        # Unchanged, so skipped
+        self.assertIsNone(asyncio.run(do_conversion_async(
+            self.topology_def, 'Lab1', self._output, quiet=True)))
+
+    def test_convert_topology_async(self):
+        with open(self.topology_def['file']) as file:
+            content = file.read()
+        self.assertEqual(convert_topology(content, 'Lab1'),
+                         asyncio.run(convert_topology_async(content,
+                                                            'Lab1')))
+
+    def test_run_file_op_semaphore(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def file_op(value):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return value
+
+        async def run():
+            semaphore = asyncio.Semaphore(2)
+            return await asyncio.gather(*[run_file_op(semaphore, file_op, i)
+                                          for i in range(8)])
+
+        self.assertListEqual(list(range(8)), asyncio.run(run()))
+        self.assertEqual(2, running[1])
+
+    def test_run_file_op_cpu(self):
+        cpu = []
+
+        async def run():
+            semaphore = asyncio.Semaphore(2)
+            return await asyncio.gather(*[run_file_op(semaphore, sum,
+                                                      range(100000), cpu=cpu)
+                                          for i in range(4)])
+
+        self.assertListEqual([4999950000] * 4, asyncio.run(run()))
+        self.assertEqual(4, len(cpu))
+
+    def test_copy_workers(self):
+        semaphores = []
+
+        class Semaphore(asyncio.Semaphore):
+            def __init__(self, value=1):
+                super().__init__(value)
+                semaphores.append(value)
+
+        with mock.patch('asyncio.Semaphore', Semaphore):
+            asyncio.run(do_conversion_async(self.topology_def, 'Lab1',
+                                            self._output, quiet=True,
+                                            copy_workers=1))
+        self.assertListEqual([1], semaphores)
+
+
+if __name__ == '__main__':
+    unittest.main()
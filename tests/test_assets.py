@@ -0,0 +1,136 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import unittest
+import os
+import shutil
+import tempfile
+from unittest import mock
+from gns3converter.assets import AssetCopier, copy_file, run_copy
+
+
+class TestAssetCopier(unittest.TestCase):
+    def setUp(self):
+        self.app = AssetCopier(4)
+        self.copied = []
+
+    def copy(self, source, target):
+        self.copied.append((source, target))
+        return 0
+
+    @staticmethod
+    def fail_copy(source, target):
+        raise OSError('Unable to copy %s' % source)
+
+    def test_run(self):
+        for i in range(10):
+            self.app.submit(self.copy, 'src%s' % i, 'dst%s' % i)
+        self.assertListEqual([], self.copied)
+
+        self.app.run()
+        self.assertEqual(10, len(self.copied))
+        self.assertIn(('src9', 'dst9'), self.copied)
+        self.assertListEqual([], self.app.pending)
+
+    def test_run_serial(self):
+        self.app.workers = 1
+        for i in range(3):
+            self.app.submit(self.copy, 'src%s' % i, 'dst%s' % i)
+
+        self.app.run()
+        self.assertListEqual([('src0', 'dst0'), ('src1', 'dst1'),
+                              ('src2', 'dst2')], self.copied)
+
+    def test_run_error(self):
+        self.app.submit(self.copy, 'src0', 'dst0')
+        self.app.submit(self.fail_copy, 'src1', 'dst1')
+        self.app.submit(self.fail_copy, 'src2', 'dst2')
+        self.app.submit(self.copy, 'src3', 'dst3')
+
+        with self.assertRaisesRegex(OSError, 'src1'):
+            self.app.run()
+        # The other copies still complete
+        self.assertEqual(2, len(self.copied))
+
+    def test_bytes_copied(self):
+        source = tempfile.mkdtemp()
+        try:
+            for (filename, data) in (('file1', b'12345'), ('file2', b'123')):
+                with open(os.path.join(source, filename), 'wb') as file:
+                    file.write(data)
+            target = os.path.join(source, 'target')
+            os.makedirs(target)
+
+            self.app.submit(copy_file, os.path.join(source, 'file1'),
+                            target)
+            # Linked files are not counted
+            self.app.submit(copy_file, os.path.join(source, 'file2'),
+                            target, 'hardlink')
+            self.app.run()
+            self.assertEqual(5, self.app.bytes_copied)
+        finally:
+            shutil.rmtree(source)
+
+    def test_run_copy(self):
+        run_copy(None, self.copy, 'src0', 'dst0')
+        self.assertListEqual([('src0', 'dst0')], self.copied)
+
+        run_copy(self.app, self.copy, 'src1', 'dst1')
+        self.assertEqual(1, len(self.copied))
+        self.assertEqual(1, len(self.app.pending))
+
+
+class TestCopyFile(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._source = os.path.join(self._dir, 'R1.cfg')
+        with open(self._source, 'w') as file:
+            file.write('hostname R1\n')
+        os.makedirs(os.path.join(self._dir, 'target'))
+        self._target = os.path.join(self._dir, 'target', 'R1.cfg')
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def read_target(self):
+        with open(self._target) as file:
+            return file.read()
+
+    def test_copy(self):
+        res = copy_file(self._source, os.path.dirname(self._target))
+        self.assertEqual(12, res)
+        self.assertEqual('hostname R1\n', self.read_target())
+        self.assertFalse(os.path.samefile(self._source, self._target))
+
+    def test_hardlink(self):
+        self.assertEqual(0, copy_file(self._source, self._target,
+                                      'hardlink'))
+        self.assertTrue(os.path.samefile(self._source, self._target))
+
+    def test_symlink(self):
+        copy_file(self._source, self._target, 'symlink')
+        self.assertTrue(os.path.islink(self._target))
+        self.assertEqual('hostname R1\n', self.read_target())
+
+    def test_reflink(self):
+        # Falls back to a copy when the filesystem can't clone files
+        copy_file(self._source, self._target, 'reflink')
+        self.assertFalse(os.path.islink(self._target))
+        self.assertEqual('hostname R1\n', self.read_target())
+
+    def test_link_fallback(self):
+        with mock.patch('os.link', side_effect=OSError('cross-device')):
+            copy_file(self._source, self._target, 'hardlink')
+        self.assertFalse(os.path.samefile(self._source, self._target))
+        self.assertEqual('hostname R1\n', self.read_target())
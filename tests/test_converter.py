@@ -15,7 +15,10 @@
 import unittest
 from configobj import ConfigObj
 import os.path
-from gns3converter.converter import Converter
+from gns3converter.converter import Converter, ConfigSpec, \
+    ConversionContext
+from gns3converter.converterror import ConvertError
+from gns3converter.records import ConnectionRecord, NodeRecord, PortRecord
 import tests.data
 
 
@@ -40,6 +43,26 @@ class TestConverter(unittest.TestCase):
         self.assertIsInstance(topology, ConfigObj)
         self.assertDictEqual(tests.data.old_top, topology)
 
+    def test_read_topology_errors(self):
+        missing = Converter(os.path.join(os.path.dirname(self._topology),
+                                         'missing.net'))
+        self.assertRaises(ConvertError, missing.read_topology)
+
+        for native in (False, True):
+            broken = Converter(None, native=native, content=['[[[broken'])
+            self.assertRaises(ConvertError, broken.read_topology)
+
+    def test_configspec_shared(self):
+        configspec = ConfigSpec.get()
+        self.assertIs(configspec, ConfigSpec.get())
+        self.assertIs(configspec.configobj, ConfigSpec.get().configobj)
+        self.assertIn('__many__', configspec.netspec.sections)
+
+        # The shared configspec is not changed by reading topologies
+        self.assertDictEqual(tests.data.old_top, self.app.read_topology())
+        self.assertDictEqual(tests.data.old_top,
+                             Converter(self._topology).read_topology())
+
     def test_get_sections(self):
         topology = self.app.read_topology()
         sections = self.app.get_sections(topology)
@@ -72,5 +95,60 @@ class TestConverter(unittest.TestCase):
         res = self.app.generate_notes(notes)
         self.assertListEqual(res, exp_res)
 
+    def test_generate_links_removes_reverse_duplicates(self):
+        nodes = []
+        for (node_id, name) in ((1, 'R1'), (2, 'R2')):
+            node = NodeRecord(node_id)
+            node.type = 'Router'
+            node.properties['name'] = name
+            node.ports = [PortRecord(node_id * 2 - 1, 'FastEthernet0/0'),
+                          PortRecord(node_id * 2, 'FastEthernet0/1')]
+            nodes.append(node)
+        self.app.links = [
+            ConnectionRecord(1, 1, 'FastEthernet0/0', 'R1', 'R2', 'f0/0'),
+            ConnectionRecord(1, 2, 'FastEthernet0/1', 'R1', 'R2', 'f0/1'),
+            ConnectionRecord(2, 3, 'FastEthernet0/0', 'R2', 'R1', 'f0/0'),
+            ConnectionRecord(2, 4, 'FastEthernet0/1', 'R2', 'R1', 'f0/1')]
+
+        res = self.app.generate_links(nodes)
+        self.assertEqual([1, 2], [link.id for link in res])
+        self.assertEqual([(1, 1, 2, 3), (1, 2, 2, 4)],
+                         [(link.source_node_id, link.source_port_id,
+                           link.destination_node_id,
+                           link.destination_port_id) for link in res])
+        self.assertEqual(2, nodes[1].ports[1].link_id)
+        self.assertEqual('connected to R1 on port FastEthernet0/1',
+                         nodes[1].ports[1].description)
+
+    def test_generate_nodes_parallel(self):
+        topology = self.app.process_topology(self.app.read_topology())
+        nodes = self.app.generate_nodes(topology)
+
+        parallel = Converter(self._topology)
+        par_nodes = parallel.generate_nodes(topology, jobs=2)
+        self.assertListEqual([node.to_dict() for node in nodes],
+                             [node.to_dict() for node in par_nodes])
+        self.assertListEqual([link.to_dict() for link in self.app.links],
+                             [link.to_dict() for link in parallel.links])
+        self.assertListEqual(self.app.configs, parallel.configs)
+        self.assertEqual(self.app.port_id, parallel.port_id)
+
+    def test_generate_nodes_context(self):
+        topology = self.app.process_topology(self.app.read_topology())
+        nodes = self.app.generate_nodes(topology)
+        links = self.app.generate_links(nodes)
+
+        # Each context numbers the ports and collects the connections of
+        # its own conversion
+        context = ConversionContext()
+        ctx_nodes = self.app.generate_nodes(topology, context=context)
+        ctx_links = self.app.generate_links(ctx_nodes, context)
+        self.assertListEqual([node.to_dict() for node in nodes],
+                             [node.to_dict() for node in ctx_nodes])
+        self.assertListEqual([link.to_dict() for link in links],
+                             [link.to_dict() for link in ctx_links])
+        self.assertEqual(self.app.port_id, context.port_id)
+        self.assertIs(self.app.context.links, self.app.links)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,68 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import unittest
+import io
+import json
+from gns3converter.jsonwriter import write_topology
+
+
+class TestWriteTopology(unittest.TestCase):
+    def setUp(self):
+        self.topology = {
+            'name': 'Lab1',
+            'resources_type': 'local',
+            'topology': {
+                'links': [{'id': 1, 'description': 'Link from R1 to R2',
+                           'source_node_id': 1, 'destination_node_id': 2}],
+                'nodes': [{'id': 1, 'type': 'Router',
+                           'properties': {'name': 'R1', 'slot0': None,
+                                          'ram': 128},
+                           'ports': [{'id': 1, 'name': 'f0/0'}]},
+                          {'id': 2, 'type': 'Router', 'properties': {},
+                           'ports': []}],
+                'notes': [{'text': 'Line 1\nLine 2 "quoted"', 'x': 1.5}],
+                'servers': [],
+                'ellipses': {}},
+            'type': 'topology',
+            'version': '1.0'}
+
+    def test_write_topology(self):
+        file = io.StringIO()
+        write_topology(file, self.topology)
+        self.assertEqual(json.dumps(self.topology, indent=4, sort_keys=True),
+                         file.getvalue())
+
+    def test_write_topology_compact(self):
+        file = io.StringIO()
+        write_topology(file, self.topology, compact=True)
+        self.assertEqual(json.dumps(self.topology, sort_keys=True,
+                                    separators=(',', ':')),
+                         file.getvalue())
+
+    def test_write_topology_generator(self):
+        links = self.topology['topology']['links']
+        self.topology['topology']['links'] = (link for link in links)
+        self.topology['topology']['servers'] = (server for server in [])
+
+        file = io.StringIO()
+        write_topology(file, self.topology)
+        self.topology['topology']['links'] = links
+        self.topology['topology']['servers'] = []
+        self.assertEqual(json.dumps(self.topology, indent=4, sort_keys=True),
+                         file.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
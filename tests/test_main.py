@@ -1,5 +1,16 @@
 import unittest
-from gns3converter.main import snapshot_name
+import json
+import os
+import shutil
+import tempfile
+import io
+import logging
+import contextlib
+from concurrent import futures
+from unittest import mock
+from gns3converter.main import snapshot_name, get_topologies, \
+    get_snapshots, bulk_conversion, convert_snapshots, do_conversion, \
+    convert_topology, project_dirs, main
 from gns3converter.converterror import ConvertError
 
 
@@ -12,3 +23,340 @@ class TestMain(unittest.TestCase):
         self.assertEqual(res, 'Begin_250814_140731')
         # assertRaises(excClass, callableObj, args)
         self.assertRaises(ConvertError, snapshot_name, '')
+
+
+class TestCommandLine(unittest.TestCase):
+    def setUp(self):
+        if os.path.isfile(os.path.abspath('./tests/topology.net')):
+            tests_dir = os.path.abspath('./tests')
+        else:
+            tests_dir = os.path.abspath('.')
+        self._dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self._dir)
+        shutil.copytree(os.path.join(tests_dir, 'configs'),
+                        os.path.join(self._dir, 'configs'))
+        self._topology = os.path.join(self._dir, 'topology.net')
+        shutil.copy(os.path.join(tests_dir, 'topology.net'), self._topology)
+
+    def run_main(self, *argv):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with mock.patch('sys.argv', ['gns3-converter'] + list(argv)), \
+                contextlib.redirect_stdout(stdout), \
+                contextlib.redirect_stderr(stderr):
+            main()
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_stats_not_topology(self):
+        with open(self._topology) as file:
+            content = file.read()
+        # As the topology is optional, the argument is taken as the stats
+        # file, and the topology in the current directory converted
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self._dir)
+        with self.assertRaises(SystemExit):
+            self.run_main('-q', '--stats', 'topology.net')
+        with open(self._topology) as file:
+            self.assertEqual(content, file.read())
+
+    def test_stats_stdout(self):
+        (stdout, stderr) = self.run_main(
+            '--stats', '-', '-o', os.path.join(self._dir, 'out'),
+            self._topology)
+        stats = json.loads(stdout)
+        self.assertEqual(1, len(stats))
+        self.assertEqual(self._topology, stats[0]['topology'])
+        self.assertIn('GNS3 Topology Converter', stderr)
+
+
+class TestConvertTopology(unittest.TestCase):
+    def setUp(self):
+        if os.path.isfile(os.path.abspath('./tests/topology.net')):
+            self._topology = os.path.abspath('./tests/topology.net')
+        else:
+            self._topology = os.path.abspath('./topology.net')
+        with open(self._topology, 'rb') as file:
+            self.content = file.read()
+
+    def test_convert_topology(self):
+        output = tempfile.mkdtemp()
+        try:
+            do_conversion({'file': self._topology, 'snapshot': False},
+                          'Lab1', output, quiet=True)
+            with open(os.path.join(output, 'Lab1.gns3')) as file:
+                exp_res = json.load(file)
+        finally:
+            shutil.rmtree(output)
+
+        text = self.content.decode('utf-8')
+        sources = (lambda: self.content, lambda: text,
+                   lambda: io.BytesIO(self.content),
+                   lambda: io.StringIO('\ufeff' + text))
+        for source in sources:
+            for native in (False, True):
+                (topology, assets) = convert_topology(source(), 'Lab1',
+                                                      native=native)
+                self.assertDictEqual(exp_res, topology)
+                self.assertListEqual(
+                    [{'type': 'config', 'source': 'configs/R1.cfg',
+                      'target': 'Lab1-files/dynamips/configs/'
+                                'i1_startup-config.cfg'}], assets)
+
+    def test_convert_topology_invalid(self):
+        # Never waits for input or exits, raising ConvertError instead
+        with mock.patch('builtins.input', side_effect=AssertionError), \
+                mock.patch('sys.exit', side_effect=AssertionError):
+            for native in (False, True):
+                self.assertRaises(ConvertError, convert_topology,
+                                  '[[[broken\n', native=native)
+
+    def test_convert_topology_threads(self):
+        jobs = [('Lab%s' % (i % 4), bool(i % 2), i % 8 == 7)
+                for i in range(48)]
+        exp_res = {}
+        for (topology_name, native, broken) in jobs:
+            if not broken:
+                exp_res[(topology_name, native)] = convert_topology(
+                    self.content, topology_name, native=native)
+
+        def convert(topology_name, native, broken):
+            if broken:
+                return convert_topology(b'[[[broken\n', topology_name,
+                                        native=native)
+            return convert_topology(self.content, topology_name,
+                                    native=native)
+
+        handlers = list(logging.getLogger().handlers)
+        with futures.ThreadPoolExecutor(max_workers=8) as executor:
+            pending = [executor.submit(convert, *job) for job in jobs]
+        for (job, future) in zip(jobs, pending):
+            (topology_name, native, broken) = job
+            if broken:
+                self.assertIsInstance(future.exception(), ConvertError)
+            else:
+                self.assertEqual(exp_res[(topology_name, native)],
+                                 future.result())
+        # Converting does not configure logging
+        self.assertListEqual(handlers, logging.getLogger().handlers)
+
+
+class TestBulkConversion(unittest.TestCase):
+    def setUp(self):
+        if os.path.isfile(os.path.abspath('./tests/topology.net')):
+            self._tests_dir = os.path.abspath('./tests')
+        else:
+            self._tests_dir = os.path.abspath('.')
+        self._source = tempfile.mkdtemp()
+        self._output = tempfile.mkdtemp()
+
+        for project in ('Lab1', 'Lab2'):
+            project_dir = os.path.join(self._source, 'labs', project)
+            shutil.copytree(os.path.join(self._tests_dir, 'configs'),
+                            os.path.join(project_dir, 'configs'))
+            shutil.copy(os.path.join(self._tests_dir, 'topology.net'),
+                        project_dir)
+
+        broken_dir = os.path.join(self._source, 'Broken')
+        os.makedirs(broken_dir)
+        with open(os.path.join(broken_dir, 'topology.net'), 'w') as file:
+            file.write('[[[broken\n')
+
+    def tearDown(self):
+        shutil.rmtree(self._source)
+        shutil.rmtree(self._output)
+
+    def test_get_topologies(self):
+        single = os.path.join(self._source, 'Broken', 'topology.net')
+        res = get_topologies([os.path.join(self._source, 'labs'), single])
+        exp_res = [os.path.join(self._source, 'labs', 'Lab1', 'topology.net'),
+                   os.path.join(self._source, 'labs', 'Lab2', 'topology.net'),
+                   single]
+        self.assertListEqual(res, exp_res)
+
+    def test_bulk_conversion(self):
+        topologies = get_topologies([self._source])
+        res = bulk_conversion(topologies, self._output, jobs=2)
+
+        self.assertEqual(['Broken', 'Lab1', 'Lab2'],
+                         [result['name'] for result in res])
+        self.assertIsNotNone(res[0]['error'])
+        self.assertIsNone(res[1]['error'])
+        self.assertIsNone(res[2]['error'])
+        for project in ('Lab1', 'Lab2'):
+            self.assertTrue(os.path.isfile(
+                os.path.join(self._output, project, project + '.gns3')))
+
+    def test_bulk_conversion_same_name(self):
+        other = os.path.join(self._source, 'other', 'Lab1')
+        shutil.copytree(os.path.join(self._source, 'labs', 'Lab1'), other)
+        topologies = get_topologies([self._source])
+        res = bulk_conversion(topologies, self._output, jobs=1,
+                              roots=[self._source])
+        self.assertEqual(['Broken', 'Lab1', 'Lab2', 'Lab1'],
+                         [result['name'] for result in res])
+        for project_dir in (os.path.join('labs', 'Lab1'),
+                            os.path.join('other', 'Lab1')):
+            self.assertTrue(os.path.isfile(
+                os.path.join(self._output, project_dir, 'Lab1.gns3')))
+
+    def test_project_dirs_stable(self):
+        def project_dirs_of(*projects):
+            topologies = [os.path.join(self._source, project, 'topology.net')
+                          for project in projects]
+            return project_dirs(topologies, self._output, [self._source])
+
+        before = project_dirs_of(os.path.join('b', 'Lab'),
+                                 os.path.join('c', 'Lab'))
+        self.assertListEqual([os.path.join(self._output, 'b', 'Lab'),
+                              os.path.join(self._output, 'c', 'Lab')],
+                             before)
+        # A new project with the same name does not move the others
+        after = project_dirs_of(os.path.join('a', 'Lab'),
+                                os.path.join('b', 'Lab'),
+                                os.path.join('c', 'Lab'))
+        self.assertListEqual(before, after[1:])
+
+    def test_project_dirs_same_name(self):
+        topologies = [os.path.join(self._source, project, 'Lab1',
+                                   'topology.net')
+                      for project in ('labs', 'other')]
+        dirs = project_dirs(topologies, self._output)
+        self.assertEqual(2, len(set(dirs)))
+        for project_dir in dirs:
+            self.assertRegex(os.path.basename(project_dir),
+                             '^Lab1-[0-9a-f]{8}$')
+        # The suffix only depends on the project itself
+        self.assertListEqual(dirs, project_dirs(topologies[::-1],
+                                                self._output)[::-1])
+
+    def test_convert_snapshots(self):
+        project_dir = os.path.join(self._source, 'labs', 'Lab1')
+        for snap in ('topology_A_snapshot_010114_120000',
+                     'topology_B_snapshot_020114_120000'):
+            shutil.copytree(os.path.join(self._tests_dir, 'configs'),
+                            os.path.join(project_dir, 'snapshots', snap,
+                                         'configs'))
+            shutil.copy(os.path.join(self._tests_dir, 'topology.net'),
+                        os.path.join(project_dir, 'snapshots', snap))
+
+        snapshots = get_snapshots(os.path.join(project_dir, 'topology.net'))
+        self.assertEqual(2, len(snapshots))
+        convert_snapshots(snapshots, 'Lab1', self._output, jobs=2)
+
+        for snap in ('A_010114_120000', 'B_020114_120000'):
+            snap_dir = os.path.join(self._output, 'Lab1-files', 'snapshots',
+                                    snap)
+            self.assertTrue(os.path.isfile(os.path.join(snap_dir,
+                                                        'Lab1.gns3')))
+            self.assertTrue(os.path.isfile(
+                os.path.join(snap_dir, 'Lab1-files', 'dynamips', 'configs',
+                             'i1_startup-config.cfg')))
+
+    def test_conversion_stats(self):
+        topology_def = {'file': os.path.join(self._source, 'labs', 'Lab1',
+                                             'topology.net'),
+                        'snapshot': False}
+        res = do_conversion(topology_def, 'Lab1', self._output, quiet=True)
+
+        self.assertEqual(topology_def['file'], res['topology'])
+        self.assertEqual('Lab1', res['name'])
+        self.assertListEqual(['read', 'process', 'nodes', 'links', 'artwork',
+                              'copy', 'write'], list(res['stages']))
+        for times in res['stages'].values():
+            self.assertGreaterEqual(times['wall'], 0)
+            self.assertGreaterEqual(times['cpu'], 0)
+        self.assertDictEqual({'sections': 6, 'devices': 1, 'ports': 2,
+                              'links': 1, 'bytes_copied': 261},
+                             res['counters'])
+
+        res = bulk_conversion([topology_def['file']], self._output, jobs=1,
+                              force=True)
+        self.assertEqual(1, len(res[0]['stats']))
+        self.assertEqual(1, res[0]['stats'][0]['counters']['links'])
+
+    def test_conversion_profile(self):
+        topology_def = {'file': os.path.join(self._source, 'labs', 'Lab1',
+                                             'topology.net'),
+                        'snapshot': False}
+        profile = os.path.join(self._output, 'profile')
+        res = do_conversion(topology_def, 'Lab1', self._output, quiet=True,
+                            profile=profile)
+
+        self.assertIn('memory_peak', res['stages']['read'])
+        for stage in res['stages']:
+            self.assertTrue(os.path.isfile(
+                os.path.join(profile, 'Lab1-%s.pstats' % stage)))
+        self.assertFalse(os.path.exists(os.path.join(profile,
+                                                     'Lab1.trace.json')))
+
+    def test_compact_conversion(self):
+        topology_def = {'file': os.path.join(self._source, 'labs', 'Lab1',
+                                             'topology.net'),
+                        'snapshot': False}
+        topology_file = os.path.join(self._output, 'Lab1.gns3')
+        do_conversion(topology_def, 'Lab1', self._output, quiet=True)
+        with open(topology_file) as file:
+            indented = file.read()
+
+        # Changing the format is not skipped as unchanged
+        self.assertTrue(do_conversion(topology_def, 'Lab1', self._output,
+                                      quiet=True, compact=True))
+        with open(topology_file) as file:
+            compact = file.read()
+        self.assertNotIn('\n', compact)
+        self.assertLess(len(compact), len(indented))
+        self.assertEqual(json.loads(indented), json.loads(compact))
+
+    def test_incremental_conversion(self):
+        topology_def = {'file': os.path.join(self._source, 'labs', 'Lab1',
+                                             'topology.net'),
+                        'snapshot': False}
+        self.assertTrue(do_conversion(topology_def, 'Lab1', self._output,
+                                      quiet=True))
+        self.assertTrue(os.path.isfile(os.path.join(self._output,
+                                                    'Lab1.manifest')))
+        # Unchanged, so skipped
+        self.assertFalse(do_conversion(topology_def, 'Lab1', self._output,
+                                       quiet=True))
+        self.assertTrue(do_conversion(topology_def, 'Lab1', self._output,
+                                      quiet=True, force=True))
+
+        # A changed config is converted again
+        config = os.path.join(self._source, 'labs', 'Lab1', 'configs',
+                              'R1.cfg')
+        with open(config, 'a') as file:
+            file.write('!\n')
+        self.assertTrue(do_conversion(topology_def, 'Lab1', self._output,
+                                      quiet=True))
+        new_config = os.path.join(self._output, 'Lab1-files', 'dynamips',
+                                  'configs', 'i1_startup-config.cfg')
+        with open(new_config) as file:
+            self.assertTrue(file.read().endswith('!\n'))
+
+        # As are instructions added to the project
+        self.assertFalse(do_conversion(topology_def, 'Lab1', self._output,
+                                       quiet=True))
+        instructions = os.path.join(self._source, 'labs', 'Lab1',
+                                    'instructions')
+        os.makedirs(instructions)
+        with open(os.path.join(instructions, 'lab.txt'), 'w') as file:
+            file.write('Configure OSPF\n')
+        self.assertTrue(do_conversion(topology_def, 'Lab1', self._output,
+                                      quiet=True))
+        self.assertTrue(os.path.isfile(os.path.join(
+            self._output, 'instructions', 'lab.txt')))
+        self.assertFalse(do_conversion(topology_def, 'Lab1', self._output,
+                                       quiet=True))
+
+        # And deleted or edited converted files
+        shutil.rmtree(os.path.join(self._output, 'Lab1-files'))
+        self.assertTrue(do_conversion(topology_def, 'Lab1', self._output,
+                                      quiet=True))
+        self.assertTrue(os.path.isfile(new_config))
+        with open(os.path.join(self._output, 'instructions', 'lab.txt'),
+                  'a') as file:
+            file.write('Configure BGP\n')
+        self.assertTrue(do_conversion(topology_def, 'Lab1', self._output,
+                                      quiet=True))
+        self.assertFalse(do_conversion(topology_def, 'Lab1', self._output,
+                                       quiet=True))
@@ -0,0 +1,96 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import unittest
+import os
+import shutil
+import tempfile
+from gns3converter import manifest
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._topology = self.write('topology.net', 'version = 0.8.6\n')
+        self._config = self.write('R1.cfg', 'hostname R1\n')
+        self._output = self.write('Lab.gns3', '{}')
+        self._manifest = manifest.manifest_path(self._dir, 'Lab')
+        manifest.write_manifest(
+            self._manifest,
+            manifest.build_manifest(self._topology,
+                                    [self._config,
+                                     os.path.join(self._dir, 'missing')],
+                                    {'link_mode': 'copy'}, self._dir,
+                                    [self._output]))
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def write(self, filename, data):
+        path = os.path.join(self._dir, filename)
+        with open(path, 'w') as file:
+            file.write(data)
+        return path
+
+    def is_up_to_date(self, candidates=()):
+        return manifest.is_up_to_date(self._manifest, self._topology,
+                                      {'link_mode': 'copy'}, candidates)
+
+    def test_file_hash(self):
+        self.assertEqual(64, len(manifest.file_hash(self._config)))
+        self.assertIsNone(manifest.file_hash(os.path.join(self._dir, 'x')))
+        dir_hash = manifest.file_hash(self._dir)
+        self.write('R2.cfg', 'hostname R2\n')
+        self.assertNotEqual(dir_hash, manifest.file_hash(self._dir))
+
+    def test_file_size(self):
+        self.assertEqual(12, manifest.file_size(self._config))
+        self.assertIsNone(manifest.file_size(os.path.join(self._dir, 'x')))
+        dir_size = manifest.file_size(self._dir)
+        self.write('R2.cfg', 'hostname R2\n')
+        self.assertEqual(dir_size + 12, manifest.file_size(self._dir))
+
+    def test_up_to_date(self):
+        self.assertTrue(self.is_up_to_date([self._config]))
+
+    def test_topology_changed(self):
+        self.write('topology.net', 'version = 0.8.7\n')
+        self.assertFalse(self.is_up_to_date())
+
+    def test_asset_changed(self):
+        self.write('R1.cfg', 'hostname R1-new\n')
+        self.assertFalse(self.is_up_to_date())
+
+    def test_missing_asset_added(self):
+        self.write('missing', 'found\n')
+        self.assertFalse(self.is_up_to_date())
+
+    def test_output_deleted(self):
+        os.remove(self._output)
+        self.assertFalse(self.is_up_to_date())
+
+    def test_output_changed(self):
+        self.write('Lab.gns3', '{"changed": true}')
+        self.assertFalse(self.is_up_to_date())
+
+    def test_new_candidate(self):
+        self.assertFalse(self.is_up_to_date([self.write('new.png', '')]))
+
+    def test_options_changed(self):
+        self.assertFalse(manifest.is_up_to_date(
+            self._manifest, self._topology, {'link_mode': 'hardlink'}))
+
+    def test_no_manifest(self):
+        os.remove(self._manifest)
+        self.assertFalse(self.is_up_to_date())
@@ -0,0 +1,119 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import unittest
+import os.path
+from configobj import ConfigObj
+from gns3converter import netparser
+from gns3converter.converter import Converter
+import tests.data
+
+
+def strip_none(section):
+    """
+    Remove the None defaults added by a full validation
+    """
+    return {key: strip_none(value) if isinstance(value, dict) else value
+            for (key, value) in section.items() if value is not None}
+
+
+class TestNetParser(unittest.TestCase):
+    def setUp(self):
+        if os.path.isfile(os.path.abspath('./tests/topology.net')):
+            self._topology = os.path.abspath('./tests/topology.net')
+        else:
+            self._topology = os.path.abspath('./topology.net')
+
+    def test_parse(self):
+        lines = ['# A comment',
+                 'version = 0.8.6',
+                 '[127.0.0.1:7200]',
+                 '    workingdir = /tmp # working directory',
+                 '    [[ROUTER R1]]',
+                 '        f0/0 = SW1 2',
+                 '[GNS3-DATA]',
+                 '    [[NOTE 1]]',
+                 '        text = "Sales VLAN\\n300 Users"']
+        res = netparser.parse(lines)
+
+        exp_res = ConfigObj(lines, list_values=False)
+        self.assertDictEqual(exp_res, res)
+        self.assertEqual(['version'], res.scalars)
+        self.assertEqual(['127.0.0.1:7200', 'GNS3-DATA'], res.sections)
+        self.assertEqual(['ROUTER R1'], res['127.0.0.1:7200'].sections)
+
+    def test_parse_errors(self):
+        self.assertRaises(SyntaxError, netparser.parse, ['[[too deep]]'])
+        self.assertRaises(SyntaxError, netparser.parse, ['[bad]]'])
+        self.assertRaises(SyntaxError, netparser.parse, ['no value'])
+        self.assertRaises(SyntaxError, netparser.parse, ['a = 1', 'a = 2'])
+        self.assertRaises(SyntaxError, netparser.parse, ['[a]', '[a]'])
+
+    def test_pop(self):
+        res = netparser.parse(['[a]', '    c = 1', '    [[b]]'])
+        res['a'].pop('b')
+        self.assertEqual([], res['a'].sections)
+        self.assertDictEqual({'c': '1'}, res['a'])
+
+    def test_read_topology_matches_configobj(self):
+        self.maxDiff = None
+        topology = Converter(self._topology, native=True).read_topology()
+        self.assertIsInstance(topology, netparser.NetSection)
+        self.assertDictEqual(tests.data.old_top, topology)
+        self.assertEqual(['127.0.0.1:7200', 'GNS3-DATA'], topology.sections)
+
+    def test_process_topology_matches_configobj(self):
+        app = Converter(self._topology)
+        native_app = Converter(self._topology, native=True)
+
+        exp_res = app.process_topology(app.read_topology())
+        res = native_app.process_topology(native_app.read_topology())
+        self.assertDictEqual(exp_res, res)
+
+    def test_read_topology_sparse(self):
+        self.maxDiff = None
+        exp_res = strip_none(tests.data.old_top)
+        for native in (False, True):
+            app = Converter(self._topology, native=native, sparse=True)
+            topology = app.read_topology()
+            # Only the keys present in the topology, without any defaults
+            self.assertEqual(['autostart', 'version'], topology.scalars)
+            self.assertIs(topology['autostart'], False)
+            for section in topology.sections:
+                self.assertDictEqual(exp_res[section], topology[section])
+            self.assertIsInstance(topology['127.0.0.1:7200']['udp'], int)
+            self.assertIs(topology['127.0.0.1:7200']['3660']['sparsemem'],
+                          True)
+
+    def test_process_topology_sparse(self):
+        app = Converter(self._topology)
+        exp_res = app.process_topology(app.read_topology())
+        for native in (False, True):
+            sparse_app = Converter(self._topology, native=native, sparse=True)
+            res = sparse_app.process_topology(sparse_app.read_topology())
+            self.assertDictEqual(exp_res, res)
+
+    def test_validate_errors(self):
+        config = netparser.parse(['[127.0.0.1:7200]', '    udp = abc'])
+        spec = netparser.parse(['[__many__]',
+                                'udp = integer(min=1, default=None)'],
+                               raw=True)
+        res = netparser.validate(config, spec)
+        self.assertEqual(1, len(res))
+        self.assertEqual((['127.0.0.1:7200'], 'udp'), res[0][:2])
+        self.assertEqual('abc', config['127.0.0.1:7200']['udp'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,7 +13,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 import unittest
-from gns3converter.node import Node
+from gns3converter.node import Node, _classify_item, classify_item, \
+    count_node_ports, router_port_layout
+from gns3converter.records import ConnectionRecord, PortRecord
 
 
 class TestNode(unittest.TestCase):
@@ -26,11 +28,14 @@ class TestNode(unittest.TestCase):
 
         self.app = Node(hv_input, 1)
 
+    def ports(self):
+        return [port.to_dict() for port in self.app.node.ports]
+
     def test_add_wic(self):
         exp_res = {'wic0': 'WIC-1T'}
 
         self.app.add_wic('wic0/0', 'WIC-1T')
-        self.assertDictEqual(exp_res, self.app.node['properties'])
+        self.assertDictEqual(exp_res, self.app.node.properties)
 
     def test_add_wic_ports_wic1t(self):
         exp_res = [{'name': 'Serial0/0',
@@ -38,10 +43,10 @@ class TestNode(unittest.TestCase):
                     'port_number': 16,
                     'slot_number': 0}]
 
-        self.app.node['properties']['wic0'] = 'WIC-1T'
+        self.app.node.properties['wic0'] = 'WIC-1T'
 
         self.app.add_wic_ports('wic0')
-        self.assertListEqual(exp_res, self.app.node['ports'])
+        self.assertListEqual(exp_res, self.ports())
         self.assertEqual(self.app.port_id, 2)
 
     def test_add_wic_ports_wic2t(self):
@@ -54,10 +59,10 @@ class TestNode(unittest.TestCase):
                     'port_number': 17,
                     'slot_number': 0}]
 
-        self.app.node['properties']['wic0'] = 'WIC-2T'
+        self.app.node.properties['wic0'] = 'WIC-2T'
 
         self.app.add_wic_ports('wic0')
-        self.assertListEqual(exp_res, self.app.node['ports'])
+        self.assertListEqual(exp_res, self.ports())
         self.assertEqual(self.app.port_id, 3)
 
     def test_add_wic_ports_wic2t_and_wic1t(self):
@@ -74,12 +79,12 @@ class TestNode(unittest.TestCase):
                     'port_number': 32,
                     'slot_number': 0}]
 
-        self.app.node['properties']['wic0'] = 'WIC-2T'
-        self.app.node['properties']['wic1'] = 'WIC-1T'
+        self.app.node.properties['wic0'] = 'WIC-2T'
+        self.app.node.properties['wic1'] = 'WIC-1T'
 
         self.app.add_wic_ports('wic0')
         self.app.add_wic_ports('wic1')
-        self.assertListEqual(exp_res, self.app.node['ports'])
+        self.assertListEqual(exp_res, self.ports())
         self.assertEqual(self.app.port_id, 4)
 
     def test_add_info_from_hv(self):
@@ -91,11 +96,14 @@ class TestNode(unittest.TestCase):
                                'chassis': '3640',
                                'npe': 'npe-400'}
 
-        self.app.device_info['model'] = 'c3600'
+        self.app.device_info.model = 'c3600'
 
         self.app.add_info_from_hv()
-        self.assertDictEqual(exp_res_node_prop, self.app.node['properties'])
-        self.assertDictEqual(exp_res_device_info, self.app.device_info)
+        self.assertDictEqual(exp_res_node_prop, self.app.node.properties)
+        self.assertDictEqual(exp_res_device_info,
+                             {'model': self.app.device_info.model,
+                              'chassis': self.app.device_info.chassis,
+                              'npe': self.app.device_info.npe})
 
     def test_calc_mb_ports_c3725(self):
         exp_res = [{'name': 'FastEthernet0/0', 'id': 1, 'port_number': 0,
@@ -103,24 +111,70 @@ class TestNode(unittest.TestCase):
                    {'name': 'FastEthernet0/1', 'id': 2, 'port_number': 1,
                     'slot_number': 0}]
 
-        self.app.device_info['model'] = 'c3725'
+        self.app.device_info.model = 'c3725'
 
         self.app.calc_mb_ports()
-        self.assertDictEqual(self.app.node['ports'][0], exp_res[0])
-        self.assertDictEqual(self.app.node['ports'][1], exp_res[1])
+        self.assertDictEqual(self.ports()[0], exp_res[0])
+        self.assertDictEqual(self.ports()[1], exp_res[1])
         self.assertEqual(self.app.port_id, 3)
 
     def test_calc_mb_ports_c2600(self):
         exp_res = [{'name': 'Ethernet0/0', 'id': 1, 'port_number': 0,
                     'slot_number': 0}]
 
-        self.app.device_info['model'] = 'c2600'
-        self.app.device_info['chassis'] = '2610'
+        self.app.device_info.model = 'c2600'
+        self.app.device_info.chassis = '2610'
 
         self.app.calc_mb_ports()
-        self.assertDictEqual(self.app.node['ports'][0], exp_res[0])
+        self.assertDictEqual(self.ports()[0], exp_res[0])
         self.assertEqual(self.app.port_id, 2)
 
+    def test_add_router_ports(self):
+        self.app.device_info.model = 'c3725'
+        self.app.node.properties['slot1'] = 'NM-4T'
+        self.app.node.properties['wic0'] = 'WIC-1T'
+        self.app.calc_mb_ports()
+        self.app.add_slot_ports('slot1')
+        self.app.add_wic_ports('wic0')
+        exp_res = self.ports()
+
+        router_port_layout.cache_clear()
+        routers = []
+        for port_id in (1, 9):
+            router = Node({}, port_id)
+            router.device_info.model = 'c3725'
+            router.node.properties['slot1'] = 'NM-4T'
+            router.node.properties['wic0'] = 'WIC-1T'
+            router.add_router_ports()
+            routers.append(router)
+
+        self.assertListEqual(
+            [port.to_dict() for port in routers[0].node.ports], exp_res)
+        self.assertEqual(routers[0].port_id, 8)
+        # The second router shares the layout, with its own port IDs
+        self.assertEqual([port.id for port in routers[1].node.ports],
+                         list(range(9, 16)))
+        self.assertIsNot(routers[0].node.ports[0], routers[1].node.ports[0])
+        self.assertEqual(router_port_layout.cache_info().hits, 1)
+
+    def test_count_node_ports(self):
+        router = {'type': 'Router', 'model': 'c3725', 'slot1': 'NM-4T',
+                  'wic0/0': 'WIC-1T'}
+        self.assertEqual(count_node_ports(router, {}), 7)
+        switch = {'type': 'EthernetSwitch', '1': 'access 1',
+                  '2': 'access 1', '3': 'dot1q 1'}
+        self.assertEqual(count_node_ports(switch, {}), 3)
+        cloud = {'type': 'Cloud',
+                 'connections': 'nio_gen_eth:eth0:SW1:1 '
+                                'nio_udp:30000:127.0.0.1:20000:R1:f0/0'}
+        self.assertEqual(count_node_ports(cloud, {}), 1)
+        vbox = {'type': 'VirtualBoxVM'}
+        self.assertEqual(
+            count_node_ports(vbox, {'VBoxDevice': {'nics': 4}}), 4)
+        qemu = {'type': 'QemuVM', 'ext_conf': 'JunOS', 'nics': 8}
+        self.assertEqual(count_node_ports(qemu, {'JunOS': {}}), 8)
+        self.assertEqual(count_node_ports({'type': 'VPCS'}, {}), 0)
+
     def test_calc_cloud_connection_4(self):
         exp_result = {'id': 1,
                       'name': 'nio_gen_eth:eth0',
@@ -128,13 +182,13 @@ class TestNode(unittest.TestCase):
         self.app.connections = 'SW1:1:nio_gen_eth:eth0'
         self.app.calc_cloud_connection()
         #Check NIO String
-        self.assertIsInstance(self.app.node['properties']['nios'], list)
-        self.assertIsInstance(self.app.node['properties']['nios'][0], str)
-        self.assertEqual(self.app.node['properties']['nios'][0],
+        self.assertIsInstance(self.app.node.properties['nios'], list)
+        self.assertIsInstance(self.app.node.properties['nios'][0], str)
+        self.assertEqual(self.app.node.properties['nios'][0],
                          'nio_gen_eth:eth0')
         #Check Port dictionary
-        self.assertIsInstance(self.app.node['ports'][0], dict)
-        self.assertDictEqual(self.app.node['ports'][0], exp_result)
+        self.assertIsInstance(self.app.node.ports[0], PortRecord)
+        self.assertDictEqual(self.ports()[0], exp_result)
         self.assertEqual(self.app.port_id, 2)
 
     def test_calc_cloud_connection_5(self):
@@ -150,13 +204,13 @@ class TestNode(unittest.TestCase):
         self.app.connections = 'SW1:1:nio_udp:30000:127.0.0.1:20000'
         self.app.calc_cloud_connection()
         #Check NIO String
-        self.assertIsInstance(self.app.node['properties']['nios'], list)
-        self.assertIsInstance(self.app.node['properties']['nios'][0], str)
-        self.assertEqual(self.app.node['properties']['nios'][0],
+        self.assertIsInstance(self.app.node.properties['nios'], list)
+        self.assertIsInstance(self.app.node.properties['nios'][0], str)
+        self.assertEqual(self.app.node.properties['nios'][0],
                          'nio_udp:30000:127.0.0.1:20000')
         #Check Port dictionary
-        self.assertIsInstance(self.app.node['ports'][0], dict)
-        self.assertDictEqual(self.app.node['ports'][0], exp_result)
+        self.assertIsInstance(self.app.node.ports[0], PortRecord)
+        self.assertDictEqual(self.ports()[0], exp_result)
         self.assertEqual(self.app.port_id, 2)
 
     def test_calc_cloud_connection_none(self):
@@ -165,8 +219,8 @@ class TestNode(unittest.TestCase):
         self.assertIsNone(ret)
 
     def test_calc_ethsw_port_device(self):
-        self.app.node['id'] = 1
-        self.app.node['properties']['name'] = 'SW1'
+        self.app.node.id = 1
+        self.app.node.properties['name'] = 'SW1'
         exp_port = {'id': 1, 'name': '1', 'port_number': 1,
                     'type': 'access', 'vlan': 1}
         exp_link = {'source_port_id': 1,
@@ -177,15 +231,15 @@ class TestNode(unittest.TestCase):
                     'dest_port': '1'}
 
         self.app.calc_ethsw_port(1, 'access 1 SW2 1')
-        self.assertIsInstance(self.app.node['ports'][0], dict)
-        self.assertIsInstance(self.app.links[0], dict)
+        self.assertIsInstance(self.app.node.ports[0], PortRecord)
+        self.assertIsInstance(self.app.links[0], ConnectionRecord)
 
-        self.assertDictEqual(self.app.node['ports'][0], exp_port)
-        self.assertDictEqual(self.app.links[0], exp_link)
+        self.assertDictEqual(self.ports()[0], exp_port)
+        self.assertDictEqual(self.app.links[0].to_dict(), exp_link)
 
     def test_calc_ethsw_port_nio(self):
-        self.app.node['id'] = 1
-        self.app.node['properties']['name'] = 'SW1'
+        self.app.node.id = 1
+        self.app.node.properties['name'] = 'SW1'
         exp_port = {'id': 1, 'name': '1', 'port_number': 1,
                     'type': 'access', 'vlan': 1}
         exp_link = {'source_port_id': 1,
@@ -196,14 +250,14 @@ class TestNode(unittest.TestCase):
                     'dest_port': 'nio_gen_eth:eth0'}
 
         self.app.calc_ethsw_port(1, 'access 1 nio_gen_eth:eth0')
-        self.assertIsInstance(self.app.node['ports'][0], dict)
-        self.assertIsInstance(self.app.links[0], dict)
+        self.assertIsInstance(self.app.node.ports[0], PortRecord)
+        self.assertIsInstance(self.app.links[0], ConnectionRecord)
 
-        self.assertDictEqual(self.app.node['ports'][0], exp_port)
-        self.assertDictEqual(self.app.links[0], exp_link)
+        self.assertDictEqual(self.ports()[0], exp_port)
+        self.assertDictEqual(self.app.links[0].to_dict(), exp_link)
 
     def test_calc_link(self):
-        self.app.node['properties']['name'] = 'R1'
+        self.app.node.properties['name'] = 'R1'
         exp_res = {'source_node_id': 1,
                    'source_port_id': 2,
                    'source_port_name': 'FastEthernet0/0',
@@ -213,11 +267,11 @@ class TestNode(unittest.TestCase):
 
         self.app.calc_link(1, 2, 'FastEthernet0/0',
                            {'device': 'SiteA', 'port': 'f0/0'})
-        self.assertIsInstance(self.app.links[0], dict)
-        self.assertDictEqual(self.app.links[0], exp_res)
+        self.assertIsInstance(self.app.links[0], ConnectionRecord)
+        self.assertDictEqual(self.app.links[0].to_dict(), exp_res)
 
     def test_add_slot_ports(self):
-        self.app.node['properties']['slot1'] = 'NM-4T'
+        self.app.node.properties['slot1'] = 'NM-4T'
         exp_res = [{'name': 'Serial1/0', 'id': 1, 'port_number': 0,
                     'slot_number': 1},
                    {'name': 'Serial1/1', 'id': 2, 'port_number': 1,
@@ -228,54 +282,54 @@ class TestNode(unittest.TestCase):
                     'slot_number': 1}]
 
         self.app.add_slot_ports('slot1')
-        self.assertListEqual(self.app.node['ports'], exp_res)
-        self.assertDictEqual(self.app.node['ports'][0], exp_res[0])
-        self.assertDictEqual(self.app.node['ports'][1], exp_res[1])
+        self.assertListEqual(self.ports(), exp_res)
+        self.assertDictEqual(self.ports()[0], exp_res[0])
+        self.assertDictEqual(self.ports()[1], exp_res[1])
         self.assertEqual(self.app.port_id, 5)
 
     def test_add_slot_ports_c7200(self):
-        self.app.device_info['model'] = 'c7200'
-        self.app.node['properties']['slot0'] = 'C7200-IO-2FE'
+        self.app.device_info.model = 'c7200'
+        self.app.node.properties['slot0'] = 'C7200-IO-2FE'
         exp_res = [{'name': 'FastEthernet0/0', 'id': 1, 'port_number': 0,
                     'slot_number': 0},
                    {'name': 'FastEthernet0/1', 'id': 2, 'port_number': 1,
                     'slot_number': 0}]
 
         self.app.add_slot_ports('slot0')
-        self.assertListEqual(self.app.node['ports'], exp_res)
-        self.assertDictEqual(self.app.node['ports'][0], exp_res[0])
-        self.assertDictEqual(self.app.node['ports'][1], exp_res[1])
+        self.assertListEqual(self.ports(), exp_res)
+        self.assertDictEqual(self.ports()[0], exp_res[0])
+        self.assertDictEqual(self.ports()[1], exp_res[1])
         self.assertEqual(self.app.port_id, 3)
 
     def test_set_description_router(self):
-        self.app.device_info['type'] = 'Router'
-        self.app.device_info['model'] = 'c3725'
+        self.app.device_info.type = 'Router'
+        self.app.device_info.model = 'c3725'
 
         self.app.set_description()
-        self.assertEqual(self.app.node['description'], 'Router c3725')
+        self.assertEqual(self.app.node.description, 'Router c3725')
 
     def test_set_description_cloud(self):
-        self.app.device_info['type'] = 'Cloud'
-        self.app.device_info['desc'] = 'Cloud'
+        self.app.device_info.type = 'Cloud'
+        self.app.device_info.desc = 'Cloud'
 
         self.app.set_description()
-        self.assertEqual(self.app.node['description'], 'Cloud')
+        self.assertEqual(self.app.node.description, 'Cloud')
 
     def test_set_type_router(self):
-        self.app.device_info['type'] = 'Router'
-        self.app.device_info['model'] = 'c3725'
+        self.app.device_info.type = 'Router'
+        self.app.device_info.model = 'c3725'
 
         self.app.set_type()
-        self.assertEqual(self.app.node['type'], 'C3725')
+        self.assertEqual(self.app.node.type, 'C3725')
 
     def test_set_type_cloud(self):
-        self.app.device_info['type'] = 'Cloud'
+        self.app.device_info.type = 'Cloud'
 
         self.app.set_type()
-        self.assertEqual(self.app.node['type'], 'Cloud')
+        self.assertEqual(self.app.node.type, 'Cloud')
 
     def test_get_nb_added_ports(self):
-        self.app.node['properties']['slot1'] = 'NM-4T'
+        self.app.node.properties['slot1'] = 'NM-4T'
         self.app.add_slot_ports('slot1')
 
         nb_added = self.app.get_nb_added_ports(0)
@@ -285,33 +339,33 @@ class TestNode(unittest.TestCase):
     def test_set_symbol_access_point(self):
         self.app.set_symbol('access_point')
 
-        self.assertEqual(self.app.node['default_symbol'],
+        self.assertEqual(self.app.node.default_symbol,
                          ':/symbols/access_point.normal.svg')
-        self.assertEqual(self.app.node['hover_symbol'],
+        self.assertEqual(self.app.node.hover_symbol,
                          ':/symbols/access_point.selected.svg')
 
     def test_set_symbol_etherswitch_router(self):
         self.app.set_symbol('EtherSwitch router')
 
-        self.assertEqual(self.app.node['default_symbol'],
+        self.assertEqual(self.app.node.default_symbol,
                          ':/symbols/multilayer_switch.normal.svg')
-        self.assertEqual(self.app.node['hover_symbol'],
+        self.assertEqual(self.app.node.hover_symbol,
                          ':/symbols/multilayer_switch.selected.svg')
 
     def test_set_symbol_host(self):
         self.app.set_symbol('Host')
 
-        self.assertEqual(self.app.node['default_symbol'],
+        self.assertEqual(self.app.node.default_symbol,
                          ':/symbols/computer.normal.svg')
-        self.assertEqual(self.app.node['hover_symbol'],
+        self.assertEqual(self.app.node.hover_symbol,
                          ':/symbols/computer.selected.svg')
 
     def test_calc_device_links(self):
         self.app.interfaces.append({'to': 'R2 f0/0',
                                     'from': 'f0/0'})
-        self.app.node['id'] = 1
-        self.app.node['properties']['name'] = 'R1'
-        self.app.device_info['model'] = 'c3725'
+        self.app.node.id = 1
+        self.app.node.properties['name'] = 'R1'
+        self.app.device_info.model = 'c3725'
         self.app.calc_mb_ports()
 
         exp_res = {'source_node_id': 1,
@@ -322,14 +376,28 @@ class TestNode(unittest.TestCase):
                    'dest_port': 'f0/0'}
 
         self.app.calc_device_links()
-        self.assertDictEqual(self.app.links[0], exp_res)
+        self.assertDictEqual(self.app.links[0].to_dict(), exp_res)
+
+    def test_port_by_name(self):
+        self.app.device_info.model = 'c3725'
+        self.app.node.properties['slot1'] = 'NM-16ESW'
+        self.app.node.properties['wic0'] = 'WIC-1T'
+        self.app.node.properties['adapters'] = 1
+        self.app.calc_mb_ports()
+        self.app.add_slot_ports('slot1')
+        self.app.add_wic_ports('wic0')
+        self.app.add_vm_ethernet_ports()
+
+        self.assertEqual(len(self.app.port_by_name), 20)
+        for port in self.app.node.ports:
+            self.assertIs(self.app.port_by_name[port.name], port)
 
     def test_calc_device_links_nio(self):
         self.app.interfaces.append({'to': 'nio_gen_eth:eth0',
                                     'from': 'f0/0'})
-        self.app.node['id'] = 1
-        self.app.node['properties']['name'] = 'R1'
-        self.app.device_info['model'] = 'c3725'
+        self.app.node.id = 1
+        self.app.node.properties['name'] = 'R1'
+        self.app.device_info.model = 'c3725'
         self.app.calc_mb_ports()
 
         exp_res = {'source_node_id': 1,
@@ -340,7 +408,7 @@ class TestNode(unittest.TestCase):
                    'dest_port': 'nio_gen_eth:eth0'}
 
         self.app.calc_device_links()
-        self.assertDictEqual(self.app.links[0], exp_res)
+        self.assertDictEqual(self.app.links[0].to_dict(), exp_res)
 
     def test_add_mapping(self):
         self.app.add_mapping(('1:122', '2:221'))
@@ -355,12 +423,35 @@ class TestNode(unittest.TestCase):
         self.app.process_mappings()
 
         exp_res = {'1:122': '2:221', '3:321': '1:123'}
-        self.assertDictEqual(self.app.node['properties']['mappings'],
+        self.assertDictEqual(self.app.node.properties['mappings'],
+                             exp_res)
+
+    def test_process_mappings_order(self):
+        self.app.add_mapping(('2:221', '1:122'))
+        self.app.add_mapping(('10:100', '3:300'))
+        self.app.add_mapping(('1:122', '2:221'))
+        self.app.add_mapping(('3:300', '10:100'))
+
+        self.app.process_mappings()
+
+        exp_res = {'1:122': '2:221', '10:100': '3:300'}
+        self.assertDictEqual(self.app.node.properties['mappings'],
+                             exp_res)
+
+    def test_process_mappings_not_reversed(self):
+        # Only the exact reverse of a mapping is removed
+        self.app.add_mapping(('1:100', '2:200'))
+        self.app.add_mapping(('3:300', '1:100'))
+
+        self.app.process_mappings()
+
+        exp_res = {'1:100': '2:200', '3:300': '1:100'}
+        self.assertDictEqual(self.app.node.properties['mappings'],
                              exp_res)
 
     def test_calc_frsw_port(self):
-        self.app.node['id'] = 1
-        self.app.node['properties']['name'] = 'FRSW1'
+        self.app.node.id = 1
+        self.app.node.properties['name'] = 'FRSW1'
         exp_link = [{'source_port_id': 1,
                      'source_node_id': 1,
                      'source_port_name': '1',
@@ -368,27 +459,28 @@ class TestNode(unittest.TestCase):
                      'source_dev': 'FRSW1',
                      'dest_port': 's0/0'}]
         self.app.calc_frsw_port('1', 'R1 s0/0')
-        self.assertListEqual(self.app.node['ports'],
+        self.assertListEqual(self.ports(),
                              [{'id': 1, 'name': '1', 'port_number': 1}])
-        self.assertListEqual(self.app.links, exp_link)
+        self.assertListEqual([link.to_dict() for link in self.app.links],
+                             exp_link)
         self.assertEqual(self.app.port_id, 2)
 
     def test_set_qemu_symbol(self):
-        self.app.device_info['from'] = 'ASA'
+        self.app.device_info.origin = 'ASA'
         self.app.set_qemu_symbol()
 
-        self.assertEqual(self.app.node['default_symbol'],
+        self.assertEqual(self.app.node.default_symbol,
                          ':/symbols/asa.normal.svg')
-        self.assertEqual(self.app.node['hover_symbol'],
+        self.assertEqual(self.app.node.hover_symbol,
                          ':/symbols/asa.selected.svg')
 
     def test_add_vm_ethernet_ports(self):
         exp_res = [{'id': 1, 'name': 'Ethernet0', 'port_number': 0},
                    {'id': 2, 'name': 'Ethernet1', 'port_number': 1}]
-        self.app.node['properties']['adapters'] = 2
+        self.app.node.properties['adapters'] = 2
         self.app.add_vm_ethernet_ports()
 
-        self.assertListEqual(self.app.node['ports'], exp_res)
+        self.assertListEqual(self.ports(), exp_res)
         self.assertEqual(self.app.port_id, 3)
 
     @unittest.skip
@@ -396,23 +488,81 @@ class TestNode(unittest.TestCase):
         # TODO
         self.fail()
 
+    def test_add_to_qemu_no_qemu_path(self):
+        self.app.node.qemu_id = 1
+        self.app.device_info.ext_conf = 'QemuDevice'
+        self.app.hypervisor['QemuDevice'] = {'image': 'linux.img',
+                                             'flavor': '-i386'}
+
+        self.app.add_to_qemu()
+
+        self.assertEqual(self.app.node.properties['hda_disk_image'],
+                         'linux.img')
+        self.assertEqual(self.app.node.properties['console'], 5001)
+        self.assertIsNone(self.app.node.properties['qemu_path'])
+
     def test_add_to_virtualbox(self):
-        self.app.node['vbox_id'] = 1
+        self.app.node.vbox_id = 1
         self.app.hypervisor['VBoxDevice'] = {}
         self.app.hypervisor['VBoxDevice']['image'] = 'image_name'
         self.app.hypervisor['VBoxDevice']['nics'] = 2
 
         self.app.add_to_virtualbox()
 
-        self.assertEqual(self.app.node['properties']['vmname'], 'image_name')
-        self.assertEqual(self.app.node['properties']['adapters'], 2)
-        self.assertEqual(self.app.node['properties']['console'], 3501)
+        self.assertEqual(self.app.node.properties['vmname'], 'image_name')
+        self.assertEqual(self.app.node.properties['adapters'], 2)
+        self.assertEqual(self.app.node.properties['console'], 3501)
 
     @unittest.skip
     def test_add_device_items(self):
         # TODO
         self.fail()
 
+    def test_classify_item(self):
+        exp_res = {'console': 'property', 'slot1': 'property',
+                   'connections': 'connections', 'f0/0': 'interface',
+                   'e0': 'interface', '1': 'port', '1:122': 'mapping',
+                   'cnfg': 'config', 'wic0/0': 'wic', 'symbol': 'symbol',
+                   'nics': 'nics', 'image': 'image', 'vbox_id': 'vbox_id',
+                   'qemu_id': 'qemu_id', 'x': None, 'model': None}
+        for (item, item_class) in exp_res.items():
+            self.assertEqual(classify_item(item), item_class, item)
+
+    def test_classify_item_cache(self):
+        # Two switches with more ports than an LRU cache of 1024 keys holds
+        device = {str(i): 'access 1 SW3 %s' % i for i in range(1, 1501)}
+        device['symbol'] = 'Host'
+        device['x'] = 1.0
+        _classify_item.cache_clear()
+        for name in ('SW1', 'SW2'):
+            node = Node({}, 1)
+            node.node.properties['name'] = name
+            node.device_info.type = 'EthernetSwitch'
+            for item in sorted(device):
+                node.add_device_items(item, device)
+            self.assertEqual(len(node.node.ports), 1500)
+
+        # The port numbers are not cached, the other keys are cached once
+        cache_info = _classify_item.cache_info()
+        self.assertEqual(cache_info.currsize, 2)
+        self.assertEqual(cache_info.misses, 2)
+        self.assertEqual(cache_info.hits, 2)
+
+    def test_add_device_items_switch(self):
+        self.app.node.id = 1
+        self.app.node.properties['name'] = 'SW1'
+        self.app.device_info.type = 'EthernetSwitch'
+        device = {'1': 'access 1 SW2 1', 'symbol': 'Host', 'x': 1.0}
+        for item in sorted(device):
+            self.app.add_device_items(item, device)
+
+        self.assertListEqual(self.ports(),
+                             [{'id': 1, 'name': '1', 'port_number': 1,
+                               'type': 'access', 'vlan': 1}])
+        self.assertEqual(self.app.node.default_symbol,
+                         ':/symbols/computer.normal.svg')
+        self.assertDictEqual(self.app.node.properties, {'name': 'SW1'})
+
 
 if __name__ == '__main__':
     unittest.main()
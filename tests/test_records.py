@@ -0,0 +1,89 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import unittest
+from gns3converter.records import ConnectionRecord, DeviceInfo, LinkRecord, \
+    NodeRecord, PortRecord
+
+
+class TestRecords(unittest.TestCase):
+    def test_port_to_dict(self):
+        port = PortRecord(1, 'FastEthernet0/0', 0, 0)
+        self.assertDictEqual(port.to_dict(),
+                             {'id': 1, 'name': 'FastEthernet0/0',
+                              'port_number': 0, 'slot_number': 0})
+
+        port.link_id = 2
+        port.description = 'connected to R2 on port FastEthernet0/0'
+        self.assertEqual(port.to_dict()['link_id'], 2)
+        self.assertIn('description', port.to_dict())
+
+    def test_cloud_port_to_dict(self):
+        port = PortRecord(1, 'nio_gen_eth:eth0')
+        port.stub = True
+        self.assertDictEqual(port.to_dict(), {'id': 1,
+                                              'name': 'nio_gen_eth:eth0',
+                                              'stub': True})
+
+    def test_node_to_dict(self):
+        node = NodeRecord(1)
+        node.type = 'C3725'
+        node.description = 'Router c3725'
+        node.x = 10.0
+        node.y = 20.0
+        node.router_id = 1
+        node.properties['name'] = 'R1'
+        node.ports.append(PortRecord(1, 'FastEthernet0/0', 0, 0))
+
+        exp_res = {'id': 1, 'type': 'C3725', 'description': 'Router c3725',
+                   'x': 10.0, 'y': 20.0, 'router_id': 1, 'server_id': 1,
+                   'label': {'x': 15, 'y': -25},
+                   'properties': {'name': 'R1'},
+                   'ports': [{'id': 1, 'name': 'FastEthernet0/0',
+                              'port_number': 0, 'slot_number': 0}]}
+        self.assertDictEqual(node.to_dict(), exp_res)
+
+    def test_link_to_dict(self):
+        # Unresolved destinations are kept as None
+        link = LinkRecord(1, 2, None, None, 'Link from R1')
+        link.id = 1
+        self.assertDictEqual(link.to_dict(),
+                             {'id': 1, 'description': 'Link from R1',
+                              'source_node_id': 1, 'source_port_id': 2,
+                              'destination_node_id': None,
+                              'destination_port_id': None})
+
+    def test_connection_to_dict(self):
+        link = ConnectionRecord(1, 2, 'FastEthernet0/0', 'R1', 'R2', 'f0/0')
+        self.assertDictEqual(link.to_dict(),
+                             {'source_node_id': 1, 'source_port_id': 2,
+                              'source_port_name': 'FastEthernet0/0',
+                              'source_dev': 'R1', 'dest_dev': 'R2',
+                              'dest_port': 'f0/0'})
+
+    def test_slots(self):
+        for record in (DeviceInfo(), PortRecord(1, 'Ethernet0'),
+                       NodeRecord(), LinkRecord(1, 1, 2, 2, ''),
+                       ConnectionRecord(1, 1, 'f0/0', 'R1', 'R2', 'f0/0')):
+            self.assertFalse(hasattr(record, '__dict__'))
+            with self.assertRaises(AttributeError):
+                record.unknown = True
+
+    def test_repr(self):
+        self.assertEqual(repr(PortRecord(1, 'Ethernet0', 0)),
+                         "PortRecord(id=1, name='Ethernet0', port_number=0)")
+
+
+if __name__ == '__main__':
+    unittest.main()
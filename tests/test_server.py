@@ -0,0 +1,135 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import unittest
+import http.client
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from concurrent import futures
+from gns3converter.main import convert_topology
+from gns3converter.server import ConversionService, make_server
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        http.client.HTTPConnection.__init__(self, 'localhost')
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+class TestConversionServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = ConversionService(1)
+        cls.service.warm_up()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.shutdown()
+
+    def setUp(self):
+        if os.path.isfile(os.path.abspath('./tests/topology.net')):
+            topology = os.path.abspath('./tests/topology.net')
+        else:
+            topology = os.path.abspath('./topology.net')
+        with open(topology, 'rb') as file:
+            self.content = file.read()
+
+    def start(self, **kwargs):
+        server = make_server(self.service, **kwargs)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    @staticmethod
+    def request(conn, method, url, body=None):
+        conn.request(method, url, body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read().decode('utf-8'))
+
+    def check_server(self, conn):
+        (status, res) = self.request(conn, 'POST',
+                                     '/convert?name=Lab1&parser=native',
+                                     self.content)
+        self.assertEqual(200, status)
+        (topology, assets) = convert_topology(self.content, 'Lab1')
+        self.assertDictEqual(topology, res['topology'])
+        self.assertListEqual(assets, res['assets'])
+        self.assertEqual(1, res['stats']['counters']['links'])
+        self.assertIn('elapsed', res['stats'])
+
+        (status, res) = self.request(conn, 'POST', '/convert', b'[[[broken')
+        self.assertEqual(400, status)
+        self.assertIn('error', res)
+
+        (status, res) = self.request(conn, 'GET', '/other')
+        self.assertEqual(404, status)
+
+        (status, res) = self.request(conn, 'GET', '/status')
+        self.assertEqual(200, status)
+        self.assertEqual(1, res['jobs'])
+        self.assertGreaterEqual(res['converted'], 1)
+        self.assertGreaterEqual(res['failed'], 1)
+
+    def test_counters(self):
+        status = self.service.status()
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            pending = [executor.submit(self.service.convert, self.content)
+                       for _ in range(20)]
+        for future in pending:
+            future.result()
+        self.assertEqual(status['converted'] + 20,
+                         self.service.status()['converted'])
+
+    def test_broken_worker(self):
+        # A worker dying breaks the pool, which is restarted
+        with self.assertRaises(futures.process.BrokenProcessPool):
+            self.service.run(os._exit, 1)
+        res = self.service.convert(self.content, 'Lab1')
+        self.assertEqual(1, res['stats']['counters']['links'])
+
+    def test_tcp(self):
+        server = self.start(port=0)
+        conn = http.client.HTTPConnection(*server.server_address[:2])
+        try:
+            self.check_server(conn)
+        finally:
+            conn.close()
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'No UNIX sockets')
+    def test_unix_socket(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'converter.sock')
+        self.start(unix_socket=path)
+
+        conn = UnixHTTPConnection(path)
+        try:
+            self.check_server(conn)
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# Copyright (C) 2014 Daniel Lintott.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import tracemalloc
+from gns3converter import netparser
+from gns3converter.stats import ConversionStats, count_sections
+
+
+class TestConversionStats(unittest.TestCase):
+    def setUp(self):
+        self.app = ConversionStats('topology.net', 'Lab1')
+
+    def test_stage(self):
+        with self.app.stage('links'):
+            pass
+        with self.app.stage('read'):
+            pass
+        with self.app.stage('read'):
+            pass
+
+        res = self.app.as_dict()
+        # Stages are in the order they are run in a conversion
+        self.assertListEqual(['read', 'links'], list(res['stages']))
+        self.assertAlmostEqual(res['total']['wall'],
+                               res['stages']['read']['wall'] +
+                               res['stages']['links']['wall'])
+
+    def test_stage_error(self):
+        with self.assertRaises(ValueError):
+            with self.app.stage('read'):
+                raise ValueError()
+        self.assertIn('read', self.app.stages)
+
+    def test_count(self):
+        self.app.count('links')
+        self.app.count('links', 2)
+        self.app.count('other')
+
+        res = self.app.as_dict()
+        self.assertEqual(3, res['counters']['links'])
+        self.assertEqual(0, res['counters']['devices'])
+        self.assertEqual(1, res['counters']['other'])
+        self.assertEqual('topology.net', res['topology'])
+        self.assertEqual('Lab1', res['name'])
+        self.assertFalse(res['snapshot'])
+
+    def test_profile(self):
+        self.app.profile = True
+        with self.app.stage('read'):
+            data = [str(i) for i in range(1000)]
+        with self.app.stage('nodes'):
+            del data
+        self.app.stop_profile()
+        self.assertFalse(tracemalloc.is_tracing())
+
+        res = self.app.as_dict()
+        self.assertGreater(res['stages']['read']['memory_peak'], 0)
+        self.assertListEqual(['read', 'nodes'],
+                             [event['name'] for event in
+                              self.app.trace_events()['traceEvents']])
+
+        directory = tempfile.mkdtemp()
+        try:
+            files = self.app.write_profile(directory, 'Lab1', trace=True)
+            self.assertListEqual(
+                ['Lab1-nodes.pstats', 'Lab1-nodes.tracemalloc',
+                 'Lab1-read.pstats', 'Lab1-read.tracemalloc',
+                 'Lab1-stats.json', 'Lab1.trace.json'],
+                sorted(os.path.basename(file) for file in files))
+            with open(os.path.join(directory, 'Lab1.trace.json')) as file:
+                trace = json.load(file)
+            self.assertEqual('X', trace['traceEvents'][0]['ph'])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_count_sections(self):
+        topology = netparser.parse(['a = 1', '[one]', '[[two]]',
+                                    '[[[three]]]', '[[four]]', '[five]'])
+        self.assertEqual(5, count_sections(topology))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,9 +12,12 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
+import types
 import unittest
 from configobj import ConfigObj
-from gns3converter.topology import LegacyTopology, JSONTopology
+from gns3converter.topology import LegacyTopology, JSONTopology, \
+    TopologyIndex
+from gns3converter.records import LinkRecord, NodeRecord, PortRecord
 
 
 class TestLegacyTopology(unittest.TestCase):
@@ -207,6 +210,31 @@ class TestJSONTopology(unittest.TestCase):
         result = self.app.get_topology()
         self.assertDictEqual(result, exp_res)
 
+    def test_get_topology_records(self):
+        node = NodeRecord(1)
+        node.type = 'VirtualBoxVM'
+        node.ports = [PortRecord(1, 'Ethernet0', 0)]
+        self.app.nodes = [node]
+        self.app.links = [LinkRecord(1, 1, None, None, 'Link')]
+        self.app.links[0].id = 1
+
+        topology = self.app.get_topology()['topology']
+        self.assertListEqual(topology['nodes'], [node.to_dict()])
+        self.assertListEqual(topology['nodes'][0]['ports'],
+                             [{'id': 1, 'name': 'Ethernet0',
+                               'port_number': 0}])
+        self.assertListEqual(topology['links'],
+                             [{'id': 1, 'description': 'Link',
+                               'source_node_id': 1, 'source_port_id': 1,
+                               'destination_node_id': None,
+                               'destination_port_id': None}])
+
+        # Lazily, the records are turned into dicts as they are iterated
+        lazy = self.app.get_topology(lazy=True)['topology']
+        self.assertIsInstance(lazy['nodes'], types.GeneratorType)
+        self.assertListEqual(list(lazy['nodes']), topology['nodes'])
+        self.assertListEqual(list(lazy['links']), topology['links'])
+
     def test_get_vboxes(self):
         # TODO
         pass
@@ -215,5 +243,38 @@ class TestJSONTopology(unittest.TestCase):
         # TODO
         pass
 
+
+class TestTopologyIndex(unittest.TestCase):
+    def setUp(self):
+        router = NodeRecord(1)
+        router.type = 'Router'
+        router.properties['name'] = 'R1'
+        router.ports = [PortRecord(1, 'FastEthernet0/0')]
+        cloud = NodeRecord(2)
+        cloud.type = 'Cloud'
+        cloud.properties['name'] = 'C1'
+        cloud.ports = [PortRecord(2, 'nio_gen_eth:Eth0')]
+        self.nodes = [router, cloud]
+        self.app = TopologyIndex(self.nodes)
+
+    def test_nodes(self):
+        self.assertIs(self.app.node_by_name['R1'], self.nodes[0])
+        self.assertIs(self.app.node_by_id[2], self.nodes[1])
+
+    def test_ports(self):
+        port = self.nodes[0].ports[0]
+        self.assertIs(self.app.port_by_name[(1, 'FastEthernet0/0')], port)
+        self.assertIs(self.app.port_by_id[(1, 1)], port)
+        self.assertNotIn((2, 1), self.app.port_by_id)
+
+    def test_nio_port(self):
+        self.assertEqual(self.app.nio_port['nio_gen_eth:eth0'],
+                         (self.nodes[1], self.nodes[1].ports[0]))
+
+    def test_from_nodes(self):
+        self.assertIs(TopologyIndex.from_nodes(self.app), self.app)
+        self.assertIsInstance(TopologyIndex.from_nodes(self.nodes),
+                              TopologyIndex)
+
 if __name__ == '__main__':
     unittest.main()